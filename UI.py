@@ -1,10 +1,8 @@
 import tkinter as tk
 from tkinter import font
 import game
-import ucs_solver, bfs_solver
-import dfs_solver
-import heuristic_minimax
 import math
+import copy
 import threading  # <--- Added to handle background tasks
 
 
@@ -33,6 +31,101 @@ KEYBOARD_LAYOUT = [
     "ZXCVBNM"
 ]
 
+# --- Lazy Solver Loading ---
+# Each algorithm button is a solver_registry solver. Solver modules read word
+# lists / pickles on first use (load_resources), and nothing is imported
+# until the algorithm is actually selected, so the window comes up without
+# touching them. Each loader returns the suggest (game_state -> next guess)
+# of one solver session and runs on the background worker. A tree solver's
+# session recovers off-script states into its overlay and commits the new
+# subtree to the shared strategy (see solver_registry.TreeSession).
+UI_SOLVERS = {
+    "DFS": "dfs",
+    "BFS": "bfs",
+    "UCS": "ucs",
+    # The A* tree is too slow to search live without a saved strategy, so
+    # this button keeps the minimax heuristic
+    "A*": "minimax",
+}
+
+def _solver_loader(name):
+    def load():
+        import solver_registry
+        solver = solver_registry.get(name)
+        return solver.session().suggest
+    return load
+
+SOLVER_LOADERS = {algo: _solver_loader(name) for algo, name in UI_SOLVERS.items()}
+
+class RecommendationWorker:
+    """
+    One long-lived background thread that runs bot calculations.
+    Only the latest request is kept: a new submit() replaces any request still
+    waiting, and a result whose request was superseded while it was running is
+    dropped. Results are handed back to the Tk main loop with root.after().
+    """
+    def __init__(self, root):
+        self.root = root
+        self._cond = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._stopped = False
+        # daemon=True ensures the thread dies if the main app is closed
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, on_result, func, *args):
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, on_result, func, args)
+            self._cond.notify()
+            return self._generation
+
+    def cancel(self):
+        # Bumping the generation invalidates both the pending and the running request
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+
+    def _is_current(self, generation):
+        with self._cond:
+            return generation == self._generation and not self._stopped
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                generation, on_result, func, args = self._pending
+                self._pending = None
+
+            result, error = None, None
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+
+            # Superseded while running: nobody wants this answer any more
+            if not self._is_current(generation):
+                continue
+            try:
+                self.root.after(0, self._deliver, generation, on_result, result, error)
+            except RuntimeError:
+                return  # Main loop is gone
+
+    def _deliver(self, generation, on_result, result, error):
+        # Runs on the main thread; re-check in case a newer request arrived meanwhile
+        if self._is_current(generation):
+            on_result(result, error)
+
 class WordleUI:
     def __init__(self, root):
         self.root = root
@@ -46,10 +139,9 @@ class WordleUI:
         self.game = game.Game()
         self.game.new_game()
 
-        ucs_solver.load_resources()
-        bfs_solver.load_resources()
-        self.ucs = ucs_solver.load_strategy()
-        self.bfs = bfs_solver.load_strategy()
+        # Solvers are loaded lazily on the worker thread (see SOLVER_LOADERS).
+        # Only the worker writes to this dict; the UI just checks membership.
+        self.solvers = {}
 
         # UI State
         self.last_message = ""
@@ -77,46 +169,76 @@ class WordleUI:
         # Bind Inputs
         self.root.bind("<Key>", self.handle_keypress)
         self.canvas.bind("<Button-1>", self.handle_click)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
-        # Initial Draw
+        # Single background worker for all bot calculations
+        self.rec_pending = False
+        self.worker = RecommendationWorker(self.root)
+
+        # Initial Draw, then start loading the selected solver once the window is up
         self.UI_update()
+        self.root.after(0, self.preload_solver)
 
     # --- Threading Helper ---
     def run_bot_calculation(self):
         """
-        Runs the heavy BFS strategy lookup/regeneration in a separate thread
-        to keep the UI responsive.
+        Queues a recommendation for the current board on the background worker.
+        Any request that is still waiting is replaced, and results of requests
+        superseded while running are dropped, so only the latest board is answered.
         """
-        def task():
-            # This is the slow part (regenerating the tree if off-script)
-            # self.rec_word = bfs_new.use_strategy_map(self.game.response, self.strategy)
-            if (self.selected_algo == "BFS"):
-                self.rec_word = bfs_solver.get_next_guess(self.game.response, self.bfs) # Handling BFS
-            elif (self.selected_algo == "UCS"):
-                self.rec_word = ucs_solver.get_next_guess(self.game.response, self.ucs) # Handling UCS
-            elif (self.selected_algo == "DFS"):
-                self.rec_word = dfs_solver.get_next_guess(self.game.response) # Handling DFS
-            else:
-                self.rec_word = heuristic_minimax.get_next_guess(self.game.response) # Handling A*
+        if self.game.response["is_game_over"]:
+            self.worker.cancel()
+            self.rec_pending = False
+            return
 
-            if self.rec_word is None:
-                self.rec_word = ""
-            else:
-                self.rec_word = self.rec_word.upper()
-            
-            # Since we are in a thread, we use print() for now.
-            # If you want to update the UI (e.g. self.rec_word), you must use 
-            # self.root.after() to schedule it on the main thread.
+        # Snapshot the board so the worker never reads state the UI is mutating
+        snapshot = copy.deepcopy(self.game.response)
+        self.rec_pending = True
+        self.worker.submit(self.on_recommendation, self.compute_recommendation, self.selected_algo, snapshot)
+
+    def preload_solver(self):
+        """
+        Loads the selected solver in the background without asking for a move.
+        A recommendation request submitted later supersedes this one, but it
+        loads the same solver first anyway.
+        """
+        if self.selected_algo in self.solvers:
+            return
+        self.worker.submit(self.on_solver_loaded, self.load_solver, self.selected_algo)
+
+    def load_solver(self, algo):
+        # Runs on the worker thread only
+        if algo not in self.solvers:
+            self.solvers[algo] = SOLVER_LOADERS[algo]()
+        return self.solvers[algo]
+
+    def compute_recommendation(self, algo, game_state):
+        """
+        Runs on the worker thread. Tree solvers read the shared strategy's
+        current snapshot and compute off-script moves without mutating it.
+        """
+        word = self.load_solver(algo)(game_state)
+        return "" if word is None else word.upper()
+
+    def on_solver_loaded(self, solver, error):
+        if error is not None:
+            print(f"Error loading solver: {error}")
+        self.UI_update()
+
+    def on_recommendation(self, word, error):
+        # Called on the Tk main loop via root.after()
+        self.rec_pending = False
+        if error is not None:
+            print(f"Bot Error: {error}")
+            self.rec_word = ""
+        else:
+            self.rec_word = word
             print(f"Bot Suggestion: {self.rec_word}")
-            self.UI_update()
-            
-            # Example of how to update UI safely from thread:
-            # self.root.after(0, lambda: self.update_recommendation(suggestion))
+        self.UI_update()
 
-        # Create and start the thread
-        # daemon=True ensures the thread dies if the main app is closed
-        thread = threading.Thread(target=task, daemon=True)
-        thread.start()
+    def close(self):
+        self.worker.stop()
+        self.root.destroy()
 
     def draw_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
         points = [
@@ -243,21 +365,21 @@ class WordleUI:
         if not self.show_support_details:
             btn_y = panel_y + panel_h / 2 - 25
             self.draw_button(panel_x + 30, btn_y, 240, 50, "SUPPORT", COLOR_SUP_BTN_BG, COLOR_SUP_BTN_FG, "btn_support_toggle", radius=25)
+            if self.selected_algo not in self.solvers:
+                self.canvas.create_text(panel_x + panel_w / 2, btn_y + 80, text=f"Loading {self.selected_algo}...", fill="#FFFFFF", font=self.font_err)
         else:
             cx = panel_x + panel_w / 2
 
-            if (data["is_game_over"] == False):
-                if (self.selected_algo == "BFS"):
-                    self.rec_word = bfs_solver.get_next_guess(self.game.response, self.bfs).upper() # Handling BFS
-                elif (self.selected_algo == "UCS"):
-                    self.rec_word = ucs_solver.get_next_guess(self.game.response, self.ucs).upper() # Handling UCS
-                elif (self.selected_algo == "DFS"):
-                    self.rec_word = dfs_solver.get_next_guess(self.game.response).upper() # Handling DFS
-                else:
-                    self.rec_word = heuristic_minimax.get_next_guess(self.game.response).upper() # Handling A*
+            # The recommendation is computed by the worker; we only draw the latest result
+            if self.selected_algo not in self.solvers:
+                rec_text = "LOADING..."
+            elif self.rec_pending:
+                rec_text = "..."
+            else:
+                rec_text = self.rec_word
             
             self.canvas.create_text(cx, panel_y + 40, text="RECOMMENDATION", fill="#FFFFFF", font=self.font_btn)
-            self.draw_button(panel_x + 30, panel_y + 60, 240, 60, self.rec_word, COLOR_SUP_BTN_BG, COLOR_SUP_BTN_FG, "btn_crack", radius=15)
+            self.draw_button(panel_x + 30, panel_y + 60, 240, 60, rec_text, COLOR_SUP_BTN_BG, COLOR_SUP_BTN_FG, "btn_crack", radius=15)
             
             self.canvas.create_text(cx, panel_y + 160, text="ALGORITHMS", fill="#FFFFFF", font=self.font_btn)
             algos = ["DFS", "BFS", "UCS", "A*"]
@@ -332,9 +454,12 @@ class WordleUI:
         tag = tags[0]
         
         if "btn_new_game" in tag or "btn_new_game_over" in tag:
+            self.worker.cancel()
+            self.rec_pending = False
             self.game.new_game()
             self.last_message = ""
             self.show_support_details = False
+            self.preload_solver()
             self.UI_update()
             return
 
@@ -347,6 +472,10 @@ class WordleUI:
         if tag.startswith("algo_"):
             algo_name = tag.split("_")[1]
             self.selected_algo = algo_name
+            if self.show_support_details:
+                self.run_bot_calculation()
+            else:
+                self.preload_solver()
             self.UI_update()
             return
 
@@ -0,0 +1,355 @@
+import os
+import time
+import pickle
+import threading
+import game
+import pattern_matrix
+import scoring
+import strategy_store
+import wordHandle
+from state import as_view
+import numpy as np
+
+# --- 1. GLOBAL RESOURCES ---
+# A* over the strategy tree. The cost of a subtree is the total number of
+# guesses it takes to solve every candidate in it (so cost / n is the
+# average). Each node tries its guesses cheapest-bound first and stops as
+# soon as no remaining guess's f = g + h can beat the best subtree found:
+#
+#   g = n            (the guess is played once for each of the n candidates)
+#   h = sum of LOWER_BOUND[size] over the guess's non-winning buckets
+#
+# LOWER_BOUND is admissible (see lower_bound_table), so the f cut never
+# drops a guess that could have done better. The search is still a beam:
+# only the GUESS_LIMIT guesses with the lowest f are tried at each node, so
+# the tree is optimal only with GUESS_LIMIT = None. Children get the
+# remaining budget, so a subtree whose partial cost already exceeds it is
+# abandoned early.
+#
+# The six-guess limit is soft: an answer solved after guess MAX_GUESSES costs
+# FAIL_PENALTY extra (a lost game), so every answer still gets a strategy. h
+# adds the penalty for the answers a bucket can't fit in the guesses left.
+MAX_GUESSES = 6
+FAIL_PENALTY = 100  # extra cost per answer solved after guess MAX_GUESSES
+HARD_LIMIT = MAX_GUESSES + 3  # no strategy goes deeper than this
+GUESS_LIMIT = 10       # beam: guesses tried per node (the lowest f); None tries them all
+HEURISTIC = "buckets"  # "none" sets h = 0: the same search, ordered by cost only (UCS)
+ALLOWED_MAP = {}
+ANSWER_MAP = {}
+MATRIX = np.array([])
+ALLOWED_WORDS = []
+ANSWER_WORDS = []
+NUM_PATTERNS = wordHandle.NUM_PATTERNS  # 3**word_length, set with the matrix
+WIN_PATTERN = wordHandle.WIN_PATTERN
+LOWER_BOUND = np.array([], dtype=np.int64)  # LOWER_BOUND[m]: fewest total guesses for m candidates
+CAPACITY = []  # CAPACITY[r]: most candidates r guesses can ever solve
+NODES_EXPANDED = 0
+_LOCK = threading.Lock()
+
+def load_resources():
+    # SINGLETON CHECK: If already loaded, do nothing (no lock once loaded).
+    if MATRIX.size > 0:
+        return
+    with _LOCK:
+        if MATRIX.size == 0:
+            _load_resources()
+
+def _load_resources():
+    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, ALLOWED_MAP, ANSWER_MAP, NUM_PATTERNS, WIN_PATTERN
+    global LOWER_BOUND, CAPACITY
+
+    print(f"Loading resources...")
+
+    # The matrix itself is shared with the other solvers (loaded once per process)
+    matrix, allowed, answers = pattern_matrix.load_matrix()
+
+    if matrix.size > 0:
+        # guess_bounds scores scoring.ALL_GUESS_IDS: without it no node splits
+        scoring.load_resources()
+        ALLOWED_WORDS = allowed
+        ANSWER_WORDS = answers
+        ALLOWED_MAP = {w: i for i, w in enumerate(ALLOWED_WORDS)}
+        ANSWER_MAP = {w: i for i, w in enumerate(ANSWER_WORDS)}
+        NUM_PATTERNS = wordHandle.num_patterns(len(ALLOWED_WORDS[0]))
+        WIN_PATTERN = wordHandle.win_pattern(len(ALLOWED_WORDS[0]))
+        LOWER_BOUND, CAPACITY = lower_bound_table(len(ANSWER_WORDS), NUM_PATTERNS)
+        MATRIX = matrix
+        print("Resources loaded.")
+    else:
+        print("Error: pattern_matrix not found.")
+
+# --- 2. ADMISSIBLE BOUNDS ---
+def lower_bound_table(n, num_patterns):
+    """
+    Returns (lower_bound, capacity) for up to n candidates.
+    A guess wins for at most one candidate and leaves at most num_patterns - 1
+    other buckets, so at most (num_patterns - 1) ** (k - 1) candidates can be
+    solved by guess k. Filling the shallowest guesses first gives the least
+    possible total: lower_bound[m] = 2m - 1 while m <= num_patterns, then
+    growing like m * log(m) / log(num_patterns - 1).
+    capacity[r] is how many candidates r guesses can solve at most.
+    """
+    depth_of = np.empty(n + 1, dtype=np.int64)  # guess number that solves the m-th candidate
+    depth_of[0] = 0
+    capacity = [0]
+    filled, k = 0, 1
+    while filled < n:
+        level = (num_patterns - 1) ** (k - 1)
+        depth_of[filled + 1:filled + 1 + level] = k
+        filled += level
+        capacity.append(filled)
+        k += 1
+    while len(capacity) <= MAX_GUESSES:
+        capacity.append(capacity[-1])
+    return np.cumsum(depth_of), capacity
+
+def bucket_bound(sizes, depth):
+    """
+    Admissible cost of buckets of the given sizes with depth guesses made:
+    the fewest guesses plus the penalty for the answers that can't fit
+    (both are least when the shallowest guesses are filled first).
+    """
+    capacity = CAPACITY[min(max(MAX_GUESSES - depth, 0), MAX_GUESSES)]
+    if np.max(sizes) <= capacity:
+        return LOWER_BOUND[sizes]  # the usual case: everything can still fit
+    return LOWER_BOUND[sizes] + FAIL_PENALTY * np.maximum(np.asarray(sizes) - capacity, 0)
+
+def guess_bounds(candidates_arr, depth):
+    """
+    The GUESS_LIMIT guesses with the lowest bound (ties keep allowed-word
+    order), and their f values. Returns (guess ids, f values).
+    """
+    n = len(candidates_arr)
+    if MAX_GUESSES - depth - 1 == 0:
+        guess_ids = np.sort(candidates_arr)  # last guess: only a candidate can win
+    else:
+        guess_ids = scoring.ALL_GUESS_IDS
+    win_penalty = FAIL_PENALTY if depth + 1 > MAX_GUESSES else 0
+
+    bound = np.empty(len(guess_ids), dtype=np.float64)
+    for start in range(0, len(guess_ids), scoring.GUESS_BLOCK):
+        ids = guess_ids[start:start + scoring.GUESS_BLOCK]
+        counts = scoring.bucket_counts(scoring.pattern_block(ids, candidates_arr, MATRIX))
+        wins = counts[:, WIN_PATTERN].copy()
+        counts[:, WIN_PATTERN] = 0
+        splits = counts.max(axis=1) < n  # a guess that leaves all n together is useless
+        h = bucket_bound(counts, depth + 1).sum(axis=1)
+        bound[start:start + len(ids)] = np.where(splits, n + win_penalty * wins + h, np.inf)
+
+    # The same guesses are tried either way; HEURISTIC only changes f
+    order = np.argsort(bound, kind="stable")[:GUESS_LIMIT]
+    order = order[np.isfinite(bound[order])]
+    f = bound[order] if HEURISTIC == "buckets" else np.full(len(order), float(n))
+    return guess_ids[order], f
+
+# --- 3. A* SEARCH ---
+def solve_node(candidates_arr, depth, budget, strategy_map):
+    """
+    Cheapest strategy found (within the GUESS_LIMIT beam) for the candidates
+    with depth guesses already made, if it costs less than budget. Adds its entries to strategy_map and returns
+    its cost; returns inf (and adds nothing) when nothing beats the budget.
+    """
+    global NODES_EXPANDED
+    n = len(candidates_arr)
+    state_id = tuple(candidates_arr.tolist())
+
+    if n == 1:
+        cost = 1 + (FAIL_PENALTY if depth + 1 > MAX_GUESSES else 0)
+        if depth >= HARD_LIMIT or budget <= cost:
+            return float('inf')
+        strategy_map[state_id] = ANSWER_WORDS[candidates_arr[0]]
+        return cost
+    # Two candidates: guess one of them (exactly the bound 2n - 1 = 3)
+    cost = 3 + sum(FAIL_PENALTY for k in (1, 2) if depth + k > MAX_GUESSES)
+    if n == 2 and depth + 2 <= HARD_LIMIT and budget > cost:
+        strategy_map[state_id] = ANSWER_WORDS[candidates_arr[0]]
+        strategy_map[(state_id[1],)] = ANSWER_WORDS[candidates_arr[1]]
+        return cost
+    if depth + 2 > HARD_LIMIT:
+        return float('inf')
+
+    NODES_EXPANDED += 1
+    best_cost = budget
+    best_word = None
+    best_subtree = None
+
+    guess_ids, f_values = guess_bounds(candidates_arr, depth)
+    for guess_idx, f in zip(guess_ids, f_values):
+        # A*: guesses come in f order, so none of the rest can beat best_cost either
+        if f >= best_cost:
+            break
+
+        patterns, groups = scoring.partition(int(guess_idx), candidates_arr)
+        children = [g for p, g in zip(patterns, groups) if p != WIN_PATTERN]
+        children.sort(key=len, reverse=True)  # big subtrees first: they exhaust a budget soonest
+
+        subtree = {}
+        won = n - sum(len(g) for g in children)  # 1 if the guess is a candidate
+        total = n + (FAIL_PENALTY * won if depth + 1 > MAX_GUESSES else 0)
+        child_h = [int(bucket_bound(len(g), depth + 1)) if HEURISTIC == "buckets" else 0 for g in children]
+        remaining_h = sum(child_h)
+        for child, h in zip(children, child_h):
+            remaining_h -= h
+            cost = solve_node(child, depth + 1, best_cost - total - remaining_h, subtree)
+            total += cost
+            if total + remaining_h >= best_cost:
+                break
+        else:
+            best_cost = total
+            best_word = ALLOWED_WORDS[guess_idx]
+            best_subtree = subtree
+
+    if best_word is None:
+        return float('inf')
+    strategy_map.update(best_subtree)
+    strategy_map[state_id] = best_word
+    return best_cost
+
+def find_best_move_for_state(current_indices, depth):
+    """
+    Best move for a list of candidate ids and its groups ({pattern: id array}),
+    as in bfs_solver: the node's subtree is solved with A* and its first guess kept.
+    """
+    if len(current_indices) == 0:
+        return None, {}
+
+    candidates_arr = np.asarray(current_indices, dtype=np.int32)
+    subtree = {}
+    solve_node(candidates_arr, depth, float('inf'), subtree)
+    word = subtree.get(tuple(candidates_arr.tolist()))
+    if word is None or len(candidates_arr) == 1:
+        return ANSWER_WORDS[candidates_arr[0]], {}
+
+    patterns, groups = scoring.partition(ALLOWED_MAP[word], candidates_arr)
+    return word, dict(zip(patterns.tolist(), groups))
+
+def astar_solve_by_state(start_word: str = None, initial_candidates: list[str] = None):
+    """
+    Generates a strategy tree (the existing strategy map format) with A*.
+    With start_word the first guess is fixed; otherwise it is searched too.
+    """
+    global NODES_EXPANDED
+    load_resources()
+
+    if initial_candidates:
+        initial_indices = [ANSWER_MAP[w] for w in initial_candidates if w in ANSWER_MAP]
+    else:
+        initial_indices = list(range(len(ANSWER_WORDS)))
+    candidates_arr = np.array(sorted(initial_indices), dtype=np.int32)
+
+    start_time = time.time()
+    NODES_EXPANDED = 0
+    strategy_map = {}
+    print(f"Starting A* for {len(candidates_arr)} candidates...")
+
+    if start_word:
+        start_idx = ALLOWED_MAP[start_word]
+        total = len(candidates_arr)
+        patterns, groups = scoring.partition(start_idx, candidates_arr)
+        for pat_int, group in zip(patterns, groups):
+            if pat_int == WIN_PATTERN:
+                strategy_map[tuple(group.tolist())] = start_word
+                continue
+            total += solve_node(group, 1, float('inf'), strategy_map)
+            print(f"Bucket of {len(group)} solved | Expanded: {NODES_EXPANDED} | Time: {time.time()-start_time:.1f}s")
+        strategy_map[tuple(candidates_arr.tolist())] = start_word
+    else:
+        total = solve_node(candidates_arr, 0, float('inf'), strategy_map)
+
+    print(f"A* Complete. Cost per answer: {total / max(1, len(candidates_arr)):.4f} (+{FAIL_PENALTY} per answer over {MAX_GUESSES} guesses) | Expanded: {NODES_EXPANDED} | Time: {time.time()-start_time:.1f}s")
+    return strategy_map
+
+# --- 4. PERSISTENCE HELPERS ---
+def save_strategy(strategy_map):
+    STRATEGY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "astar_strategy_map.pkl")
+    os.makedirs(os.path.dirname(STRATEGY_FILE), exist_ok=True)
+    # Written beside the old file and swapped in: readers never see half a pickle
+    with open(STRATEGY_FILE + ".tmp", "wb") as f:
+        pickle.dump(strategy_map, f)
+    os.replace(STRATEGY_FILE + ".tmp", STRATEGY_FILE)
+    print(f"Strategy map saved to {STRATEGY_FILE}. Size: {len(strategy_map)} states.")
+
+def load_strategy():
+    STRATEGY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "astar_strategy_map.pkl")
+    if os.path.exists(STRATEGY_FILE):
+        try:
+            with open(STRATEGY_FILE, "rb") as f:
+                strategy = pickle.load(f)
+            print(f"Loaded strategy map with {len(strategy)} states.")
+            return strategy
+        except Exception as e:
+            print(f"Error loading strategy: {e}")
+            return {}
+    return {}
+
+# --- 5. SHARED STRATEGY ---
+# One read-only A* strategy per process (see strategy_store); every game or
+# thread plays through its own copy-on-write session of it.
+def shared_strategy():
+    return strategy_store.get_store("astar", load_strategy, save_strategy)
+
+def strategy_session():
+    return shared_strategy().session()
+
+# --- 6. RUNTIME HELPER ---
+def get_next_guess(game_state, strategy_map):
+    """
+    Strategy lookup; off-script states are solved live with A* and their
+    subtree is committed like bfs / ucs recovery (see strategy_store.commit).
+    """
+    load_resources()
+    view = as_view(game_state)
+    if view.is_game_over:
+        return None
+    if len(view.patterns) == 0 and strategy_map:
+        return strategy_map.get(strategy_store.root_key(strategy_map))
+
+    current_indices = np.arange(len(ANSWER_WORDS))
+    for guess_idx, target_val in zip(view.guess_ids, view.patterns):
+        current_indices = current_indices[MATRIX[guess_idx, current_indices] == target_val]
+    if len(current_indices) == 0:
+        return None
+
+    state_id = tuple(current_indices.tolist())
+    if state_id in strategy_map:
+        return strategy_map[state_id]
+
+    print(f"Off-script state ({len(current_indices)} candidates). Thinking with A*...")
+    # A session overlay keeps this to itself until the serialized merge + save
+    solve_node(current_indices.astype(np.int32), len(view.patterns), float('inf'), strategy_map)
+    strategy_store.commit(strategy_map, save_strategy)
+    return strategy_map.get(state_id)
+
+def use_strategy_map(game_state, strategy_map):
+    """bot_tester entry point: same as get_next_guess."""
+    return get_next_guess(game_state, strategy_map)
+
+if __name__ == "__main__":
+    strategy = load_strategy()
+    if not strategy:
+        strategy = astar_solve_by_state(start_word="salet")
+        save_strategy(strategy)
+
+    g = game.Game()
+    g.new_game()
+    while True:
+        state = g.response
+        next_guess = get_next_guess(game_state=state, strategy_map=strategy)
+        print(f"The bot suggests: {next_guess}.")
+        if not next_guess:
+            print("No valid guess found. Exiting game.")
+            break
+        guess = input("Enter your guess (or 'exit' to quit): ").strip().lower()
+        if guess == 'exit':
+            print("Exiting game.")
+            break
+        res = g.add_guess(guess)
+        print(f"Response: {res}")
+        print(f"Progress: {g.response['progress']}")
+        print(f"Responses: {g.response['response']}")
+        if g.response["is_game_over"]:
+            if res == "Win":
+                print(f"Won in {len(g.response['response'])} moves.")
+            else:
+                print(f"Lost. The answer was: {g.answer}.")
+            break
@@ -0,0 +1,119 @@
+import argparse
+import itertools
+import json
+import sys
+import time
+import lexicon
+import pattern_matrix
+import solver_registry
+import wordHandle
+from state import State
+
+# Bulk next-guess queries. Reads one JSON game history per line:
+#
+#   {"id": 17, "history": [["salet", "BYBBG"], ["crony", [0, 0, 2, 0, 1]]]}
+#   {"id": 18, "progress": ["salet", ""], "response": ["BYBBG"]}   (game_state form)
+#
+# and writes one result per line, in input order:
+#
+#   {"id": 17, "word": "dowdy", "candidates": 3}
+#   {"id": 19, "error": "'zzzzz' is not an allowed word"}
+#
+# Input is handled CHUNK_LINES lines at a time, so memory stays bounded for
+# any input size. Inside a chunk identical histories are answered once, and
+# the solver is asked once per distinct state (see solver_registry).
+#
+#   python batch_suggest.py histories.jsonl --solver bfs > suggestions.jsonl
+
+CHUNK_LINES = 20_000
+
+def parse_history(record: dict):
+    """StateView for one input record."""
+    state = State()
+    if "history" in record:
+        pairs = record["history"]
+    else:
+        pairs = [(w, r) for w, r in zip(record.get("progress", []), record.get("response", [])) if w]
+    for guess, response in pairs:
+        guess_id = lexicon.get_lexicon().word_id(str(guess).lower())
+        if guess_id < 0:
+            raise ValueError(f"'{guess}' is not an allowed word")
+        state.push(guess_id, wordHandle.to_pattern(response, lexicon.get_lexicon().word_length))
+    return state.view()
+
+def answer_chunk(solver, lines: list[str]) -> list[dict]:
+    """One result dict per input line."""
+    results = [None] * len(lines)
+    distinct = {}  # history_key -> (view, positions)
+    for i, line in enumerate(lines):
+        results[i] = {}
+        try:
+            record = json.loads(line)
+            if "id" in record:
+                results[i]["id"] = record["id"]
+            view = parse_history(record)
+        except Exception as e:
+            results[i]["error"] = str(e)
+            continue
+        distinct.setdefault(view.history_key, (view, []))[1].append(i)
+
+    # One batch: shared prefix filtering, lookups, then one compute_many for the misses
+    keys = list(distinct)
+    answers = dict(zip(keys, solver.answer_many([distinct[key][0] for key in keys])))
+
+    for key, (_, positions) in distinct.items():
+        word, candidates = answers[key]
+        for i in positions:
+            results[i]["word"] = word
+            results[i]["candidates"] = None if candidates is None else int(candidates)
+    return results
+
+def load_solver(solver_name: str, mmap: bool = False):
+    """
+    The loaded solver. mmap=True memory-maps the matrix, writing its .npy
+    sidecar first if there is none (see pattern_matrix.load_matrix).
+    """
+    lexicon.get_lexicon()
+    pattern_matrix.load_matrix(mmap=mmap)
+    solver = solver_registry.get(solver_name)
+    solver.load()
+    return solver
+
+def run(solver_name: str, source, sink, chunk_lines: int = CHUNK_LINES, mmap: bool = False) -> int:
+    """Streams source (lines) to sink. Returns the number of records answered."""
+    solver = load_solver(solver_name, mmap)
+    lines = (line for line in source if line.strip())
+    total = 0
+    start_time = time.time()
+    while True:
+        chunk = list(itertools.islice(lines, chunk_lines))
+        if not chunk:
+            break
+        for result in answer_chunk(solver, chunk):
+            sink.write(json.dumps(result) + "\n")
+        sink.flush()
+        total += len(chunk)
+        print(f"Answered: {total} | Time: {time.time()-start_time:.1f}s", file=sys.stderr)
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer JSONL game histories with a solver, streaming JSONL out.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file (default: stdin)")
+    parser.add_argument("--output", "-o", default="-", help="JSONL file to write (default: stdout)")
+    parser.add_argument("--solver", default="bfs", choices=solver_registry.names())
+    parser.add_argument("--chunk", type=int, default=CHUNK_LINES, help="Lines held in memory at once")
+    parser.add_argument("--mmap", action="store_true", help="Memory-map the matrix (writes its .npy sidecar if missing)")
+    args = parser.parse_args()
+
+    # Solver loading logs go to stderr so stdout carries only results
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    source = sys.stdin if args.input == "-" else open(args.input, "r")
+    sink = stdout if args.output == "-" else open(args.output, "w")
+    try:
+        run(args.solver, source, sink, args.chunk, args.mmap)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not stdout:
+            sink.close()
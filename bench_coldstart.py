@@ -0,0 +1,146 @@
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Cold-start benchmark: for each solver (and main.py, i.e. the UI with its
+# default solver) a fresh interpreter times
+#   import   - importing the module (should read no files, see load_resources)
+#   first    - from there to the first suggestion for a new game
+# and the results are appended to decision_tree/coldstart_times.json:
+#
+#   {"runs": [{"date": "...", "results": {"bfs": {"import": 0.16, "first": 1.2, "word": "salet"}, ...}}]}
+#
+# Each run is compared with the median of the previous BASELINE_RUNS runs;
+# a time more than REGRESSION_RATIO times its baseline (and slower by at
+# least REGRESSION_FLOOR seconds) is reported as a regression.
+#
+# Solvers are timed through solver_registry (load, then suggest). Tree
+# solvers answer from their saved strategy (the root entry); one with no
+# saved strategy is reported as such rather than built here.
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "coldstart_times.json")
+BASELINE_RUNS = 5
+REGRESSION_RATIO = 1.5
+REGRESSION_FLOOR = 0.05  # seconds
+
+# name -> module imported first (the solver_registry name, or "main" for the UI)
+TARGETS = {
+    "dfs": "dfs_solver",
+    "minimax": "heuristic_minimax",
+    "entropy": "heuristic_entropy",
+    "bfs": "bfs_solver",
+    "ucs": "ucs_solver",
+    "astar": "aStar_solver",
+    "main": "main",
+}
+UI_DEFAULT_SOLVER = "DFS"  # UI.WordleApp.selected_algo at startup
+
+def first_suggestion(name: str, module):
+    """The suggestion for a new game, loading whatever the solver needs."""
+    import game
+    g = game.Game()
+    g.new_game()
+    if name == "main":
+        return module.UI.SOLVER_LOADERS[UI_DEFAULT_SOLVER]()(g.response)
+    import solver_registry
+    solver = solver_registry.get(name)
+    solver.load()
+    try:
+        return solver.suggest(g.response)
+    except LookupError:
+        return None  # no saved strategy: building one is not a cold start
+
+def run_child(name: str) -> dict:
+    """Runs inside the fresh interpreter: times one target."""
+    import importlib
+    import contextlib
+    import io
+    module_name = TARGETS[name]
+    with contextlib.redirect_stdout(io.StringIO()):  # solver progress prints
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        imported = time.perf_counter()
+        word = first_suggestion(name, module)
+        done = time.perf_counter()
+    return {"import": round(imported - start, 4), "first": round(done - imported, 4), "word": word}
+
+def measure(name: str, repeat: int) -> dict:
+    """Best of repeat fresh-interpreter runs of one target."""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            return {"error": (result.stderr.strip().splitlines() or ["failed"])[-1]}
+        timing = json.loads(result.stdout.strip().splitlines()[-1])
+        if best is None or timing["import"] + timing["first"] < best["import"] + best["first"]:
+            best = timing
+    return best
+
+def load_history(path: str = HISTORY_FILE) -> dict:
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_history(history: dict, path: str = HISTORY_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=1)
+
+def regressions(results: dict, history: dict) -> list:
+    """(target, field, seconds, baseline) for every time well above its recent median."""
+    found = []
+    recent = history["runs"][-BASELINE_RUNS:]
+    for name, timing in results.items():
+        for field in ("import", "first"):
+            if field not in timing:
+                continue
+            past = sorted(run["results"][name][field] for run in recent if field in run["results"].get(name, {}))
+            if not past:
+                continue
+            baseline = past[len(past) // 2]
+            if timing[field] > baseline * REGRESSION_RATIO and timing[field] - baseline >= REGRESSION_FLOOR:
+                found.append((name, field, timing[field], baseline))
+    return found
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time imports and first suggestions from a cold start.")
+    parser.add_argument("targets", nargs="*", help=f"Targets (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh runs per target (best kept)")
+    parser.add_argument("--no-record", action="store_true", help="Compare only, do not append to the history")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child)))
+        sys.exit(0)
+    unknown = [name for name in args.targets if name not in TARGETS]
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.targets or list(TARGETS):
+        results[name] = measure(name, args.repeat)
+        timing = results[name]
+        if "error" in timing:
+            print(f"{name:<8} ERROR: {timing['error']}")
+        else:
+            print(f"{name:<8} import {timing['import']:7.3f}s | first suggestion {timing['first']:7.3f}s | {timing['word'] or '(no suggestion)'}")
+
+    history = load_history()
+    found = regressions(results, history)
+    for name, field, seconds, baseline in found:
+        print(f"REGRESSION: {name} {field} {seconds:.3f}s (baseline {baseline:.3f}s)")
+    if not found:
+        print("No regressions against the recorded runs." if history["runs"] else "No recorded runs yet.")
+
+    if not args.no_record:
+        history["runs"].append({"date": datetime.datetime.now().isoformat(timespec="seconds"), "results": results})
+        save_history(history)
+        print(f"Recorded in {HISTORY_FILE}.")
+    sys.exit(1 if found else 0)
@@ -0,0 +1,87 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+import numpy as np
+import pattern_matrix
+import bfs_solver
+import ucs_solver
+
+# Times the tree builders with each matrix layout (see pattern_matrix
+# section 3) on a sample of answers and checks both build the same tree:
+#
+#   python bench_layout.py --solver bfs --words 1000 --start salet
+#
+# With `perf` on PATH every layout is also run under `perf stat` for the
+# cache-miss counts; a single layout can be run with --layout.
+
+SOLVERS = {"bfs": (bfs_solver, bfs_solver.bfs_solve_by_state), "ucs": (ucs_solver, ucs_solver.ucs_solve_by_state)}
+LAYOUTS = ["guess_major", "candidate_major"]
+PERF_EVENTS = "cache-misses,cache-references"
+
+def sample_words(module, count: int, seed: int) -> list[str]:
+    """count answers drawn with seed (every answer if count is 0 or too large)."""
+    words = list(module.ANSWER_WORDS)
+    if not count or count >= len(words):
+        return words
+    picks = np.random.default_rng(seed).choice(len(words), size=count, replace=False)
+    return [words[i] for i in sorted(picks)]
+
+def run_layout(solver: str, layout: str, words: list[str], start_word: str = None):
+    """Builds the tree with one layout. Returns (strategy_map, seconds)."""
+    module, build = SOLVERS[solver]
+    module.LAYOUT = layout
+    start = time.time()
+    if layout == "candidate_major":
+        pattern_matrix.load_answer_major()  # counted: the builder pays it on first use
+    strategy_map = build(start_word=start_word, initial_candidates=words)
+    return strategy_map, time.time() - start
+
+def perf_stat(args, layout: str) -> str:
+    """perf stat counters of one layout's run in a child process."""
+    command = ["perf", "stat", "-x", ",", "-e", PERF_EVENTS, sys.executable, os.path.abspath(__file__),
+               "--solver", args.solver, "--words", str(args.words), "--seed", str(args.seed), "--layout", layout, "--no-perf"]
+    if args.start:
+        command += ["--start", args.start]
+    result = subprocess.run(command, capture_output=True, text=True)
+    counters = []
+    for line in result.stderr.splitlines():
+        fields = line.split(",")
+        if len(fields) > 2 and fields[2] in PERF_EVENTS.split(","):
+            counters.append(f"{fields[2]}={fields[0]}")
+    return " ".join(counters) or "perf gave no counters"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the tree builders on each matrix layout.")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="bfs")
+    parser.add_argument("--words", type=int, default=1000, help="Answers sampled (0: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default=None, help="Fixed first guess (default: searched)")
+    parser.add_argument("--layout", choices=LAYOUTS, default=None, help="Run only this layout")
+    parser.add_argument("--no-perf", action="store_true", help="Skip the perf stat runs")
+    args = parser.parse_args()
+
+    module = SOLVERS[args.solver][0]
+    module.load_resources()
+    words = sample_words(module, args.words, args.seed)
+
+    results = {}
+    for layout in ([args.layout] if args.layout else LAYOUTS):
+        strategy_map, seconds = run_layout(args.solver, layout, words, args.start)
+        results[layout] = (strategy_map, seconds)
+
+    print(f"\n{args.solver} on {len(words)} answers:")
+    for layout, (strategy_map, seconds) in results.items():
+        print(f"  {layout:<16} {seconds:8.2f}s  {len(strategy_map)} states")
+    if len(results) == len(LAYOUTS):
+        same = results[LAYOUTS[0]][0] == results[LAYOUTS[1]][0]
+        print("  Trees identical." if same else "  WARNING: the layouts built different trees.")
+
+    if not args.no_perf:
+        if shutil.which("perf"):
+            for layout in results:
+                print(f"  {layout:<16} {perf_stat(args, layout)}")
+        else:
+            print("  Cache misses need `perf` on PATH (not found).")
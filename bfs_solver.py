@@ -2,70 +2,90 @@ import collections
 import os
 import time
 import pickle
+import threading
 import game
+import pattern_matrix
+import scoring
+import strategy_store
+import wordHandle
+from state import as_view
 # import tracemalloc
 import numpy as np  # Required
 
 # --- 1. GLOBAL RESOURCES ---
+# Objective used to pick each node's guess (see scoring.OBJECTIVES).
+# "worst" is the original minimax scan; e.g. "weighted_entropy" weights
+# candidates by their word_frequencies.json prior.
+OBJECTIVE = "worst"
+WORKERS = 1  # threads scoring each node's guesses (see scoring.best_guess)
+# How the tree builders read the matrix: "guess_major" gathers each node's
+# patterns from MATRIX rows; "candidate_major" keeps a (candidates x guesses)
+# block, reordered in step with the builder's id order, so a node's
+# patterns are one contiguous row slice (see pattern_matrix section 3).
+# Same tree either way; the block costs candidates x guesses bytes.
+LAYOUT = "guess_major"
 ALLOWED_MAP = {}
 MATRIX = np.array([]) # Placeholder
 ALLOWED_WORDS = []
 ANSWER_WORDS = []
+NUM_PATTERNS = wordHandle.NUM_PATTERNS  # 3**word_length, set with the matrix
+WIN_PATTERN = wordHandle.WIN_PATTERN
+_LOCK = threading.Lock()
 
 def load_resources():
-    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, ALLOWED_MAP
-
-    # SINGLETON CHECK: If already loaded, do nothing.
+    # SINGLETON CHECK: If already loaded, do nothing (no lock once loaded).
     if MATRIX.size > 0:
         return
-    
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    matrix_path = os.path.join(base_path, "pattern_matrix.pkl")
-    
+    with _LOCK:
+        if MATRIX.size == 0:
+            _load_resources()
+
+def _load_resources():
+    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, ALLOWED_MAP, NUM_PATTERNS, WIN_PATTERN
+
     print(f"Loading resources...")
-    
-    data = None
-    with open(matrix_path, "rb") as f:
-        data = pickle.load(f)
-
-    if data:
-        # Convert List-of-Lists to NumPy Uint8 Array (0-242 fits in 8 bits)
-        # This reduces memory from ~800MB to ~30MB
-        print("Converting Matrix to NumPy...")
-        MATRIX = np.array(data["matrix"], dtype=np.uint8)
-        
-        ALLOWED_WORDS = data["allowed_words"]
-        ANSWER_WORDS = data["answer_words"]
 
+    # The matrix itself is shared with the other solvers (loaded once per process)
+    matrix, allowed, answers = pattern_matrix.load_matrix()
+
+    if matrix.size > 0:
+        ALLOWED_WORDS = allowed
+        ANSWER_WORDS = answers
         ALLOWED_MAP = {w: i for i, w in enumerate(ALLOWED_WORDS)}
-        
-        print(f"Matrix Size: {MATRIX.nbytes / 1024 / 1024:.2f} MB")
-        del data
+        NUM_PATTERNS = wordHandle.num_patterns(len(ALLOWED_WORDS[0]))
+        WIN_PATTERN = wordHandle.win_pattern(len(ALLOWED_WORDS[0]))
+        MATRIX = matrix
         print("Resources loaded.")
     else:
         print("Error: pattern_matrix not found.")
 
-# --- 2. HELPER: MINIMAX LOGIC (DEFERRED BUILD) ---
-def find_best_move_for_state(current_indices, depth):
+# --- 2. HELPER: MINIMAX LOGIC ---
+def find_best_guess(candidates_arr, depth, rows=None):
     """
-    Calculates the single best move using Vectorized NumPy operations.
-    OPTIMIZED: Uses Deferred Group Construction to avoid memory churn.
+    Allowed-word id of the best move for a candidate id array (-1 if none),
+    using Vectorized NumPy operations. rows: the node's slice of the
+    builder's candidate-major block (LAYOUT), used for full scans.
     """
-    if not current_indices:
-        return None, {}
-
     best_idx = -1
     min_worst = float('inf')
-    # We NO LONGER build best_groups inside the loop
-    
-    # Convert candidates to numpy array once for fast indexing
-    candidates_arr = np.array(current_indices)
 
     # Logic: If last guess (Depth 5), must pick candidate.
     if depth == 5:
-        search_indices = [ALLOWED_MAP[ANSWER_WORDS[i]] for i in current_indices]
+        search_indices = [ALLOWED_MAP[ANSWER_WORDS[i]] for i in candidates_arr]
     else:
         search_indices = range(len(ALLOWED_WORDS))
+        if rows is not None:
+            # Columns of the block are the allowed ids themselves
+            position, _ = scoring.best_guess(candidates_arr, objective=OBJECTIVE, workers=WORKERS, rows=rows)
+            return position
+
+    if OBJECTIVE != "worst" or WORKERS > 1:
+        # All guesses scored in vectorized blocks with the selected kernel, on
+        # WORKERS threads. For "worst" this is the scan below: the first guess
+        # with the smallest worst bucket wins, early break included.
+        search_arr = np.asarray(search_indices)
+        position, _ = scoring.best_guess(candidates_arr, search_arr, OBJECTIVE, matrix=MATRIX, workers=WORKERS)
+        return int(search_arr[position])
 
     for guess_idx in search_indices:
         # 1. VECTORIZED LOOKUP
@@ -73,8 +93,8 @@ def find_best_move_for_state(current_indices, depth):
         patterns = MATRIX[guess_idx, candidates_arr]
         
         # 2. VECTORIZED COUNTING
-        # np.bincount is insanely fast for small integers (0-242)
-        counts = np.bincount(patterns, minlength=243)
+        # np.bincount is insanely fast for small integers (0-242 for 5 letters)
+        counts = np.bincount(patterns, minlength=NUM_PATTERNS)
         
         # 3. MINIMAX CHECK
         worst = counts.max()
@@ -85,36 +105,57 @@ def find_best_move_for_state(current_indices, depth):
         min_worst = worst
         best_idx = guess_idx
         
-        # --- OPTIMIZATION: DO NOT BUILD LISTS YET ---
-        # We just remember that this index is the winner so far.
-        
         if min_worst == 1: 
             break
-            
-    if best_idx != -1:
-        # --- NOW WE BUILD THE GROUPS ---
-        # We do this exactly ONCE per node.
-        best_groups = collections.defaultdict(list)
-        # Re-fetch patterns for the winner (cheap O(1) access)
-        patterns = MATRIX[best_idx, candidates_arr]
-        
-        for idx, pat in zip(current_indices, patterns):
-            best_groups[pat].append(idx)
-            
-        return ALLOWED_WORDS[best_idx], best_groups
-    
-    if current_indices:
-        return ANSWER_WORDS[current_indices[0]], {}
-        
-    return None, {}
+
+    return best_idx
+
+def find_best_move_for_state(current_indices, depth):
+    """
+    Best move for a list of candidate ids and its groups ({pattern: id array}).
+    Used for single live moves; the tree builders split nodes in place instead.
+    """
+    if len(current_indices) == 0:
+        return None, {}
+
+    candidates_arr = np.asarray(current_indices)
+    best_idx = find_best_guess(candidates_arr, depth)
+    if best_idx == -1:
+        return ANSWER_WORDS[candidates_arr[0]], {}
+
+    patterns, groups = scoring.partition(best_idx, candidates_arr)
+    return ALLOWED_WORDS[best_idx], dict(zip(patterns.tolist(), groups))
+
+def find_best_guesses(candidate_sets, depth):
+    """
+    find_best_guess for several candidate id arrays at one depth. They share
+    the guess list (every allowed word), so all are scored in one pass by
+    scoring.best_guesses_per_group; the first best guess wins, as in the scan.
+    """
+    if depth == 5:
+        return [find_best_guess(np.asarray(c), depth) for c in candidate_sets]
+    best_ids, _ = scoring.best_guesses_per_group([np.asarray(c) for c in candidate_sets], OBJECTIVE,
+                                                 np.arange(len(ALLOWED_WORDS)), matrix=MATRIX)
+    return [int(i) for i in best_ids]
+
+def layout_block(order):
+    """The builders' candidate-major block for an id order (None unless LAYOUT is "candidate_major")."""
+    if LAYOUT != "candidate_major":
+        return None
+    return pattern_matrix.candidate_major_block(order)
 
 # --- 3. BFS STATE SOLVER ---
+# Nodes are never materialized as lists: the builder keeps ONE permuted int32
+# array of answer ids and a node is an (offset, length) slice of it. Splitting
+# a node on its guess reorders its slice in place (scoring.split_slice), so
+# every child is again a contiguous slice. Ids stay ascending inside a slice,
+# so strategy keys are the same tuples as always.
 def bfs_solve_by_state(start_word: str = None, initial_candidates: list[str] = None):
     """
     Generates a strategy tree.
     """
     # tracemalloc.start()
-    queue = collections.deque()
+    queue = collections.deque()  # (offset, length, depth)
     strategy_map = {}
     visited_states = set()
     
@@ -125,6 +166,10 @@ def bfs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
                 initial_indices.append(ALLOWED_MAP[w])
     else:
         initial_indices = list(range(len(ANSWER_WORDS)))
+    order = np.array(initial_indices, dtype=np.int32)
+    rows = layout_block(order)  # reordered with order by every split_slice
+    # Keys reuse one int object per id, as the old list-built tuples did
+    key_ids = np.arange(len(ANSWER_WORDS)).astype(object)
     
     if start_word:
         start_idx = ALLOWED_MAP[start_word]
@@ -132,19 +177,11 @@ def bfs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
         strategy_map[initial_tuple] = start_word
         visited_states.add(initial_tuple)
         
-        # NumPy Optimized Splitting for Start Node
-        c_arr = np.array(initial_indices)
-        patterns = MATRIX[start_idx, c_arr]
-        
-        groups = collections.defaultdict(list)
-        for idx, pat in zip(initial_indices, patterns):
-            groups[pat].append(idx)
-            
-        for subset in groups.values():
-            if len(subset) > 0:
-                queue.append((subset, 1))
+        # In-place split for Start Node
+        for _, offset, length in scoring.split_slice(order, 0, len(order), MATRIX[start_idx, order], rows):
+            queue.append((offset, length, 1))
     else:
-        queue.append((initial_indices, 0))
+        queue.append((0, len(order), 0))
 
     start_time = time.time()
     nodes_processed = 0
@@ -152,25 +189,28 @@ def bfs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
     print(f"Starting BFS for {len(initial_indices)} candidates...")
 
     while queue:
-        current_indices, depth = queue.popleft()
-        state_id = tuple(current_indices)
+        offset, length, depth = queue.popleft()
+        node = order[offset:offset + length]
+        state_id = tuple(key_ids[node])
 
         if state_id in visited_states: continue
         visited_states.add(state_id)
 
-        if len(current_indices) == 1:
-            strategy_map[state_id] = ANSWER_WORDS[current_indices[0]]
+        if length == 1:
+            strategy_map[state_id] = ANSWER_WORDS[node[0]]
             continue
         
         if depth >= 6: continue
 
-        best_word, best_groups = find_best_move_for_state(current_indices, depth)
+        best_idx = find_best_guess(node, depth, None if rows is None else rows[offset:offset + length])
         
-        if best_word:
-            strategy_map[state_id] = best_word
-            for pat_int, subset in best_groups.items():
-                if pat_int == 242: continue 
-                queue.append((subset, depth + 1))
+        if best_idx != -1:
+            strategy_map[state_id] = ALLOWED_WORDS[best_idx]
+            for pat_int, child_offset, child_length in scoring.split_slice(order, offset, length, MATRIX[best_idx, node], rows):
+                if pat_int == WIN_PATTERN: continue 
+                queue.append((child_offset, child_length, depth + 1))
+        else:
+            strategy_map[state_id] = ANSWER_WORDS[node[0]]
             
         nodes_processed += 1
         if nodes_processed % 100 == 0:
@@ -183,16 +223,106 @@ def bfs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
     # print(f"Tree generation complete. Peak Memory Usage: {peak_mem / 1024 / 1024:.2f} MB")
     return strategy_map
 
-# --- 4. RUNTIME HELPER ---
-def load_strategy(filename="bfs_state_strategy.pkl"):
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(base_path, "decision_tree", filename)
-    if not os.path.exists(path): return {}
-    with open(path, "rb") as f: return pickle.load(f)
+# --- 3b. DEPTH-FIRST STREAMING BUILD ---
+# Same tree as bfs_solve_by_state (a node's guess does not depend on the
+# visiting order), built depth-first for bounded memory: the stack holds at
+# most one level of (offset, length) children per depth, there is no
+# visited_states set (nodes of one tree are disjoint slices, so no state
+# repeats) and finished (state, guess) entries are written to the output
+# file in chunks instead of being kept in a dict.
+#
+# The file is a sequence of pickled lists of (state, guess) pairs;
+# load_strategy_stream reads it back into a normal strategy map.
+STREAM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "bfs_strategy_stream.pkl")
+FLUSH_ENTRIES = 10_000  # entries buffered before a chunk is written
+
+def dfs_build_to_file(path: str = STREAM_FILE, start_word: str = None, initial_candidates: list[str] = None) -> int:
+    """
+    Builds the strategy tree depth-first, streaming its entries to path.
+    Returns the number of entries written.
+    """
+    if initial_candidates:
+        initial_indices = [ALLOWED_MAP[w] for w in initial_candidates if w in ALLOWED_MAP]
+    else:
+        initial_indices = list(range(len(ANSWER_WORDS)))
+    order = np.array(initial_indices, dtype=np.int32)
+    rows = layout_block(order)
+    key_ids = np.arange(len(ANSWER_WORDS)).astype(object)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    written = 0
+    buffer = []
+    stack = []  # (offset, length, depth)
+
+    with open(path, "wb") as f:
+        def flush():
+            nonlocal written
+            if buffer:
+                pickle.dump(buffer, f, protocol=pickle.HIGHEST_PROTOCOL)
+                written += len(buffer)
+                buffer.clear()
+
+        def expand(offset, length, depth, guess_idx, skip_win=True):
+            # Children pushed in reverse so they are visited in pattern order.
+            # As in bfs_solve_by_state, only a given start word keeps its win bucket.
+            children = scoring.split_slice(order, offset, length, MATRIX[guess_idx, order[offset:offset + length]], rows)
+            for pat_int, child_offset, child_length in reversed(children):
+                if pat_int == WIN_PATTERN and skip_win: continue
+                stack.append((child_offset, child_length, depth + 1))
+
+        if start_word:
+            buffer.append((tuple(key_ids[order]), start_word))
+            expand(0, len(order), 0, ALLOWED_MAP[start_word], skip_win=False)
+        else:
+            stack.append((0, len(order), 0))
+
+        start_time = time.time()
+        nodes_processed = 0
+        print(f"Starting depth-first build for {len(initial_indices)} candidates -> {path}")
+
+        while stack:
+            offset, length, depth = stack.pop()
+            node = order[offset:offset + length]
+
+            if length == 1:
+                buffer.append((tuple(key_ids[node]), ANSWER_WORDS[node[0]]))
+            elif depth < 6:
+                best_idx = find_best_guess(node, depth, None if rows is None else rows[offset:offset + length])
+                if best_idx != -1:
+                    buffer.append((tuple(key_ids[node]), ALLOWED_WORDS[best_idx]))
+                    expand(offset, length, depth, best_idx)
+                else:
+                    buffer.append((tuple(key_ids[node]), ANSWER_WORDS[node[0]]))
+
+                nodes_processed += 1
+                if nodes_processed % 100 == 0:
+                    print(f"Processed: {nodes_processed} | Stack: {len(stack)} | Written: {written} | Time: {time.time()-start_time:.1f}s")
+
+            if len(buffer) >= FLUSH_ENTRIES:
+                flush()
+        flush()
+
+    print(f"Depth-first build complete. Entries: {written} | Nodes: {nodes_processed} | Time: {time.time()-start_time:.1f}s")
+    return written
+
+def load_strategy_stream(path: str = STREAM_FILE) -> dict:
+    """Strategy map from a file written by dfs_build_to_file ({} if missing)."""
+    strategy = {}
+    if not os.path.exists(path):
+        return strategy
+    with open(path, "rb") as f:
+        while True:
+            try:
+                strategy.update(pickle.load(f))
+            except EOFError:
+                break
+    print(f"Loaded streamed strategy with {len(strategy)} states.")
+    return strategy
 
+# --- 4. RUNTIME HELPER ---
 def get_starting_word(strategy_map):
     if not strategy_map: return None
-    initial_state_id = max(strategy_map.keys(), key=len)
+    initial_state_id = strategy_store.root_key(strategy_map)
     return strategy_map.get(initial_state_id)
 
 def get_next_guess(game_state = {}, strategy_map = {}):
@@ -200,29 +330,20 @@ def get_next_guess(game_state = {}, strategy_map = {}):
     Runtime Lookup with Smart Recovery.
     Handles ANY off-script deviation by calculating the move live.
     """
-    game_progress = game_state["progress"]
-    game_responses = game_state["response"]
-    game_finished = game_state["is_game_over"]
+    # Accepts a StateView (ids + pattern ints) or the old game_state dict
+    view = as_view(game_state)
 
     # --- 1. HANDLE START OF GAME ---
     # (Optional logic commented out in your version, kept as is)
 
-    if game_finished:
+    if view.is_game_over:
         return None
 
     # --- 2. FILTER CANDIDATES BASED ON HISTORY ---
     # Start with all indices as a numpy array
     current_indices = np.arange(len(ANSWER_WORDS))
     
-    for guess, resp_list in zip(game_progress, game_responses):
-        if not guess: continue
-        if guess not in ALLOWED_MAP: continue
-        guess_idx = ALLOWED_MAP[guess]
-        
-        target_val = 0
-        for j, digit in enumerate(resp_list):
-            target_val += digit * (3 ** (4 - j))
-            
+    for guess_idx, target_val in zip(view.guess_ids, view.patterns):
         # Vectorized Filtering
         patterns = MATRIX[guess_idx, current_indices]
         mask = (patterns == target_val)
@@ -243,8 +364,9 @@ def get_next_guess(game_state = {}, strategy_map = {}):
     # --- 4. OFF-SCRIPT DETECTED (THE FIX) ---
     print(f"Off-script state detected ({len(current_indices)} candidates). Regenerating partial tree...")
     
+    # A session overlay keeps this to itself until the serialized merge + save
     strategy_map.update(bfs_solve_by_state(initial_candidates=[ANSWER_WORDS[i] for i in current_indices]))
-    save_strategy(strategy_map)
+    strategy_store.commit(strategy_map, save_strategy)
 
     # After regeneration, try lookup again
     if state_id in strategy_map:
@@ -256,8 +378,10 @@ def get_next_guess(game_state = {}, strategy_map = {}):
 def save_strategy(strategy_map):
     STRATEGY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "bfs_strategy_map.pkl")
     os.makedirs(os.path.dirname(STRATEGY_FILE), exist_ok=True)
-    with open(STRATEGY_FILE, "wb") as f:
+    # Written beside the old file and swapped in: readers never see half a pickle
+    with open(STRATEGY_FILE + ".tmp", "wb") as f:
         pickle.dump(strategy_map, f)
+    os.replace(STRATEGY_FILE + ".tmp", STRATEGY_FILE)
     print(f"Strategy map saved to {STRATEGY_FILE}. Size: {len(strategy_map)} states.")
 
 def load_strategy():
@@ -273,6 +397,15 @@ def load_strategy():
             return {}
     return {}
 
+# --- 6. SHARED STRATEGY ---
+# One read-only bfs strategy per process (see strategy_store); every game or
+# thread plays through its own copy-on-write session of it.
+def shared_strategy():
+    return strategy_store.get_store("bfs", load_strategy, save_strategy)
+
+def strategy_session():
+    return shared_strategy().session()
+
 if __name__ == "__main__":
     # input()
     # strategy = bfs_solve_by_state(start_word="crane")
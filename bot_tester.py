@@ -7,14 +7,13 @@ import importlib
 import game
 import json
 import os
+import solver_registry
+from state import as_view
 
 # --- CONFIGURATION ---
-# Which solvers to test. Format: ("module_name", "solver_func_name", "strategy_loader_func")
-# Ensure these files are in the same directory.
-SOLVERS_TO_TEST = [
-    ("ucs_solver", "use_strategy_map", "ucs_solve_by_state"),
-    ("aStar_solver", "use_strategy_map", "astar_solve_by_state")
-]
+# Which solvers to test, by solver_registry name. Tree solvers build a fresh
+# strategy per starting word; heuristics are played as they are.
+SOLVERS_TO_TEST = ["ucs", "astar"]
 
 # Which starting words to test for consistency check
 STARTING_WORDS = ["salet", "crane", "adieu", "fuzzy"]
@@ -22,13 +21,29 @@ STARTING_WORDS = ["salet", "crane", "adieu", "fuzzy"]
 # How many games to play per test configuration
 GAMES_PER_TEST = 20 # Keep small for quick testing, increase for accuracy
 
-# Answer subset (Load real answers to be fair)
-try:
-    with open(os.path.join(os.path.dirname(__file__), "pattern_matrix.json"), "r") as f:
-        ANSWERS = json.load(f)["answer_words"]
-except:
+# Answer subset (real answers to be fair), read by load_answers on first use
+ANSWERS = []
+FALLBACK_ANSWERS = ["apple", "crane", "ghost", "pound", "brave", "stone", "model", "fails", "wight", "watch"]
+
+def load_answers():
+    """
+    The matrix's answer words, read once: from the small words sidecar when
+    there is one, else from pattern_matrix.json (fallback list if neither).
+    """
+    global ANSWERS
+    if ANSWERS:
+        return ANSWERS
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    for name in ("pattern_matrix_words.json", "pattern_matrix.json"):
+        try:
+            with open(os.path.join(base_path, name), "r") as f:
+                ANSWERS = json.load(f)["answer_words"]
+            return ANSWERS
+        except (OSError, ValueError, KeyError):
+            continue
     # Fallback if matrix not found
-    ANSWERS = ["apple", "crane", "ghost", "pound", "brave", "stone", "model", "fails", "wight", "watch"]
+    ANSWERS = FALLBACK_ANSWERS
+    return ANSWERS
 
 class Capturing(list):
     """Context manager to capture stdout (print statements)"""
@@ -41,7 +56,7 @@ class Capturing(list):
         del self._stringio
         sys.stdout = self._stdout
 
-def run_single_game(game_instance, solver_module, strategy, target_word):
+def run_single_game(game_instance, solver, target_word):
     """
     Plays one full game and records stats.
     """
@@ -52,20 +67,19 @@ def run_single_game(game_instance, solver_module, strategy, target_word):
     start_time = time.perf_counter()
     
     while not game_instance.response["is_game_over"]:
-        # Capture print outputs to detect "Off-script" or "Regenerating" messages
-        with Capturing() as output:
+        # Solver output is captured so the report stays readable
+        with Capturing():
             try:
-                # Dynamic call to the solver's 'use_strategy_map' equivalent
-                # We assume the signature is (game_state, strategy_object)
-                guess = solver_module.use_strategy_map(game_instance.response, strategy)
+                # A tree miss (off-script state) is searched live: count it
+                view = as_view(game_instance.response)
+                guess, candidates = solver.lookup(view)
+                if guess is None and candidates != 0:
+                    if solver.kind == "tree":
+                        recalculations += 1
+                    guess, _ = solver.compute(view)
             except Exception as e:
                 print(f"CRASH: {e}")
                 guess = None
-
-        # Check for recalculation triggers in logs
-        for line in output:
-            if "Off-script" in line or "Regenerating" in line or "Thinking" in line:
-                recalculations += 1
         
         if not guess:
             break # Solver gave up
@@ -78,7 +92,7 @@ def run_single_game(game_instance, solver_module, strategy, target_word):
     end_time = time.perf_counter()
     
     is_win = (game_instance.response["response"] and 
-              game_instance.response["response"][-1] == [2,2,2,2,2])
+              all(d == 2 for d in game_instance.response["response"][-1]))
     
     return {
         "win": is_win,
@@ -87,19 +101,21 @@ def run_single_game(game_instance, solver_module, strategy, target_word):
         "recalcs": recalculations
     }
 
-def benchmark_solver(module_name, strategy_gen_name, start_word, param_overrides=None):
+def benchmark_solver(solver_name, start_word, param_overrides=None):
     """
     Runs a benchmark suite for a specific solver configuration.
     """
-    print(f"\n--- Testing {module_name} (Start: {start_word}) ---")
+    print(f"\n--- Testing {solver_name} (Start: {start_word}) ---")
     
     # 1. Import/Reload Module
     try:
-        mod = importlib.import_module(module_name)
-        importlib.reload(mod) # Ensure fresh state
-    except ImportError:
-        print(f"Error: Could not import {module_name}. Skipping.")
+        solver = solver_registry.get(solver_name)
+        importlib.reload(importlib.import_module(solver.module_name)) # Ensure fresh state
+        solver.load()
+    except (ImportError, KeyError) as e:
+        print(f"Error: Could not load {solver_name} ({e}). Skipping.")
         return None
+    mod = solver.module
 
     # 2. Apply Parameter Overrides (for A*/UCS f/g testing)
     if param_overrides:
@@ -108,37 +124,37 @@ def benchmark_solver(module_name, strategy_gen_name, start_word, param_overrides
             if hasattr(mod, var_name):
                 setattr(mod, var_name, value)
             else:
-                print(f"Warning: {module_name} has no attribute {var_name}")
+                print(f"Warning: {solver.module_name} has no attribute {var_name}")
 
     # 3. Memory Tracking: Strategy Generation
-    print("Generating Strategy...", end="", flush=True)
-    tracemalloc.start()
-    
-    gen_func = getattr(mod, strategy_gen_name)
-    t0 = time.perf_counter()
-    
-    # Generate Strategy
-    strategy = gen_func(start_word=start_word)
-    
-    t1 = time.perf_counter()
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    
-    gen_time = t1 - t0
-    gen_memory = peak / 1024 / 1024 # MB
-    print(f" Done. ({gen_time:.2f}s, {gen_memory:.2f} MB)")
+    gen_time = gen_memory = 0.0
+    if solver.kind == "tree":
+        print("Generating Strategy...", end="", flush=True)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        
+        # Generate Strategy (played from a private store, the saved tree is untouched)
+        solver = solver.with_strategy(solver.build(start_word=start_word))
+        
+        t1 = time.perf_counter()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        gen_time = t1 - t0
+        gen_memory = peak / 1024 / 1024 # MB
+        print(f" Done. ({gen_time:.2f}s, {gen_memory:.2f} MB)")
 
     # 4. Run Games
     g = game.Game()
     results = []
     
     # Pick random subset of answers for testing
-    test_set = ANSWERS[:GAMES_PER_TEST] 
+    test_set = load_answers()[:GAMES_PER_TEST] 
     
     print(f"Running {len(test_set)} games...")
     
     for ans in test_set:
-        res = run_single_game(g, mod, strategy, ans)
+        res = run_single_game(g, solver, ans)
         results.append(res)
 
     # 5. Aggregate Stats
@@ -149,7 +165,7 @@ def benchmark_solver(module_name, strategy_gen_name, start_word, param_overrides
     avg_recalcs = statistics.mean([r["recalcs"] for r in results])
     
     return {
-        "module": module_name,
+        "module": solver_name,
         "start_word": start_word,
         "win_rate": win_rate,
         "avg_moves": avg_moves,
@@ -177,11 +193,10 @@ def run_parameter_sweep():
     
     report = []
     
-    for algo in ["aStar_solver", "ucs_solver"]:
+    for algo in ["astar", "ucs"]:
         for config in configs:
             stats = benchmark_solver(
-                module_name=algo,
-                strategy_gen_name="astar_solve_by_state" if "aStar" in algo else "ucs_solve_by_state",
+                solver_name=algo,
                 start_word="salet",
                 param_overrides=config["params"]
             )
@@ -199,9 +214,9 @@ def main():
     all_stats = []
 
     # --- PHASE 1: General Consistency Check ---
-    for mod_name, use_func, gen_func in SOLVERS_TO_TEST:
+    for solver_name in SOLVERS_TO_TEST:
         for start_word in STARTING_WORDS:
-            stats = benchmark_solver(mod_name, gen_func, start_word)
+            stats = benchmark_solver(solver_name, start_word)
             if stats:
                 all_stats.append(stats)
 
@@ -0,0 +1,123 @@
+import argparse
+import csv
+import os
+import pickle
+import numpy as np
+import lexicon
+import pattern_matrix
+import wordHandle
+from state import as_view
+
+# History-keyed decision tables, the format of decision_tree/*_decision_tree.csv:
+#
+#   history_key,state,next_word
+#   ,N/A,stair                      <- empty history: opening guess
+#   stairBBGBB,N/A,aleck            <- after "stair" answered BBGBB, play "aleck"
+#   stairGGGGG,GGGGG,OKAY           <- solved
+#
+# A history key is every guess followed by its "GYB" response, concatenated
+# (the same string State keeps as history_key). Loading a table needs neither
+# the pattern matrix nor the strategy map, only a dict lookup per move.
+
+HEADER = ("history_key", "state", "next_word")
+SOLVED_WORD = "OKAY"
+NO_STATE = "N/A"
+
+# --- 1. EXPORT ---
+def iter_strategy_rows(strategy_map: dict):
+    """
+    Walks a strategy map (candidate-tuple -> word) from its root once, depth
+    first, and yields (history_key, state, next_word) rows. Children are found
+    by splitting each node's candidates on the chosen guess's matrix row.
+    A history table (history_key -> word, e.g. from load_table) is yielded as is.
+    """
+    if not strategy_map:
+        return
+    if isinstance(next(iter(strategy_map)), str):
+        length = lexicon.get_lexicon().word_length
+        for history_key, word in strategy_map.items():
+            yield history_key, NO_STATE if word != SOLVED_WORD else history_key[-length:], word
+        return
+
+    matrix, allowed, answers = pattern_matrix.load_matrix()
+    allowed_map = {w: i for i, w in enumerate(allowed)}
+    length = len(allowed[0])
+
+    root = max(strategy_map.keys(), key=len)
+    stack = [(root, "")]
+    while stack:
+        state_id, history = stack.pop()
+        word = strategy_map[state_id]
+        yield history, NO_STATE, word
+
+        candidates = np.array(state_id)
+        patterns = matrix[allowed_map[word], candidates]
+        # Stable sort keeps each bucket in ascending id order, like the builders' tuples
+        order = np.argsort(patterns, kind="stable")
+        sorted_patterns = patterns[order]
+        bounds = np.flatnonzero(np.diff(sorted_patterns)) + 1
+        children = []
+        for group, pattern in zip(np.split(candidates[order], bounds), sorted_patterns[np.r_[0, bounds]]):
+            child_history = history + word + wordHandle.int_to_str(int(pattern), length)
+            if pattern == wordHandle.win_pattern(length):
+                yield child_history, wordHandle.int_to_str(int(pattern), length), SOLVED_WORD
+                continue
+            child_id = tuple(group.tolist())
+            if child_id in strategy_map:
+                children.append((child_id, child_history))
+        # Reverse so buckets come out in pattern order
+        stack.extend(reversed(children))
+
+def export_table(strategy_map: dict, path: str) -> int:
+    """Streams the history-keyed table for strategy_map to a CSV file. Returns the row count."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for row in iter_strategy_rows(strategy_map):
+            writer.writerow(row)
+            rows += 1
+    print(f"Decision table saved to {path}. Size: {rows} rows.")
+    return rows
+
+# --- 2. LOAD / LOOKUP ---
+def load_table(path: str) -> dict:
+    """
+    Reads a history-keyed CSV into a dict history_key -> next word.
+    Works for either header (history_key / current_progress) and keeps the
+    solved rows so lookups can tell "solved" apart from "unknown history".
+    """
+    table = {}
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for row in reader:
+            if len(row) < 3:
+                continue
+            table[row[0]] = row[2]
+    print(f"Loaded decision table with {len(table)} histories.")
+    return table
+
+def lookup(table: dict, history_key: str):
+    """Next word for a history string, or None if solved / not in the table."""
+    word = table.get(history_key)
+    if word is None or word == SOLVED_WORD:
+        return None
+    return word.lower()
+
+def get_next_guess(game_state, table: dict):
+    view = as_view(game_state)
+    if view.is_game_over:
+        return None
+    return lookup(table, view.history_key)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a strategy map as a history-keyed decision table.")
+    parser.add_argument("strategy", help="Path to a strategy map pickle (e.g. decision_tree/bfs_strategy_map.pkl)")
+    parser.add_argument("output", help="CSV file to write")
+    args = parser.parse_args()
+
+    with open(args.strategy, "rb") as f:
+        strategy = pickle.load(f)
+    export_table(strategy, args.output)
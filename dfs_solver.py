@@ -4,7 +4,11 @@ from collections import Counter
 import os
 import csv
 import game
+import lexicon
+import pattern_matrix
 import wordHandle
+import numpy as np
+from state import as_view
 
 # test.py
 
@@ -15,89 +19,119 @@ def read_wordle_words(path: str) -> List[str]:
     """
     words: List[str] = []
     first_path = os.path.dirname(os.path.abspath(__file__))
-    with open(first_path + "\\answers\\" + path, "r", encoding="utf-8") as f:
+    with open(os.path.join(first_path, "answers", path), "r", encoding="utf-8") as f:
         for line in f:
             s = line.strip()
             if s:
                 words.append(s)
     return words
 
-words = []
-final_words = []
-words = read_wordle_words("allowed_words.txt")
-final_words = read_wordle_words("answers.txt")
+# --- Vectorized Resources (filled by load_resources) ---
+WORD_CODES = np.empty((0, 5), dtype=np.uint8)   # (N, L) letter codes of all allowed words
+ANSWER_MASK = np.zeros(0, dtype=bool)           # True where the allowed word is a possible answer
+MATRIX = np.array([], dtype=np.uint8)           # pattern matrix, used when it matches the word list
+
+def load_resources():
+    global WORD_CODES, ANSWER_MASK, MATRIX
+
+    # SINGLETON CHECK: If already loaded, do nothing.
+    if len(WORD_CODES) > 0:
+        return
+
+    lex = lexicon.get_lexicon()
+    mask = np.zeros(len(lex.allowed_words), dtype=bool)
+    mask[list(lex.answer_ids)] = True
+
+    # Only use the matrix if it is already in memory (e.g. loaded by another
+    # solver) and its ids line up with the lexicon; otherwise rows are scored on the fly.
+    if pattern_matrix.matches_lexicon():
+        MATRIX = pattern_matrix.MATRIX
+
+    ANSWER_MASK = mask
+    WORD_CODES = wordHandle.encode_words(list(lex.allowed_words))
 
 def gen_string_from_mask(mask: int) -> str:
-    str = ""
-    while mask > 0:
-        div = mask % 3
-        if div == 0:
-            str = "B" + str  # Black
-        elif div == 1:
-            str = "Y" + str  # Yellow 
-        else:
-            str = "G" + str  # Green
-        mask = mask // 3
-    while len(str) < 5:
-        str = "B" + str
-    return str
+    return wordHandle.int_to_str(mask, lexicon.get_lexicon().word_length)
+
+def dfs_codes(codes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized positional-frequency walk over an (n, L) letter-code array.
+    At each position the most frequent letter is picked (ties go to the letter
+    seen first, like Counter.most_common) and only words with it are kept.
+    Returns the picked letter codes.
+    """
+    picked = []
+    for d in range(codes.shape[1]):
+        if len(codes) == 0:
+            break
+        column = codes[:, d]
+        histogram = np.bincount(column, minlength=26)
+        letter = column[np.argmax(histogram[column] == histogram.max())]
+        picked.append(letter)
+        codes = codes[column == letter]
+    return np.array(picked, dtype=np.uint8)
 
 def dfs(d: int, ranged_words: List[str]) -> str:
     """
     Counts the frequency of characters at index 'd' for all words in the list
-    and returns the most frequent character.
+    and returns the most frequent character, followed by the rest of the walk.
     """
-    #0. Base case: stop if depth reaches 5 or no words left
-    if (d==5) or (len(ranged_words) == 0):
-        return ""
-    
-    # 1. Collect all characters at position 'd'
-    # We add a check (d < len(word)) to prevent IndexError if words have different lengths
-    characters_at_d = [word[d] for word in ranged_words if d < len(word)]
-    
-    # 2. Count the frequency of each character
-    # Example: Counter({'e': 5, 'a': 2, 's': 1})
-    frequency_map = Counter(characters_at_d)
-    
-    # Debug: Print the full counts to the console so you can see the data
-    # print(f"Frequencies at index {d}: {dict(frequency_map)}")
-    
-    # 3. Handle empty results (e.g., if the list is empty or index is out of bounds)
-    if not frequency_map:
-        return ""
-        
-    # 4. Return the character with the highest frequency
-    # most_common(1) returns a list like [('e', 5)]
-    most_frequent_char = frequency_map.most_common(1)[0][0]
-    next_ranged_words = []
-    for word in ranged_words:
-        if word[d] == most_frequent_char:
-            next_ranged_words.append(word)
-
-    return most_frequent_char+dfs(d+1, next_ranged_words)
+    codes = wordHandle.encode_words(ranged_words)[:, d:]
+    return "".join(chr(c + wordHandle.LETTER_OFFSET) for c in dfs_codes(codes))
+
+def filter_mask(view) -> np.ndarray:
+    """Boolean mask over allowed word ids that are consistent with the game history."""
+    load_resources()
+    mask = np.ones(len(WORD_CODES), dtype=bool)
+    for guess_id, pattern in zip(view.guess_ids, view.patterns):
+        if MATRIX.size > 0:
+            mask &= (MATRIX[guess_id] == pattern)
+        else:
+            remaining = np.flatnonzero(mask)
+            keep = wordHandle.get_responses(WORD_CODES[guess_id], WORD_CODES[remaining]) == pattern
+            mask[remaining[~keep]] = False
+    return mask
+
+def _move(mask: np.ndarray, guesses_made: int) -> str:
+    """The move for the allowed words left in mask."""
+    final_ids = np.flatnonzero(mask & ANSWER_MASK)
+    if len(final_ids) == 0:
+        return None # impossible history
+    if (len(final_ids) == 1 or guesses_made >= 5):
+        return lexicon.get_lexicon().word(int(final_ids[0])) # only one possible final word or the guess is the last one    
+    picked = dfs_codes(WORD_CODES[mask])
+    return "".join(chr(c + wordHandle.LETTER_OFFSET) for c in picked)
 
 def get_next_guess(game_state: dict) -> str:
-    global words
-    global final_words
-    ranged_words = words.copy()
-    ranged_final_words = final_words.copy()
-    guesses = game_state["progress"]
-    responses = game_state["response"]
-    for i in range(len(guesses) - 1):
-        guess = guesses[i]
-        response = responses[i]
-        ranged_words = [
-            word for word in ranged_words
-            if wordHandle.get_response(guess, word) == response
-        ]
-        ranged_final_words = [
-            word for word in ranged_final_words
-            if wordHandle.get_response(guess, word) == response
-        ]
-    if (len(ranged_final_words) == 1 or len(guesses) >= 6):
-        return ranged_final_words[0] # only one possible final word or the guess is the last one    
-    else:
-        return dfs(0, ranged_words)
+    view = as_view(game_state)
+    return _move(filter_mask(view), len(view.patterns))
+
+def get_next_guesses(game_states: list) -> list:
+    """
+    get_next_guess for many histories. Each (guess, pattern) test over the
+    word list is done once for the whole batch (histories share openers),
+    and histories leaving the same words get the same move.
+    """
+    load_resources()
+    rows = {}   # (guess id, pattern) -> mask of the words giving that pattern
+    moves = {}
+    results = []
+    for game_state in game_states:
+        view = as_view(game_state)
+        mask = np.ones(len(WORD_CODES), dtype=bool)
+        for key in zip(view.guess_ids, view.patterns):
+            if key not in rows:
+                guess_id, pattern = key
+                if MATRIX.size > 0:
+                    rows[key] = MATRIX[guess_id] == pattern
+                else:
+                    rows[key] = wordHandle.get_responses(WORD_CODES[guess_id], WORD_CODES) == pattern
+            mask &= rows[key]
+        key = (mask.tobytes(), len(view.patterns) >= 5)
+        if key not in moves:
+            moves[key] = _move(mask, len(view.patterns))
+        results.append(moves[key])
+    return results
     
 if __name__ == "__main__":
     first_path = os.path.dirname(os.path.abspath(__file__))
@@ -1,19 +1,20 @@
 import wordHandle
 import random
-import os
-import tkinter
+import lexicon
 from state import State
 
 class Game:
     """
     The Controller. 
-    Handles rules, file reading, and inputs.
+    Handles rules and inputs. Word lists come from the shared Lexicon.
     """
-    def __init__(self):
+    def __init__(self, rng=random):
         self.state = State()
         self.stop = False
-        with open(os.path.dirname(os.path.abspath(__file__)) + "\\answers\\allowed_words.txt", "r") as f:
-            self.answers_list = f.read().splitlines()
+        # Shared, read-once word lists: creating a Game does no file I/O after the first one
+        self.lexicon = lexicon.get_lexicon()
+        self.answers_list = self.lexicon.allowed_words
+        self.rng = rng
 
     def new_game(self, answer: str = ""):
         # We create a fresh State object rather than resetting variables manually
@@ -23,16 +24,10 @@ class Game:
 
     def set_answer(self, answer: str = ""):
         # LOGIC MOVED HERE: The Game decides the word, not the State.
-        path = os.path.dirname(os.path.abspath(__file__))
-        if answer != "":
-            with open(path + "\\answers\\answers.txt", "r") as f:
-                if answer in f.read().splitlines():
-                    self.state.answer = answer
-                    return
-        # Kept your Windows path style as requested
-        with open(path + "\\answers\\answers.txt", "r") as f:
-            self.state.answer = random.choice(f.read().splitlines())
-        self.state.answer = self.state.answer.lower()
+        if answer != "" and self.lexicon.is_answer(answer):
+            self.state.answer = answer
+            return
+        self.state.answer = self.lexicon.random_answer(self.rng)
 
     @property
     def answer(self) -> str:
@@ -44,8 +39,13 @@ class Game:
 
     @property
     def response(self) -> dict:
+        # Compatibility dict (rebuilt on every access); solvers should prefer view
         return self.state.get_data()
 
+    @property
+    def view(self):
+        return self.state.view()
+
     def add_letter(self, letter: str):
         if self.stop: return
         
@@ -53,9 +53,9 @@ class Game:
         # Check if we are out of bounds (game over state)
         if idx >= 6: return
 
-        if len(self.state.progress[-1]) < 5:
+        if len(self.state.pending) < self.lexicon.word_length:
             letter = letter.lower()
-            self.state.progress[-1] += letter
+            self.state.pending += letter
 
     def remove_letter(self):
         if self.stop: return
@@ -63,8 +63,8 @@ class Game:
         idx = self.state.current_row_index()
         if idx >= 6: return
         
-        if len(self.state.progress[-1]) > 0:
-            self.state.progress[-1] = self.state.progress[-1][:-1]
+        if len(self.state.pending) > 0:
+            self.state.pending = self.state.pending[:-1]
 
     # for UI purposes later on, use this function
     def submit_guess(self) -> str:
@@ -76,34 +76,20 @@ class Game:
         idx = self.state.current_row_index()
         if idx >= 6: return "Game Over"
 
-        guess = self.state.progress[-1]
+        guess = self.state.pending
 
         # 1. Validation Logic
-        if len(guess) != 5:
+        if len(guess) != self.lexicon.word_length:
             return "Too Short"
-        if guess not in self.answers_list:
-            self.state.progress[-1] = ""  # Clear the invalid guess
+        if not self.lexicon.is_allowed(guess):
+            self.state.pending = ""  # Clear the invalid guess
             return "Not in Word List"
-        if guess in self.state.progress[:-1]:
-            self.state.progress[-1] = ""  # Clear the invalid guess
+        guess_id = self.lexicon.word_id(guess)
+        if guess_id in self.state.guess_ids:
+            self.state.pending = ""  # Clear the invalid guess
             return "Already Guessed"
         
-        # 2. Update Logic (FIX 2: Only calculating response here, once)
-        response = wordHandle.get_response(guess, self.state.answer)
-        self.state.response.append(response)
-
-        # 3. Check Win/Loss
-        if guess == self.state.answer:
-            self.stop = True
-            return "Win"
-        elif len(self.state.response) == 6:
-            self.stop = True
-            return "Loss"
-        else:
-            if self.state.current_row_index() < 6:
-                # Prepare the next empty row
-                self.state.progress.append("")
-                return "Next Turn"
+        return self._apply_guess(guess, guess_id)
 
     def submit(self) -> str:
         """
@@ -114,35 +100,36 @@ class Game:
         idx = self.state.current_row_index()
         if idx >= 6: return "Game Over"
 
-        guess = self.state.progress[-1]
-        guess = guess.lower()
+        guess = self.state.pending.lower()
 
         # 1. Validation Logic
-        if len(guess) != 5:
+        if len(guess) != self.lexicon.word_length:
             return "Too Short"
-        if guess not in self.answers_list:
+        if not self.lexicon.is_allowed(guess):
             return "Not in Word List"
-        if guess in self.state.progress[:-1]:
+        guess_id = self.lexicon.word_id(guess)
+        if guess_id in self.state.guess_ids:
             return "Already Guessed"
 
         # print(self.state.answer)
         
+        return self._apply_guess(guess, guess_id)
+
+    def _apply_guess(self, guess: str, guess_id: int) -> str:
         # 2. Update Logic (FIX 2: Only calculating response here, once)
-        response = wordHandle.get_response(guess, self.state.answer)
-        self.state.response.append(response)
+        pattern = int(wordHandle.get_responses(guess, [self.state.answer])[0])
+        self.state.push(guess_id, pattern)
 
         # 3. Check Win/Loss
         if guess == self.state.answer:
             self.stop = True
             return "Win"
-        elif len(self.state.response) == 6:
+        elif self.state.current_row_index() == 6:
             self.stop = True
             return "Loss"
         else:
-            if self.state.current_row_index() < 6:
-                # Prepare the next empty row
-                self.state.progress.append("")
-                return "Next Turn"
+            # The next empty row is implicit (State.pending was cleared by push)
+            return "Next Turn"
 
     def add_guess(self, guess: str):
         if self.stop: return
@@ -150,7 +137,7 @@ class Game:
         idx = self.state.current_row_index()
         if idx >= 6: return
 
-        self.state.progress[-1] = guess
+        self.state.pending = guess
         return self.submit_guess()
 
     # --- CLI Debugging / Play Tool ---
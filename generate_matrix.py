@@ -1,64 +1,89 @@
+import argparse
+import pickle
+import time
+import numpy as np
+import lexicon
+import pattern_matrix
 import wordHandle
-import json
-import os
 
-def generate_pattern_matrix():
+ROW_BLOCK = 500  # guesses per vectorized block (also the progress step)
+
+def generate_pattern_matrix(allowed_file: str = None):
+    """
+    Builds matrix[guess_id][answer_id] = pattern int for every allowed word
+    against every allowed word (answers = allowed, so any word can be the target).
+    Works for any word length: patterns are stored as wordHandle.pattern_dtype(L),
+    uint8 for 5 letters and uint16 for 6-10, in pattern_matrix.pkl
+    (pattern_matrix_<L>.pkl for other lengths).
+    """
     print("Loading words...")
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    # Adjust paths to match your folder structure
-    with open(os.path.join(base_path, "answers", "allowed_words.txt"), "r") as f:
-        allowed = f.read().splitlines()
-    with open(os.path.join(base_path, "answers", "answers.txt"), "r") as f:
-        answers = allowed
+    if allowed_file:
+        allowed = lexicon._read_words(allowed_file)
+    else:
+        allowed = list(lexicon.get_lexicon().allowed_words)
+    answers = allowed
+    length = len(allowed[0])
 
-    print(f"Generating Matrix for {len(allowed)} guesses vs {len(answers)} answers...")
-    print("This will take about 1-2 minutes.")
+    print(f"Generating Matrix for {len(allowed)} guesses vs {len(answers)} answers ({length} letters)...")
 
-    # We map every word to an ID (Index)
-    # The matrix will be: matrix[guess_id][answer_id] = pattern_int
-    
-    # 1. Create Word -> ID Maps
-    allowed_map = {word: i for i, word in enumerate(allowed)}
-    answers_map = {word: i for i, word in enumerate(answers)}
-    
-    # 2. Build the Matrix
-    # Using a flat list for JSON compatibility (List of Lists)
-    matrix = []
-    
-    # Progress bar logic
-    total = len(allowed)
-    for i, guess in enumerate(allowed):
-        row = []
-        for target in answers:
-            # Get response as list [0,2,0,1,0]
-            resp_list = wordHandle.get_response(guess, target)
-            # Convert to a single integer (Base 3) for storage efficiency
-            # 0=Grey, 1=Yellow, 2=Green. 
-            # e.g., [2,0,0,0,0] -> 2*81 = 162
-            val = 0
-            for j, digit in enumerate(resp_list):
-                val += digit * (3 ** (4 - j))
-            row.append(val)
-        
-        matrix.append(row)
-        
-        if i % 500 == 0:
-            print(f"Processed {i}/{total} words...")
+    # We map every word to an ID (Index): the position in the word list
+    codes = wordHandle.encode_words(allowed)
+    matrix = np.empty((len(allowed), len(answers)), dtype=wordHandle.pattern_dtype(length))
+    start_time = time.time()
+    for start in range(0, len(codes), ROW_BLOCK):
+        matrix[start:start + ROW_BLOCK] = wordHandle.get_responses_matrix(codes[start:start + ROW_BLOCK], codes)
+        print(f"Processed {min(start + ROW_BLOCK, len(codes))}/{len(codes)} words... | Time: {time.time()-start_time:.1f}s")
 
-    # 3. Save Data
+    # Save Data (same keys as before; the matrix is now a NumPy array)
     output_data = {
         "allowed_words": allowed,
         "answer_words": answers,
+        "words_hash": pattern_matrix.words_hash(allowed, answers),
         "matrix": matrix
     }
-    
-    out_path = os.path.join(base_path, "pattern_matrix.json")
+
+    out_path = pattern_matrix.matrix_paths(length)["pickle"]
     print(f"Saving to {out_path}...")
-    with open(out_path, "w") as f:
-        json.dump(output_data, f)
-    
-    print("Done! Matrix generated.")
+    with open(out_path, "wb") as f:
+        pickle.dump(output_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print(f"Done! Matrix generated. Size: {matrix.nbytes / 1024 / 1024:.2f} MB ({matrix.dtype}).")
+    return out_path
+
+def answers_file_for(allowed_file: str, answers_file: str = None) -> str:
+    """
+    The answer list to pair with allowed_file: answers_file if given, else
+    answers.txt, or allowed_file itself when answers.txt has another word length.
+    """
+    if answers_file:
+        return answers_file
+    if len(lexicon._read_words(allowed_file)[0]) != len(lexicon._read_words(lexicon.ANSWERS_FILE)[0]):
+        return allowed_file
+    return lexicon.ANSWERS_FILE
+
+def update_pattern_matrix():
+    """
+    Brings the existing matrix up to date with the current word lists:
+    only rows / columns of added words are computed (pattern_matrix.update_matrix).
+    Generates it from scratch when there is no matrix yet.
+    """
+    pattern_matrix.ON_MISMATCH = "update"
+    matrix, _, _ = pattern_matrix.load_matrix()
+    if matrix.size == 0:
+        return generate_pattern_matrix()
+    print(f"Matrix is up to date ({pattern_matrix.loaded_hash()[:12]}).")
+    return pattern_matrix.matrix_paths()["pickle"]
 
 if __name__ == "__main__":
-    generate_pattern_matrix()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Precompute the guess x answer pattern matrix.")
+    parser.add_argument("--allowed", default=None, help="Word list (in answers/ or an absolute path); default: allowed_words.txt")
+    parser.add_argument("--answers", default=None, help="Answer list for --update (default: answers.txt, or the --allowed list when its word length differs)")
+    parser.add_argument("--update", action="store_true", help="Patch the existing matrix for edited word lists instead of rebuilding")
+    args = parser.parse_args()
+    if args.update:
+        if args.allowed or args.answers:
+            allowed_file = args.allowed or lexicon.ALLOWED_FILE
+            lexicon.use_word_lists(allowed_file, answers_file_for(allowed_file, args.answers))
+        update_pattern_matrix()
+    else:
+        generate_pattern_matrix(args.allowed)
@@ -6,7 +6,12 @@ import csv
 import math
 import json
 # import game
+import lexicon
+import opening_book
+import scoring
 import wordHandle
+import numpy as np
+from state import as_view
 
 # test.py
 def read_wordle_words(path: str) -> List[str]:
@@ -16,7 +21,7 @@ def read_wordle_words(path: str) -> List[str]:
     """
     words: List[str] = []
     first_path = os.path.dirname(os.path.abspath(__file__))
-    with open(first_path + "\\answers\\" + path, "r", encoding="utf-8") as f:
+    with open(os.path.join(first_path, "answers", path), "r", encoding="utf-8") as f:
         for line in f:
             s = line.strip()
             if s:
@@ -26,79 +31,166 @@ def read_wordle_words(path: str) -> List[str]:
 longest_path = []
 words = []
 final_words = []
-words = read_wordle_words("allowed_words.txt")
-final_words = read_wordle_words("answers.txt")
+
+def load_resources():
+    """Reads the word lists on first use (importing the module reads nothing)."""
+    global words, final_words
+
+    # SINGLETON CHECK: If already loaded, do nothing.
+    if final_words:
+        return
+    words = read_wordle_words("allowed_words.txt")
+    final_words = read_wordle_words("answers.txt")
 hsh = ""
 data = []
-pattern_matrix = {}
-precompute_log = {i: math.log(i, 2) if i > 0 else 0.0 for i in range(len(final_words) + 1)}
-with open("pattern_matrix.json", "r") as f:
-    pattern_matrix = json.load(f)
+
+# Two-step lookahead tuning: how many one-ply leaders are re-scored, and how
+# long (seconds) a move may spend on them before settling for the best so far.
+BEAM_WIDTH = 8
+TIME_BUDGET = 2.0
+# One-ply scoring objective (see scoring.OBJECTIVES), e.g. "weighted_entropy"
+# to favour splits of the likely (frequent) answers.
+OBJECTIVE = "entropy"
+GROUP_BATCH = 32  # candidate sets scored together by get_next_guesses
 
 def response_str_to_int(response_str: str) -> int:
-    result = 0
-    for i in range(5):
-        if response_str[i] == 'G':
-            val = 2
-        elif response_str[i] == 'Y':
-            val = 1
-        else:
-            val = 0
-        result += val * (3 ** (4 - i))
-    return result
+    return wordHandle.to_pattern(response_str)
+
+def candidate_ids(view) -> np.ndarray:
+    """Answer ids still consistent with every (guess, pattern) in the history."""
+    ids = np.array(lexicon.get_lexicon().answer_ids, dtype=np.int32)
+    for guess_id, pattern in zip(view.guess_ids, view.patterns):
+        ids = ids[scoring.pattern_block([guess_id], ids)[0] == pattern]
+    return ids
+
+def _quick_move(view):
+    """(word, ids): the move when no scoring is needed, otherwise (None, candidate ids)."""
+    if len(view.patterns) == 0:
+        return "salet", None  # Best known first guess 
+
+    # Second move: precomputed in the opening book when the opener is in it
+    book_word = opening_book.lookup(view, OBJECTIVE)
+    if book_word:
+        return book_word, None
+
+    ids = candidate_ids(view)
+    if len(ids) == 1 or (len(ids) > 0 and len(view.patterns) >= 5):
+        return lexicon.get_lexicon().word(int(ids[0])), None  # Only one possible final word or the guess is the last one
+    return None, ids
 
 def get_next_guess(game_state: dict) -> str:
-    global words
-    global final_words
-    global pattern_matrix
-    global precompute_log
-    guesses = game_state["progress"]
-    responses = game_state["response"]
-
-    if len(guesses) == 0:
+    word, ids = _quick_move(as_view(game_state))
+    if word is not None or len(ids) == 0:
+        return word
+
+    scores = scoring.score_guesses(ids, objective=OBJECTIVE)
+    return lexicon.get_lexicon().word(scoring.best_index(scores, OBJECTIVE))
+
+def get_next_guesses(game_states: list) -> list:
+    """
+    get_next_guess for many histories. Histories that leave the same
+    candidate set (past the opening book) get the same move, so each distinct
+    set is scored once, GROUP_BATCH sets together (see
+    scoring.best_guesses_per_group).
+    """
+    results = [None] * len(game_states)
+    pending = {}  # candidate set -> (ids, positions)
+    for i, game_state in enumerate(game_states):
+        word, ids = _quick_move(as_view(game_state))
+        if word is not None or len(ids) == 0:
+            results[i] = word
+        else:
+            pending.setdefault(ids.tobytes(), (ids, []))[1].append(i)
+
+    lex = lexicon.get_lexicon()
+    pending = list(pending.values())
+    for start in range(0, len(pending), GROUP_BATCH):
+        # One pass over the guesses scores the whole batch of candidate sets
+        batch = pending[start:start + GROUP_BATCH]
+        best_ids, _ = scoring.best_guesses_per_group([ids for ids, _ in batch], OBJECTIVE)
+        for (_, positions), best_id in zip(batch, best_ids):
+            for i in positions:
+                results[i] = lex.word(int(best_id))
+    return results
+
+# --- Two-Step Lookahead ---
+def best_followup_entropies(guess_id: int, ids: np.ndarray):
+    """
+    Splits ids on guess_id and, for every bucket that still needs work,
+    finds the best one-ply entropy any guess achieves inside it.
+    All buckets are scored together: columns are labelled with their bucket
+    so one bincount per block of guesses counts every (guess, bucket) pair.
+    Returns (bucket sizes, best entropies) for those buckets.
+    """
+    lex = lexicon.get_lexicon()
+    patterns, groups = scoring.partition(guess_id, ids)
+    open_groups = [grp for pat, grp in zip(patterns, groups) if len(grp) > 1 and pat != lex.win_pattern]
+    if not open_groups:
+        return np.zeros(0), np.zeros(0)
+
+    sizes = np.array([len(grp) for grp in open_groups], dtype=np.float64)
+    columns = np.concatenate(open_groups)
+    labels = np.repeat(np.arange(len(open_groups)), sizes.astype(np.int64))
+    width = len(open_groups) * lex.num_patterns
+    rows_per_block = max(1, (1 << 21) // width)
+
+    best = np.zeros(len(open_groups))
+    guess_ids = scoring.ALL_GUESS_IDS
+    for start in range(0, len(guess_ids), rows_per_block):
+        block = scoring.pattern_block(guess_ids[start:start + rows_per_block], columns)
+        counts = scoring.bucket_counts(block, labels, len(open_groups))
+        h = scoring.entropy(counts.reshape(len(block), len(open_groups), lex.num_patterns))
+        np.maximum(best, h.max(axis=0), out=best)
+    return sizes, best
+
+def get_next_guess_lookahead(game_state: dict, beam_width: int = None, time_budget: float = None) -> str:
+    """
+    Like get_next_guess, but re-scores the top beam_width one-ply guesses by
+    expected two-step information: H1(g) + sum_b p_b * max_g' H(g' | b).
+    A beam entry is skipped when even the upper bound H1 + sum_b p_b * min(log2 n_b, log2 num_patterns)
+    cannot beat the best so far, and the beam stops once time_budget is spent.
+    """
+    beam_width = BEAM_WIDTH if beam_width is None else beam_width
+    time_budget = TIME_BUDGET if time_budget is None else time_budget
+    t0 = perf_counter()
+    view = as_view(game_state)
+
+    if len(view.patterns) == 0:
         return "salet"  # Best known first guess 
 
-    ranged_final_words = final_words.copy()
-    for i in range(len(guesses)):
-        guess = guesses[i]
-        response = responses[i]
-        ranged_final_words = [
-            word for word in ranged_final_words
-            if pattern_matrix["matrix"][
-                pattern_matrix["allowed_words"].index(guess)][
-                pattern_matrix["answer_words"].index(word)] == response_str_to_int(response)
-        ]
-
-    if len(ranged_final_words) == 1 or len(guesses) >= 5:
-        return ranged_final_words[0]  # Only one possible final word or the guess is the last one
-
-    max_entropy = 0.0
-    best_word = ""
-    total = len(ranged_final_words)
-
-    for word in words:
-        i = pattern_matrix["allowed_words"].index(word)
-        dict_response_count = Counter(
-            pattern_matrix["matrix"][i][
-                pattern_matrix["answer_words"].index(final_word)]
-            for final_word in ranged_final_words
-        )
-        # Calculate entropy
-        c = 0.0
-        for count in dict_response_count.values():
-            c += count * precompute_log[count]
-            if c > (precompute_log[total] - max_entropy) * total:
-                break  # Early stopping if we already exceed max_entropy
-        entropy = precompute_log[total] - c / total
-
-        if entropy > max_entropy:
-            max_entropy = entropy
-            best_word = word
-
-    return best_word
+    ids = candidate_ids(view)
+    if len(ids) == 0:
+        return None
+    lex = lexicon.get_lexicon()
+    if len(ids) <= 2 or len(view.patterns) >= 5:
+        return lex.word(int(ids[0]))
+
+    h1 = scoring.score_guesses(ids, objective="entropy")
+    beam = np.argsort(-h1, kind="stable")[:max(1, beam_width)]
+    n = float(len(ids))
+    log2_patterns = math.log2(lex.num_patterns)
+
+    best_guess, best_score = int(beam[0]), -1.0
+    for guess_id in beam:
+        if perf_counter() - t0 > time_budget:
+            break
+        # Upper bound from bucket sizes alone (no second-ply scoring needed)
+        _, groups = scoring.partition(int(guess_id), ids)
+        sizes = np.array([len(grp) for grp in groups], dtype=np.float64)
+        bound = h1[guess_id] + (sizes / n * np.minimum(np.log2(sizes), log2_patterns)).sum()
+        if bound <= best_score:
+            continue
+
+        open_sizes, followups = best_followup_entropies(int(guess_id), ids)
+        score = h1[guess_id] + (open_sizes / n * followups).sum()
+        if score > best_score:
+            best_guess, best_score = int(guess_id), score
+
+    return lex.word(best_guess)
             
     
 if __name__ == "__main__":
+    load_resources()
     first_path = os.path.dirname(os.path.abspath(__file__))
     t0 = perf_counter()
     longest_path = []
@@ -7,7 +7,12 @@ import math
 import json
 import random
 import game
+import lexicon
+import opening_book
+import scoring
 import wordHandle
+import numpy as np
+from state import as_view
 
 
 # test.py
@@ -18,7 +23,7 @@ def read_wordle_words(path: str) -> List[str]:
     """
     words: List[str] = []
     first_path = os.path.dirname(os.path.abspath(__file__))
-    with open(first_path + "\\answers\\" + path, "r", encoding="utf-8") as f:
+    with open(os.path.join(first_path, "answers", path), "r", encoding="utf-8") as f:
         for line in f:
             s = line.strip()
             if s:
@@ -27,65 +32,87 @@ def read_wordle_words(path: str) -> List[str]:
 
 words = []
 final_words = []
-words = read_wordle_words("allowed_words.txt")
-final_words = read_wordle_words("answers.txt")
+
+def load_resources():
+    """Reads the word lists on first use (importing the module reads nothing)."""
+    global words, final_words
+
+    # SINGLETON CHECK: If already loaded, do nothing.
+    if final_words:
+        return
+    words = read_wordle_words("allowed_words.txt")
+    final_words = read_wordle_words("answers.txt")
+
+# Scoring objective (see scoring.OBJECTIVES); "weighted_worst" bounds the
+# worst bucket by answer probability mass instead of count.
+OBJECTIVE = "worst"
+GROUP_BATCH = 32  # candidate sets scored together by get_next_guesses
 
 def response_str_to_int(response_str: str) -> int:
-    result = 0
-    for i in range(5):
-        if response_str[i] == 'G':
-            val = 2
-        elif response_str[i] == 'Y':
-            val = 1
-        else:
-            val = 0
-        result += val * (3 ** (4 - i))
-    return result
+    return wordHandle.to_pattern(response_str)
 
-def get_next_guess(game_state: dict) -> str:
-    global words
-    global final_words
-    # global pattern_matrix
-    global precompute_log
+def _quick_move(game_state: dict):
+    """(word, candidate ids): the move when no scoring is needed, otherwise (None, ids)."""
+    load_resources()
     guesses = game_state['progress']
     responses = game_state['response']
 
     if len(guesses) == 1:
-        return "salet"  # Best known first guess 
+        return "salet", None  # Best known first guess 
+
+    # Second move: precomputed in the opening book when the opener is in it
+    book_word = opening_book.lookup(as_view(game_state), OBJECTIVE)
+    if book_word:
+        return book_word, None
 
     ranged_final_words = final_words.copy()
-    print(responses)
     for i in range(len(guesses) - 1):
         guess = guesses[i]
-        response = responses[i]
-        ranged_final_words = [
-            word for word in ranged_final_words
-            if wordHandle.response_to_str(wordHandle.get_response(guess, word)) == wordHandle.response_to_str(response)
-        ]
+        pattern = wordHandle.to_pattern(responses[i])
+        mask = wordHandle.get_responses(guess, ranged_final_words) == pattern
+        ranged_final_words = [word for word, keep in zip(ranged_final_words, mask) if keep]
 
+    if not ranged_final_words:
+        return None, None  # impossible history
     if len(ranged_final_words) == 1 or len(guesses) >= 5:
-        return ranged_final_words[0]  # Only one possible final word or the guess is the last one
-
-    best_word = ""
-    total = len(ranged_final_words)
-    minimax = 30000
-    for word in words:
-        max_bin = 0
-        cnt = []
-        for i in range(243):
-            cnt.append(0)
-        for final_word in ranged_final_words:
-            resp = wordHandle.response_to_int(wordHandle.get_response(word, final_word))
-            cnt[resp] += 1
-            if cnt[resp] > max_bin:
-                max_bin = cnt[resp]
-            if cnt[resp] > minimax:
-                break
-        if max_bin < minimax:
-            minimax = max_bin
-            best_word = word
-
-    return best_word
+        return ranged_final_words[0], None  # Only one possible final word or the guess is the last one
+
+    lex = lexicon.get_lexicon()
+    return None, [lex.word_id(w) for w in ranged_final_words]
+
+def get_next_guess(game_state: dict) -> str:
+    word, candidate_ids = _quick_move(game_state)
+    if candidate_ids is None:
+        return word
+
+    # Worst bucket of every allowed word, all scored in vectorized blocks.
+    # best_index keeps the first word on ties, like the original strict '<' scan
+    scores = scoring.score_guesses(candidate_ids, objective=OBJECTIVE)
+    return lexicon.get_lexicon().word(scoring.best_index(scores, OBJECTIVE))
+
+def get_next_guesses(game_states: list) -> list:
+    """
+    get_next_guess for many histories. Each distinct candidate set is scored
+    once, GROUP_BATCH sets together (see scoring.best_guesses_per_group).
+    """
+    results = [None] * len(game_states)
+    pending = {}  # candidate set -> (ids, positions)
+    for i, game_state in enumerate(game_states):
+        word, candidate_ids = _quick_move(game_state)
+        if candidate_ids is None:
+            results[i] = word
+        else:
+            pending.setdefault(tuple(candidate_ids), (candidate_ids, []))[1].append(i)
+
+    lex = lexicon.get_lexicon()
+    pending = list(pending.values())
+    for start in range(0, len(pending), GROUP_BATCH):
+        batch = pending[start:start + GROUP_BATCH]
+        best_ids, _ = scoring.best_guesses_per_group([np.asarray(ids) for ids, _ in batch], OBJECTIVE)
+        for (_, positions), best_id in zip(batch, best_ids):
+            for i in positions:
+                results[i] = lex.word(int(best_id))
+    return results
             
     
 if __name__ == "__main__":
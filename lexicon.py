@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import threading
+import wordHandle
+
+class Lexicon:
+    """
+    The allowed guesses and possible answers, read once per process.
+    Word ids are positions in allowed_words.txt, which is the same order
+    generate_matrix uses, so lexicon ids can index the pattern matrix directly.
+    Everything here is read-only and safe to share between Game instances and threads.
+    All words must have the same length (word_length); num_patterns and
+    win_pattern are the response codec values for that length.
+    """
+    __slots__ = ("allowed_words", "answer_words", "allowed_set", "answer_set", "word_to_id", "answer_ids",
+                 "word_length", "num_patterns", "win_pattern")
+
+    def __init__(self, allowed_words: list[str], answer_words: list[str]):
+        lengths = {len(w) for w in allowed_words} | {len(w) for w in answer_words}
+        if len(lengths) > 1:
+            raise ValueError(f"Word lists mix word lengths: {sorted(lengths)}")
+        self.word_length = lengths.pop() if lengths else wordHandle.WORD_LENGTH
+        wordHandle.pattern_dtype(self.word_length)  # rejects unsupported lengths
+        self.num_patterns = wordHandle.num_patterns(self.word_length)
+        self.win_pattern = wordHandle.win_pattern(self.word_length)
+
+        # Intern once so every Game/State shares the same string objects
+        self.allowed_words = tuple(sys.intern(w) for w in allowed_words)
+        self.word_to_id = {w: i for i, w in enumerate(self.allowed_words)}
+        self.answer_words = tuple(self.allowed_words[self.word_to_id[w]] if w in self.word_to_id else sys.intern(w)
+                                  for w in answer_words)
+        self.allowed_set = frozenset(self.allowed_words)
+        self.answer_set = frozenset(self.answer_words)
+        self.answer_ids = tuple(self.word_to_id[w] for w in self.answer_words if w in self.word_to_id)
+
+    def is_allowed(self, word: str) -> bool:
+        return word in self.allowed_set
+
+    def is_answer(self, word: str) -> bool:
+        return word in self.answer_set
+
+    def word_id(self, word: str) -> int:
+        """Returns the matrix id of an allowed word, or -1 if it is not allowed."""
+        return self.word_to_id.get(word, -1)
+
+    def word(self, word_id: int) -> str:
+        return self.allowed_words[word_id]
+
+    def random_answer(self, rng=random) -> str:
+        return rng.choice(self.answer_words)
+
+# --- Process-wide instance ---
+_LEXICON = None
+_LOCK = threading.Lock()
+
+ALLOWED_FILE = "allowed_words.txt"
+ANSWERS_FILE = "answers.txt"
+
+def _read_words(filename: str) -> list[str]:
+    # Relative names are looked up in answers/; absolute paths are used as is
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "answers", filename)
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+def get_lexicon() -> Lexicon:
+    """Returns the shared Lexicon, reading the word lists on first use only."""
+    global _LEXICON
+    if _LEXICON is None:
+        with _LOCK:
+            if _LEXICON is None:
+                _LEXICON = Lexicon(_read_words(ALLOWED_FILE), _read_words(ANSWERS_FILE))
+    return _LEXICON
+
+def use_word_lists(allowed_file: str, answers_file: str) -> Lexicon:
+    """
+    Switches the process to other word lists (e.g. a 6-letter variant).
+    Call it at startup, before any solver or matrix is loaded.
+    """
+    global _LEXICON, ALLOWED_FILE, ANSWERS_FILE
+    with _LOCK:
+        ALLOWED_FILE, ANSWERS_FILE = allowed_file, answers_file
+        _LEXICON = Lexicon(_read_words(allowed_file), _read_words(answers_file))
+    return _LEXICON
@@ -0,0 +1,76 @@
+import random
+import lexicon
+import wordHandle
+from state import State
+
+# Dordle / Quordle: one guess is played on K boards at once, each board with
+# its own hidden answer. A board stops taking guesses once it is solved; the
+# game is won when every board is solved within max_guesses.
+
+class MultiGame:
+    """
+    The multi-board controller. Each board keeps a plain State, so a board's
+    view() is what the single-board solvers already understand.
+    """
+    def __init__(self, boards: int = 4, max_guesses: int = None, rng=random):
+        self.boards = boards
+        # Dordle gives 7 guesses and Quordle 9: one extra per extra board
+        self.max_guesses = max_guesses if max_guesses is not None else boards + 5
+        self.lexicon = lexicon.get_lexicon()
+        self.rng = rng
+        self.states = [State() for _ in range(boards)]
+        self.guesses = []
+        self.stop = False
+
+    def new_game(self, answers: list[str] = None):
+        answers = list(answers) if answers else []
+        self.states = []
+        for i in range(self.boards):
+            answer = answers[i] if i < len(answers) and self.lexicon.is_answer(answers[i]) else self.lexicon.random_answer(self.rng)
+            self.states.append(State(answer=answer))
+        self.guesses = []
+        self.stop = False
+
+    @property
+    def answers(self) -> list[str]:
+        return [s.answer for s in self.states]
+
+    @property
+    def solved(self) -> list[bool]:
+        win = self.lexicon.win_pattern
+        return [len(s.patterns) > 0 and s.patterns[-1] == win for s in self.states]
+
+    @property
+    def views(self) -> list:
+        """One StateView per board (solved boards keep their final history)."""
+        return [s.view() for s in self.states]
+
+    @property
+    def guesses_left(self) -> int:
+        return self.max_guesses - len(self.guesses)
+
+    def add_guess(self, guess: str) -> str:
+        if self.stop: return "Game Over"
+
+        guess = guess.lower()
+        if len(guess) != self.lexicon.word_length:
+            return "Too Short"
+        guess_id = self.lexicon.word_id(guess)
+        if guess_id < 0:
+            return "Not in Word List"
+        if guess in self.guesses:
+            return "Already Guessed"
+
+        self.guesses.append(guess)
+        open_boards = [s for s, done in zip(self.states, self.solved) if not done]
+        patterns = wordHandle.get_responses(guess, [s.answer for s in open_boards])
+        for state, pattern in zip(open_boards, patterns):
+            state.push(guess_id, int(pattern))
+
+        if all(self.solved):
+            self.stop = True
+            return "Win"
+        if self.guesses_left == 0:
+            self.stop = True
+            return "Loss"
+        return "Next Turn"
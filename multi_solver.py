@@ -0,0 +1,124 @@
+import numpy as np
+import lexicon
+import scoring
+
+# Solver for MultiGame (Dordle / Quordle).
+#
+# Every guess is scored against the K boards' candidate sets in one pass:
+# the matrix rows of a block of guesses are gathered once over the union of
+# all boards' candidates, each board's columns are picked out of that slice,
+# and a single bincount (columns labelled with their board) gives every
+# (guess, board, pattern) bucket. The per-board kernel scores are then summed.
+
+OPENER = "salet"       # every board starts from the same candidates, so the single-board opener is best
+OBJECTIVE = "entropy"  # summed over boards (see scoring.OBJECTIVES)
+
+def board_candidates(views) -> list:
+    """Answer ids still possible on each board; None for boards already solved."""
+    lex = lexicon.get_lexicon()
+    all_ids = np.array(lex.answer_ids, dtype=np.int32)
+    result = []
+    for view in views:
+        if len(view.patterns) > 0 and view.patterns[-1] == lex.win_pattern:
+            result.append(None)
+            continue
+        ids = all_ids
+        for guess_id, pattern in zip(view.guess_ids, view.patterns):
+            ids = ids[scoring.pattern_block([guess_id], ids)[0] == pattern]
+        result.append(ids)
+    return result
+
+_PLOGP = np.zeros(1)
+
+def _plogp(n: int) -> np.ndarray:
+    """Table of c * log2(c) for c = 0..n (0 for c = 0)."""
+    global _PLOGP
+    if len(_PLOGP) <= n:
+        c = np.arange(max(n + 1, 2 * len(_PLOGP)), dtype=np.float64)
+        _PLOGP = np.zeros(len(c))
+        _PLOGP[1:] = c[1:] * np.log2(c[1:])
+    return _PLOGP
+
+def score_guesses_multi(candidate_sets: list, guess_ids=None, objective: str = OBJECTIVE) -> np.ndarray:
+    """
+    Per-guess sum over boards of the objective's score, all boards scored together.
+    Boards with identical candidate sets are scored once and counted once per
+    board; empty sets add nothing.
+    """
+    scoring.load_resources()
+    kernel, _, weighted = scoring.OBJECTIVES[objective]
+    num_patterns = lexicon.get_lexicon().num_patterns
+    guess_ids = scoring.ALL_GUESS_IDS if guess_ids is None else np.asarray(guess_ids)
+
+    distinct = {}
+    for ids in candidate_sets:
+        if len(ids) == 0:
+            continue
+        distinct.setdefault(ids.tobytes(), [ids, 0])[1] += 1
+    sets = [ids for ids, _ in distinct.values()]
+    multiplicity = np.array([m for _, m in distinct.values()], dtype=np.float64)
+    k = len(sets)
+
+    # One gather over the union of candidates; boards index into it
+    columns = np.concatenate(sets)
+    union, inverse = np.unique(columns, return_inverse=True)
+    labels = np.repeat(np.arange(k), [len(c) for c in sets])
+    weights = scoring.load_priors()[columns] if weighted else None
+    plogp = _plogp(max(len(c) for c in sets)) if objective == "entropy" else None
+    sizes = np.array([len(c) for c in sets], dtype=np.float64)
+
+    # Fewer guesses per block as boards are added keeps the bincount output cache-sized
+    rows = max(16, scoring.GUESS_BLOCK // k)
+    scores = np.empty(len(guess_ids), dtype=np.float64)
+    for start in range(0, len(guess_ids), rows):
+        ids = guess_ids[start:start + rows]
+        block = scoring.pattern_block(ids, union)[:, inverse]
+        counts = scoring.bucket_counts(block, labels, k, weights).reshape(len(ids), k, num_patterns)
+        if plogp is not None:
+            # Plain entropy from integer counts: log2(n) - sum(c log2 c) / n, via the table
+            per_board = np.log2(sizes) - plogp[counts].sum(axis=2) / sizes
+        else:
+            per_board = kernel(counts)
+        scores[start:start + len(ids)] = per_board @ multiplicity
+    return scores
+
+def get_next_guess(views, guesses_left: int = None, objective: str = OBJECTIVE) -> str:
+    """
+    Next guess for a list of board views (MultiGame.views).
+    guesses_left: when it equals the number of open boards, only candidates are played.
+    """
+    lex = lexicon.get_lexicon()
+    if all(len(v.patterns) == 0 for v in views):
+        return OPENER
+
+    sets = [ids for ids in board_candidates(views) if ids is not None]
+    if not sets or any(len(ids) == 0 for ids in sets):
+        return None  # solved, or an impossible history
+
+    # A board down to one word: play it (a sure solve costs no extra guess)
+    for ids in sets:
+        if len(ids) == 1:
+            return lex.word(int(ids[0]))
+
+    # Candidates first, so they win ties (scoring.best_index keeps the first)
+    scoring.load_resources()
+    candidates = np.unique(np.concatenate(sets)).astype(np.int32)
+    if guesses_left is not None and guesses_left <= len(sets):
+        guess_ids = candidates
+    else:
+        guess_ids = np.concatenate([candidates, np.setdiff1d(scoring.ALL_GUESS_IDS, candidates)])
+
+    scores = score_guesses_multi(sets, guess_ids, objective)
+    return lex.word(int(guess_ids[scoring.best_index(scores, objective)]))
+
+if __name__ == "__main__":
+    import multi_game
+    g = multi_game.MultiGame(boards=4)
+    g.new_game()
+    while True:
+        guess = get_next_guess(g.views, g.guesses_left)
+        result = g.add_guess(guess)
+        print(f"Guess: {guess} | Solved: {g.solved} | {result}")
+        if result != "Next Turn":
+            print(f"Answers: {g.answers}")
+            break
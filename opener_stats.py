@@ -0,0 +1,92 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+import lexicon
+import scoring
+
+# Scores every allowed word as an opener against the full answer list and
+# writes decision_tree/starting_word_stats.json:
+#
+#   {"answers": 2314,
+#    "fields": ["word", "entropy", "worst", "buckets", "expected"],
+#    "rows": [["soare", 5.8856, 183, 127, 62.31], ...]}
+#
+# Rows are sorted by entropy (best first); each row is a plain list so the
+# file stays compact and can be re-sorted on any field.
+
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "starting_word_stats.json")
+FIELDS = ["word", "entropy", "worst", "buckets", "expected"]
+CHUNK_SIZE = 512  # openers per task
+
+def _score_chunk(bounds):
+    """Worker: (entropy, worst, buckets, expected) for allowed ids in [start, stop)."""
+    start, stop = bounds
+    answer_ids = np.array(lexicon.get_lexicon().answer_ids, dtype=np.int32)
+    guess_ids = np.arange(start, stop, dtype=np.int32)
+    out = np.empty((len(guess_ids), 4), dtype=np.float64)
+    for s in range(0, len(guess_ids), scoring.GUESS_BLOCK):
+        ids = guess_ids[s:s + scoring.GUESS_BLOCK]
+        counts = scoring.bucket_counts(scoring.pattern_block(ids, answer_ids))
+        out[s:s + len(ids), 0] = scoring.entropy(counts)
+        out[s:s + len(ids), 1] = scoring.worst_case(counts)
+        out[s:s + len(ids), 2] = np.count_nonzero(counts, axis=1)
+        out[s:s + len(ids), 3] = scoring.expected_remaining(counts)
+    return start, out
+
+def compute_stats(processes: int = None) -> np.ndarray:
+    """(N, 4) stats for every allowed word, computed in chunks across a process pool."""
+    n_words = len(lexicon.get_lexicon().allowed_words)
+    tasks = [(s, min(s + CHUNK_SIZE, n_words)) for s in range(0, n_words, CHUNK_SIZE)]
+    stats = np.empty((n_words, 4), dtype=np.float64)
+
+    start_time = time.time()
+    with multiprocessing.Pool(processes) as pool:
+        for done, (start, out) in enumerate(pool.imap_unordered(_score_chunk, tasks), 1):
+            stats[start:start + len(out)] = out
+            if done % 5 == 0 or done == len(tasks):
+                print(f"Processed: {done}/{len(tasks)} chunks | Time: {time.time()-start_time:.1f}s")
+    return stats
+
+def save_stats(stats: np.ndarray, path: str = STATS_FILE):
+    lex = lexicon.get_lexicon()
+    order = np.lexsort((stats[:, 1], -stats[:, 0]))  # entropy desc, then worst bucket asc
+    rows = [[lex.allowed_words[i], round(float(stats[i, 0]), 4), int(stats[i, 1]), int(stats[i, 2]), round(float(stats[i, 3]), 2)]
+            for i in order]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write('{"answers": %d, "fields": %s, "rows": [\n' % (len(lex.answer_ids), json.dumps(FIELDS)))
+        f.write(",\n".join(json.dumps(row, separators=(",", ":")) for row in rows))
+        f.write("\n]}\n")
+    print(f"Opener stats saved to {path}. Size: {len(rows)} words.")
+
+# --- Readers for solvers / UI ---
+_STATS = None
+
+def load_stats(path: str = STATS_FILE) -> dict:
+    """word -> {"entropy", "worst", "buckets", "expected"}; {} if the file is missing or empty."""
+    global _STATS
+    if _STATS is not None:
+        return _STATS
+    stats = {}
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "r") as f:
+            data = json.load(f)
+        fields = data["fields"]
+        stats = {row[0]: dict(zip(fields[1:], row[1:])) for row in data["rows"]}
+    _STATS = stats
+    return _STATS
+
+def best_openers(k: int = 10, key: str = "entropy") -> list[str]:
+    """Top-k openers by one field (entropy: higher is better; the others: lower)."""
+    stats = load_stats()
+    reverse = key == "entropy"
+    return sorted(stats, key=lambda w: stats[w][key], reverse=reverse)[:k]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score every allowed word as an opener.")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    save_stats(compute_stats(args.processes))
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+import lexicon
+import scoring
+
+# Precomputed second guesses. For every opener and every pattern its first
+# guess can get back, the book stores the best second guess under each scoring
+# objective, so move two becomes a table lookup instead of a full scoring pass.
+#
+# Stored as decision_tree/opening_book.npz:
+#   openers     (O,)        int16 lexicon ids of the openers
+#   objectives  (J,)        objective names (scoring.OBJECTIVES keys)
+#   table       (O, J, P)   int16 lexicon id of the second guess, -1 = no entry
+#   words_hash  ()          sha1 of the allowed word list the ids refer to
+# (P = 3**word_length patterns, 243 for 5-letter words)
+
+OPENERS = ["salet", "crane", "stair", "adieu", "slate", "trace"]
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "opening_book.npz")
+
+_BOOK = None
+_LOCK = threading.Lock()
+
+def words_hash() -> str:
+    return hashlib.sha1("\n".join(lexicon.get_lexicon().allowed_words).encode()).hexdigest()
+
+# --- 1. BUILD ---
+def build_book(openers: list[str] = None, objectives: list[str] = None) -> dict:
+    """
+    Computes the book against the answer list. A bucket with a single answer
+    maps to that answer (as the live solvers do); larger buckets map to the
+    best guess over all allowed words for the objective.
+    """
+    openers = OPENERS if openers is None else openers
+    objectives = list(scoring.OBJECTIVES) if objectives is None else objectives
+    lex = lexicon.get_lexicon()
+    answer_ids = np.array(lex.answer_ids, dtype=np.int32)
+
+    table = np.full((len(openers), len(objectives), lex.num_patterns), -1, dtype=np.int16)
+    start_time = time.time()
+    for o, opener in enumerate(openers):
+        patterns, groups = scoring.partition(lex.word_id(opener), answer_ids)
+        open_patterns, open_groups = [], []
+        for pattern, group in zip(patterns, groups):
+            if pattern == lex.win_pattern:
+                continue
+            if len(group) == 1:
+                table[o, :, pattern] = group[0]
+            else:
+                open_patterns.append(pattern)
+                open_groups.append(group)
+
+        for j, objective in enumerate(objectives):
+            if open_groups:
+                best_ids, _ = scoring.best_guesses_per_group(open_groups, objective)
+                table[o, j, open_patterns] = best_ids
+            print(f"Book: {opener} / {objective} done | Time: {time.time()-start_time:.1f}s")
+
+    return {
+        "openers": np.array([lex.word_id(w) for w in openers], dtype=np.int16),
+        "objectives": np.array(objectives),
+        "table": table,
+        "words_hash": np.array(words_hash()),
+    }
+
+def save_book(book: dict, path: str = BOOK_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, **book)
+    print(f"Opening book saved to {path}. Size: {book['table'].shape[0]} openers x {book['table'].shape[1]} objectives.")
+
+# --- 2. LAZY LOAD / LOOKUP ---
+def load_book(path: str = BOOK_FILE) -> dict:
+    """Loads the book once; returns {} if it is missing or built for a different word list."""
+    global _BOOK
+    if _BOOK is not None:
+        return _BOOK
+    with _LOCK:
+        if _BOOK is not None:
+            return _BOOK
+        book = {}
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if str(data["words_hash"]) == words_hash():
+                    book = {
+                        "openers": {int(w): i for i, w in enumerate(data["openers"])},
+                        "objectives": {str(name): j for j, name in enumerate(data["objectives"])},
+                        "table": data["table"],
+                    }
+                else:
+                    print("Warning: opening book was built for a different word list. Ignoring it.")
+        _BOOK = book
+    return _BOOK
+
+def lookup_id(opener_id: int, pattern: int, objective: str = "entropy") -> int:
+    """Second guess id for (opener, pattern, objective), or -1 if the book has no entry."""
+    book = load_book()
+    if not book:
+        return -1
+    o = book["openers"].get(opener_id)
+    j = book["objectives"].get(objective)
+    if o is None or j is None:
+        return -1
+    return int(book["table"][o, j, pattern])
+
+def lookup(view, objective: str = "entropy"):
+    """Book move for a one-guess history (a StateView), or None."""
+    if len(view.patterns) != 1:
+        return None
+    word_id = lookup_id(view.guess_ids[0], view.patterns[0], objective)
+    return lexicon.get_lexicon().word(word_id) if word_id >= 0 else None
+
+if __name__ == "__main__":
+    save_book(build_book())
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import numpy as np
+import lexicon
+import wordHandle
+
+# --- 1. GLOBAL RESOURCES ---
+# One copy of the matrix per process, shared by every solver module.
+MATRIX = np.array([], dtype=np.uint8)
+MATRIX_T = np.array([], dtype=np.uint8)  # answer-major copy, see load_answer_major
+ALLOWED_WORDS = []
+ANSWER_WORDS = []
+WORDS_HASH = ""  # version of the loaded matrix: hash of its word lists
+
+_LOCK = threading.Lock()
+_EXPECTED = (None, "")  # (lexicon, hash) the matrix should have
+
+# What load_matrix does with a matrix built for other word lists:
+# "update" patches it incrementally (see update_matrix) and saves it,
+# "refuse" leaves the matrix unloaded (solvers then report it missing).
+ON_MISMATCH = "update"
+ROW_BLOCK = 1024  # rows remapped per step in update_matrix
+
+# Files are named after the word length of the lexicon: pattern_matrix.* for
+# the 5-letter game, pattern_matrix_6.* for 6-letter words and so on.
+# Patterns are stored as wordHandle.pattern_dtype(length) (uint8 up to 5 letters).
+#
+# The .npy file is a raw sidecar of the pickle: the matrix opened read-only
+# memory-mapped (so processes share the same page-cache pages) plus a .json
+# file with its word lists.
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+def matrix_paths(length: int = None) -> dict:
+    """Paths of the pickle / json / npy / words files for a word length (default: the lexicon's)."""
+    length = lexicon.get_lexicon().word_length if length is None else length
+    name = "pattern_matrix" if length == wordHandle.WORD_LENGTH else f"pattern_matrix_{length}"
+    return {
+        "pickle": os.path.join(BASE_PATH, name + ".pkl"),
+        "json": os.path.join(BASE_PATH, name + ".json"),
+        "npy": os.path.join(BASE_PATH, name + ".npy"),
+        "words": os.path.join(BASE_PATH, name + "_words.json"),
+        "npy_t": os.path.join(BASE_PATH, name + "_T.npy"),
+    }
+
+def _sidecar_is_fresh(paths: dict) -> bool:
+    if not (os.path.exists(paths["npy"]) and os.path.exists(paths["words"])):
+        return False
+    return not os.path.exists(paths["pickle"]) or os.path.getmtime(paths["pickle"]) <= os.path.getmtime(paths["npy"])
+
+# --- 2. VERSIONING ---
+# The matrix is versioned by the content of its word lists. Rows are the
+# allowed words and columns the answer words, which generate_matrix makes
+# the allowed words too, so only allowed_words.txt decides the version;
+# answers.txt only selects which columns are possible answers.
+def words_hash(allowed_words, answer_words) -> str:
+    digest = hashlib.sha1("\n".join(allowed_words).encode())
+    digest.update(b"\0" + "\n".join(answer_words).encode())
+    return digest.hexdigest()
+
+def expected_hash() -> str:
+    """Version a matrix for the current lexicon must have."""
+    global _EXPECTED
+    lex = lexicon.get_lexicon()
+    if _EXPECTED[0] is not lex:
+        _EXPECTED = (lex, words_hash(lex.allowed_words, lex.allowed_words))
+    return _EXPECTED[1]
+
+def loaded_hash() -> str:
+    global WORDS_HASH
+    if not WORDS_HASH and is_loaded():
+        WORDS_HASH = words_hash(ALLOWED_WORDS, ANSWER_WORDS)
+    return WORDS_HASH
+
+def matches_lexicon() -> bool:
+    """True when a matrix is loaded and its ids are the current lexicon ids."""
+    return is_loaded() and loaded_hash() == expected_hash()
+
+def update_matrix(matrix, old_allowed, old_answers, new_allowed, new_answers) -> np.ndarray:
+    """
+    Matrix for new word lists from one built for old ones. Cells of words in
+    both lists are copied (remapped to their new ids); only the rows of added
+    guesses and the columns of added answers are computed. Removed words are
+    dropped. matrix may be memory-mapped; it is read in row blocks.
+    """
+    old_rows = {w: i for i, w in enumerate(old_allowed)}
+    old_cols = {w: i for i, w in enumerate(old_answers)}
+    row_src = np.array([old_rows.get(w, -1) for w in new_allowed], dtype=np.int64)
+    col_src = np.array([old_cols.get(w, -1) for w in new_answers], dtype=np.int64)
+    kept_rows, added_rows = np.flatnonzero(row_src >= 0), np.flatnonzero(row_src < 0)
+    kept_cols, added_cols = np.flatnonzero(col_src >= 0), np.flatnonzero(col_src < 0)
+    print(f"Updating matrix: {len(added_rows)} guesses / {len(added_cols)} answers added, "
+          f"{len(old_allowed) - len(kept_rows)} / {len(old_answers) - len(kept_cols)} removed.")
+
+    start_time = time.time()
+    out = np.empty((len(new_allowed), len(new_answers)), dtype=wordHandle.pattern_dtype(len(new_allowed[0])))
+    same_columns = len(added_cols) == 0 and len(new_answers) == len(old_answers) and (col_src == np.arange(len(col_src))).all()
+    for start in range(0, len(kept_rows), ROW_BLOCK):
+        rows = kept_rows[start:start + ROW_BLOCK]
+        block = np.asarray(matrix[row_src[rows]])
+        if same_columns:
+            out[rows] = block
+        else:
+            out[rows[:, None], kept_cols[None, :]] = block[:, col_src[kept_cols]]
+
+    guess_codes = wordHandle.encode_words(list(new_allowed))
+    answer_codes = wordHandle.encode_words(list(new_answers))
+    if len(added_rows):
+        out[added_rows] = wordHandle.get_responses_matrix(guess_codes[added_rows], answer_codes)
+    if len(added_cols) and len(kept_rows):
+        out[kept_rows[:, None], added_cols[None, :]] = wordHandle.get_responses_matrix(guess_codes[kept_rows], answer_codes[added_cols])
+    print(f"Matrix updated. Time: {time.time()-start_time:.1f}s")
+    return out
+
+def save_matrix(path: str = None):
+    """Pickles the loaded matrix (with its version) to the lexicon's pattern_matrix file."""
+    path = matrix_paths(len(ALLOWED_WORDS[0]))["pickle"] if path is None else path
+    data = {"allowed_words": list(ALLOWED_WORDS), "answer_words": list(ANSWER_WORDS),
+            "words_hash": loaded_hash(), "matrix": np.asarray(MATRIX)}
+    with open(path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"Matrix saved to {path}.")
+
+def _check_version(paths: dict, mmap: bool):
+    """Applies ON_MISMATCH when the loaded matrix was built for other word lists. Called under _LOCK."""
+    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, WORDS_HASH
+    if not is_loaded() or loaded_hash() == expected_hash():
+        return
+    if ON_MISMATCH != "update":
+        print("Error: pattern_matrix was built for different word lists. Regenerate it (generate_matrix.py --update).")
+        MATRIX, ALLOWED_WORDS, ANSWER_WORDS, WORDS_HASH = np.array([], dtype=np.uint8), [], [], ""
+        return
+
+    print("pattern_matrix is stale for the current word lists.")
+    lex = lexicon.get_lexicon()
+    new_words = list(lex.allowed_words)
+    MATRIX = update_matrix(MATRIX, ALLOWED_WORDS, ANSWER_WORDS, new_words, new_words)
+    ALLOWED_WORDS, ANSWER_WORDS, WORDS_HASH = new_words, list(new_words), ""
+    save_matrix(paths["pickle"])
+    if mmap or os.path.exists(paths["npy"]):
+        save_sidecar()
+        _load_sidecar(paths)
+
+def save_sidecar():
+    """Writes the loaded matrix to its .npy sidecar + word list file."""
+    paths = matrix_paths(len(ALLOWED_WORDS[0]))
+    # Written beside the old file and swapped in, so a process that still
+    # maps the old sidecar keeps reading intact pages
+    with open(paths["npy"] + ".tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(MATRIX))
+    os.replace(paths["npy"] + ".tmp", paths["npy"])
+    with open(paths["words"], "w") as f:
+        json.dump({"allowed_words": list(ALLOWED_WORDS), "answer_words": list(ANSWER_WORDS), "words_hash": loaded_hash()}, f)
+    print(f"Matrix sidecar saved to {paths['npy']}.")
+
+def load_matrix(mmap: bool = False):
+    """
+    Loads the matrix once and returns (MATRIX, ALLOWED_WORDS, ANSWER_WORDS).
+    Later calls reuse the loaded copy. A fresh .npy sidecar is preferred and
+    opened read-only memory-mapped; otherwise the pickle (or json) is read.
+    With mmap=True a missing sidecar is written from the pickle first so the
+    matrix always ends up memory-mapped.
+    Returns an empty matrix if no matrix file exists.
+    """
+    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, WORDS_HASH
+
+    # SINGLETON CHECK: If already loaded, do nothing.
+    if MATRIX.size > 0:
+        return MATRIX, ALLOWED_WORDS, ANSWER_WORDS
+
+    with _LOCK:
+        if MATRIX.size > 0:
+            return MATRIX, ALLOWED_WORDS, ANSWER_WORDS
+
+        paths = matrix_paths()
+        if _sidecar_is_fresh(paths):
+            _load_sidecar(paths)
+            _check_version(paths, mmap)
+            return MATRIX, ALLOWED_WORDS, ANSWER_WORDS
+
+        matrix_path = paths["pickle"]
+        json_path = paths["json"]
+
+        data = None
+        if os.path.exists(matrix_path):
+            print(f"Loading from pickle: {matrix_path}")
+            with open(matrix_path, "rb") as f:
+                data = pickle.load(f)
+        elif os.path.exists(json_path):
+            print(f"Loading from json: {json_path}")
+            with open(json_path, "r") as f:
+                data = json.load(f)
+
+        if not data:
+            print("Error: pattern_matrix not found.")
+            return MATRIX, ALLOWED_WORDS, ANSWER_WORDS
+
+        # Convert List-of-Lists to the smallest NumPy dtype (0-242 fits in uint8 for 5 letters)
+        print("Converting Matrix to NumPy...")
+        ALLOWED_WORDS = data["allowed_words"]
+        ANSWER_WORDS = data["answer_words"]
+        WORDS_HASH = data.get("words_hash", "")  # older files: computed from the lists
+        MATRIX = np.asarray(data["matrix"], dtype=wordHandle.pattern_dtype(len(ALLOWED_WORDS[0])))
+        print(f"Matrix Size: {MATRIX.nbytes / 1024 / 1024:.2f} MB")
+        del data
+
+        _check_version(paths, mmap)
+        if mmap and is_loaded() and not isinstance(MATRIX, np.memmap):
+            save_sidecar()
+            _load_sidecar(paths)
+
+    return MATRIX, ALLOWED_WORDS, ANSWER_WORDS
+
+def _load_sidecar(paths: dict):
+    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, WORDS_HASH
+    print(f"Memory-mapping: {paths['npy']}")
+    with open(paths["words"], "r") as f:
+        words = json.load(f)
+    ALLOWED_WORDS = words["allowed_words"]
+    ANSWER_WORDS = words["answer_words"]
+    WORDS_HASH = words.get("words_hash", "")
+    MATRIX = np.load(paths["npy"], mmap_mode="r")
+    return MATRIX, ALLOWED_WORDS, ANSWER_WORDS
+
+def is_loaded() -> bool:
+    return MATRIX.size > 0
+
+# --- 3. LAYOUT ---
+# MATRIX is guess-major: MATRIX[guess, answer], so one guess's patterns
+# against a candidate set are a gather within one row, but scoring all
+# guesses against n candidates touches a little of every row. The tree
+# builders score all guesses at every node, so they can instead read a
+# candidate-major block (n, G): a candidate's patterns against every guess,
+# one contiguous row each. MATRIX_T is the answer-major copy it is cut
+# from: whole rows, read straight from the _T.npy sidecar when one exists.
+def load_answer_major(save: bool = False) -> np.ndarray:
+    """
+    Loads MATRIX_T (MATRIX transposed, answers as rows). A _T.npy sidecar
+    newer than the matrix is memory-mapped; otherwise the transpose is built
+    in memory (and written to the sidecar with save=True).
+    """
+    global MATRIX_T
+    if MATRIX_T.size > 0:
+        return MATRIX_T
+    load_matrix()
+    if not is_loaded():
+        return MATRIX_T
+    with _LOCK:
+        if MATRIX_T.size > 0:
+            return MATRIX_T
+        paths = matrix_paths(len(ALLOWED_WORDS[0]))
+        sources = [p for p in (paths["npy"], paths["pickle"]) if os.path.exists(p)]
+        if os.path.exists(paths["npy_t"]) and all(os.path.getmtime(p) <= os.path.getmtime(paths["npy_t"]) for p in sources):
+            transposed = np.load(paths["npy_t"], mmap_mode="r")
+            if transposed.shape == MATRIX.shape[::-1]:
+                print(f"Memory-mapping: {paths['npy_t']}")
+                MATRIX_T = transposed
+                return MATRIX_T
+        start = time.time()
+        transposed = np.empty(MATRIX.shape[::-1], dtype=MATRIX.dtype)
+        for row in range(0, MATRIX.shape[0], ROW_BLOCK):  # blockwise: a memory-mapped MATRIX streams through once
+            transposed[:, row:row + ROW_BLOCK] = MATRIX[row:row + ROW_BLOCK].T
+        print(f"Answer-major matrix built in {time.time() - start:.1f}s.")
+        if save:
+            with open(paths["npy_t"] + ".tmp", "wb") as f:
+                np.save(f, transposed)
+            os.replace(paths["npy_t"] + ".tmp", paths["npy_t"])
+            print(f"Answer-major sidecar saved to {paths['npy_t']}.")
+        MATRIX_T = transposed
+    return MATRIX_T
+
+def candidate_major_block(candidate_ids, guess_ids=None) -> np.ndarray:
+    """
+    The candidates' patterns as a contiguous (n, G) block, row i holding
+    candidate_ids[i] against every guess (or only guess_ids, in that order).
+    Same values as MATRIX[guess_ids][:, candidate_ids].T.
+    """
+    candidate_ids = np.asarray(candidate_ids)
+    transposed = load_answer_major()
+    block = transposed[candidate_ids]  # one whole row per candidate
+    if guess_ids is not None:
+        block = block[:, np.asarray(guess_ids)]
+    return np.ascontiguousarray(block)
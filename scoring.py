@@ -0,0 +1,320 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import lexicon
+import pattern_matrix
+import wordHandle
+
+# --- 1. PATTERN SOURCE ---
+# Scoring works on lexicon ids. Patterns come from the shared pattern matrix
+# when it is loaded and its ids match the lexicon; otherwise they are
+# computed on the fly with wordHandle.get_responses_matrix.
+# Bucket counts have lexicon.num_patterns (3**word_length) buckets per row.
+GUESS_BLOCK = 256  # guesses scored per vectorized block
+
+WORD_CODES = np.empty((0, 5), dtype=np.uint8)
+ALL_GUESS_IDS = np.empty(0, dtype=np.int32)
+PRIORS = np.empty(0, dtype=np.float32)  # answer prior per lexicon id, from word_frequencies.json
+
+def load_resources():
+    global WORD_CODES, ALL_GUESS_IDS
+    if len(WORD_CODES) > 0:
+        return
+    lex = lexicon.get_lexicon()
+    ALL_GUESS_IDS = np.arange(len(lex.allowed_words), dtype=np.int32)
+    WORD_CODES = wordHandle.encode_words(list(lex.allowed_words))
+
+def load_priors() -> np.ndarray:
+    """
+    Prior probability of each word being the answer, aligned with lexicon ids.
+    word_frequencies.json holds Zipf values (log10 of uses per billion words),
+    so the prior is proportional to 10 ** zipf; unknown words get zipf 0.
+    """
+    global PRIORS
+    if len(PRIORS) > 0:
+        return PRIORS
+    lex = lexicon.get_lexicon()
+    freq_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "answers", "word_frequencies.json")
+    freq = {}
+    if os.path.exists(freq_path):
+        with open(freq_path, "r") as f:
+            freq = json.load(f)
+    zipf = np.array([freq.get(w, 0.0) for w in lex.allowed_words], dtype=np.float64)
+    priors = np.power(10.0, zipf)
+    PRIORS = (priors / priors.sum()).astype(np.float32)
+    return PRIORS
+
+def matrix_matches_lexicon() -> bool:
+    return pattern_matrix.matches_lexicon()
+
+def pattern_block(guess_ids, candidate_ids, matrix=None) -> np.ndarray:
+    """
+    Patterns of each guess against each candidate, as a (G, n) array
+    (uint8 for 5 letters, see wordHandle.pattern_dtype).
+    Pass matrix to gather from a specific matrix (e.g. a solver's own MATRIX).
+    """
+    guess_ids = np.asarray(guess_ids)
+    candidate_ids = np.asarray(candidate_ids)
+    if matrix is not None:
+        return matrix[guess_ids[:, None], candidate_ids[None, :]]
+    if matrix_matches_lexicon():
+        return pattern_matrix.MATRIX[guess_ids[:, None], candidate_ids[None, :]]
+    load_resources()
+    return wordHandle.get_responses_matrix(WORD_CODES[guess_ids], WORD_CODES[candidate_ids])
+
+# --- 2. BUCKET KERNELS ---
+def bucket_counts(block: np.ndarray, groups: np.ndarray = None, n_groups: int = 1, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Bucket sizes for every row of a (G, n) pattern block in one bincount.
+    Each row's patterns are offset by row * width so all rows are counted at
+    once. With groups (a group id per column) buckets are counted separately
+    per group. With weights (one per column) each bucket holds the summed
+    weight (probability mass) instead of a count.
+    Returns (G, n_groups * num_patterns) counts (243 buckets per group for 5 letters).
+    """
+    num_patterns = lexicon.get_lexicon().num_patterns
+    rows = len(block)
+    width = n_groups * num_patterns
+    keys = block.astype(np.int32)
+    if groups is not None:
+        keys += (np.asarray(groups, dtype=np.int32) * num_patterns)[None, :]
+    keys += (np.arange(rows, dtype=np.int32) * width)[:, None]
+    if weights is not None:
+        tiled = np.broadcast_to(np.asarray(weights, dtype=np.float64), block.shape)
+        return np.bincount(keys.ravel(), weights=tiled.ravel(), minlength=rows * width).reshape(rows, width)
+    return np.bincount(keys.ravel(), minlength=rows * width).reshape(rows, width)
+
+def column_bucket_counts(block_t: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+    """
+    bucket_counts for a candidate-major (n, G) block, one column per guess:
+    the block is read in its own (row) order, so no transpose is copied.
+    Returns (G, num_patterns) counts.
+    """
+    num_patterns = lexicon.get_lexicon().num_patterns
+    rows, cols = block_t.shape
+    keys = block_t.astype(np.int32)
+    keys += (np.arange(cols, dtype=np.int32) * num_patterns)[None, :]
+    if weights is not None:
+        tiled = np.broadcast_to(np.asarray(weights, dtype=np.float64)[:, None], block_t.shape)
+        return np.bincount(keys.ravel(), weights=tiled.ravel(), minlength=cols * num_patterns).reshape(cols, num_patterns)
+    return np.bincount(keys.ravel(), minlength=cols * num_patterns).reshape(cols, num_patterns)
+
+def entropy(counts: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy (bits) of the bucket distribution along the last axis.
+    Works on plain counts and on weighted masses alike.
+    """
+    counts = counts.astype(np.float64)
+    total = counts.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plogp = np.where(counts > 0, counts * np.log2(np.where(counts > 0, counts, 1)), 0.0).sum(axis=-1)
+        result = np.log2(np.where(total > 0, total, 1)) - plogp / np.where(total > 0, total, 1)
+    return result
+
+def worst_case(counts: np.ndarray) -> np.ndarray:
+    return counts.max(axis=-1)
+
+def expected_remaining(counts: np.ndarray) -> np.ndarray:
+    """Expected size (or mass) left after the guess: sum(c^2) / n."""
+    counts = counts.astype(np.float64)
+    total = counts.sum(axis=-1)
+    return (counts * counts).sum(axis=-1) / np.where(total > 0, total, 1)
+
+# Objective name -> (kernel on bucket counts, larger_is_better, weighted by PRIORS)
+OBJECTIVES = {
+    "entropy": (entropy, True, False),
+    "worst": (worst_case, False, False),
+    "expected": (expected_remaining, False, False),
+    "weighted_entropy": (entropy, True, True),
+    "weighted_worst": (worst_case, False, True),
+    "weighted_expected": (expected_remaining, False, True),
+}
+
+# --- 3. SCORING ALL GUESSES ---
+# With WORKERS > 1 the guess range is cut into contiguous chunks (whole
+# GUESS_BLOCKs) scored on a shared thread pool. The gathers, bincounts and
+# kernels are NumPy calls that spend most of their time outside the GIL, so
+# the chunks run on separate cores. Every block is computed exactly as in the
+# serial loop, so the scores are bit-identical.
+WORKERS = 1  # threads per score_guesses / best_guess call (1 = serial)
+
+_POOL = None
+_POOL_SIZE = 0  # threads of _POOL
+_POOL_LOCK = threading.Lock()
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    """
+    The shared pool, created once with at least a thread per core and never
+    replaced (a concurrent caller may still be submitting to it). A call
+    asking for more workers than it has just queues its extra chunks.
+    """
+    global _POOL, _POOL_SIZE
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL_SIZE = max(workers, os.cpu_count() or 1)
+            _POOL = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix="scoring")
+        return _POOL
+
+def _chunks(n: int, workers: int) -> list:
+    """(start, stop) ranges of whole GUESS_BLOCKs, at most one per worker."""
+    blocks = -(-n // GUESS_BLOCK)
+    per_chunk = -(-blocks // max(1, min(workers, blocks))) * GUESS_BLOCK
+    return [(start, min(start + per_chunk, n)) for start in range(0, n, per_chunk)]
+
+def _guess_range(guess_ids, rows):
+    if rows is not None:
+        return np.arange(rows.shape[1], dtype=np.int32)
+    return ALL_GUESS_IDS if guess_ids is None else np.asarray(guess_ids)
+
+def _score_blocks(candidate_ids, guess_ids, start, stop, kernel, weights, matrix, rows=None):
+    """
+    Yields (position, scores) for each GUESS_BLOCK of guess_ids[start:stop].
+    With rows (a candidate-major block, see score_guesses) guess_ids are its
+    column positions and whole column ranges are sliced, not gathered.
+    """
+    for block_start in range(start, stop, GUESS_BLOCK):
+        block_stop = min(block_start + GUESS_BLOCK, stop)
+        if rows is not None:
+            yield block_start, kernel(column_bucket_counts(rows[:, block_start:block_stop], weights))
+            continue
+        block = pattern_block(guess_ids[block_start:block_stop], candidate_ids, matrix)
+        yield block_start, kernel(bucket_counts(block, weights=weights))
+
+def score_guesses(candidate_ids, guess_ids=None, objective: str = "entropy", matrix=None, workers: int = None, rows=None) -> np.ndarray:
+    """
+    Scores every guess (default: all allowed words) against a candidate set.
+    Weighted objectives weight each candidate by its prior, so buckets hold
+    probability mass rather than counts. workers: threads (default WORKERS).
+    rows: the candidates' patterns as a candidate-major (n, G) block (see
+    pattern_matrix.candidate_major_block); every column of it is scored and
+    guess_ids is ignored.
+    """
+    load_resources()
+    kernel, _, weighted = OBJECTIVES[objective]
+    guess_ids = _guess_range(guess_ids, rows)
+    candidate_ids = np.asarray(candidate_ids)
+    weights = load_priors()[candidate_ids] if weighted else None
+    scores = np.empty(len(guess_ids), dtype=np.float64)
+
+    def score_range(start, stop):
+        for position, block_scores in _score_blocks(candidate_ids, guess_ids, start, stop, kernel, weights, matrix, rows):
+            scores[position:position + len(block_scores)] = block_scores
+
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(guess_ids) <= GUESS_BLOCK:
+        score_range(0, len(guess_ids))
+    else:
+        pool = _pool(workers)  # one executor for every chunk of this call
+        for future in [pool.submit(score_range, a, b) for a, b in _chunks(len(guess_ids), workers)]:
+            future.result()
+    return scores
+
+def best_index(scores: np.ndarray, objective: str = "entropy") -> int:
+    """Position of the best score; the first one wins ties."""
+    _, larger_is_better, _ = OBJECTIVES[objective]
+    return int(np.argmax(scores) if larger_is_better else np.argmin(scores))
+
+def best_guess(candidate_ids, guess_ids=None, objective: str = "entropy", matrix=None, workers: int = None, rows=None):
+    """
+    (position in guess_ids, score) of the best guess; the same answer as
+    best_index(score_guesses(...)). Each chunk keeps only its running best,
+    and the chunk winners are reduced in order with a later chunk having to
+    be strictly better, so ties go to the earliest guess exactly as serially.
+    For "worst" a chunk stops at the first guess with a worst bucket of 1,
+    which nothing can beat (the early break of the solvers' minimax scans).
+    rows: as in score_guesses (the position is then a column of rows).
+    """
+    load_resources()
+    kernel, larger_is_better, weighted = OBJECTIVES[objective]
+    guess_ids = _guess_range(guess_ids, rows)
+    candidate_ids = np.asarray(candidate_ids)
+    weights = load_priors()[candidate_ids] if weighted else None
+    floor = 1 if objective == "worst" else None
+
+    def range_best(start, stop):
+        best_position, best_score = -1, None
+        for position, scores in _score_blocks(candidate_ids, guess_ids, start, stop, kernel, weights, matrix, rows):
+            i = int(np.argmax(scores) if larger_is_better else np.argmin(scores))
+            if best_score is None or ((scores[i] > best_score) if larger_is_better else (scores[i] < best_score)):
+                best_position, best_score = position + i, float(scores[i])
+            if floor is not None and best_score <= floor:
+                break
+        return best_position, best_score
+
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(guess_ids) <= GUESS_BLOCK:
+        return range_best(0, len(guess_ids))
+
+    pool = _pool(workers)  # one executor for every chunk of this call
+    futures = [pool.submit(range_best, a, b) for a, b in _chunks(len(guess_ids), workers)]
+    best_position, best_score = futures[0].result()
+    for future in futures[1:]:
+        position, score = future.result()
+        if (score > best_score) if larger_is_better else (score < best_score):
+            best_position, best_score = position, score
+    return best_position, best_score
+
+def partition(guess_id: int, candidate_ids: np.ndarray):
+    """
+    Splits candidates by their pattern against one guess.
+    Returns (patterns, groups): the distinct patterns in ascending order and the
+    candidate ids of each bucket (ascending ids within a bucket).
+    """
+    candidate_ids = np.asarray(candidate_ids)
+    row = pattern_block([guess_id], candidate_ids)[0]
+    order = np.argsort(row, kind="stable")
+    sorted_row = row[order]
+    bounds = np.flatnonzero(np.diff(sorted_row)) + 1
+    return sorted_row[np.r_[0, bounds]] if len(row) else sorted_row, np.split(candidate_ids[order], bounds)
+
+def split_slice(order: np.ndarray, offset: int, length: int, patterns: np.ndarray, rows: np.ndarray = None) -> list:
+    """
+    In-place partition for the tree builders: reorders order[offset:offset+length]
+    so each pattern's candidates form one contiguous run (a stable sort of the
+    uint8/uint16 patterns is a counting sort, so ids keep their relative order).
+    rows (a candidate-major block aligned with order) is reordered the same
+    way, so every child's block is again a contiguous row slice.
+    Returns (pattern, offset, length) per non-empty bucket, ascending by pattern.
+    """
+    node = order[offset:offset + length]
+    perm = np.argsort(patterns, kind="stable")
+    node[:] = node[perm]
+    if rows is not None:
+        rows[offset:offset + length] = rows[offset:offset + length][perm]
+    sorted_patterns = patterns[perm]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_patterns)) + 1]
+    lengths = np.diff(np.r_[starts, length])
+    return [(int(sorted_patterns[s]), offset + int(s), int(n)) for s, n in zip(starts, lengths)]
+
+def best_guesses_per_group(groups: list, objective: str = "entropy", guess_ids=None, matrix=None):
+    """
+    Best guess for each of several candidate groups, all scored together:
+    the groups' columns are concatenated and labelled with their group (a
+    candidate may appear in several groups), so one bincount per block of
+    guesses counts every (guess, group, pattern) triple. Ties go to the
+    earliest guess. Returns (best guess ids, best scores), one per group.
+    """
+    load_resources()
+    kernel, larger_is_better, weighted = OBJECTIVES[objective]
+    guess_ids = ALL_GUESS_IDS if guess_ids is None else np.asarray(guess_ids)
+    num_patterns = lexicon.get_lexicon().num_patterns
+    n_groups = len(groups)
+    columns = np.concatenate(groups)
+    labels = np.repeat(np.arange(n_groups), [len(g) for g in groups])
+    weights = load_priors()[columns] if weighted else None
+    rows_per_block = max(1, (1 << 21) // (n_groups * num_patterns))
+
+    best_ids = np.full(n_groups, -1, dtype=np.int64)
+    best_scores = np.full(n_groups, -np.inf if larger_is_better else np.inf)
+    for start in range(0, len(guess_ids), rows_per_block):
+        ids = guess_ids[start:start + rows_per_block]
+        counts = bucket_counts(pattern_block(ids, columns, matrix), labels, n_groups, weights)
+        scores = kernel(counts.reshape(len(ids), n_groups, num_patterns))  # (G, n_groups)
+        pick = np.argmax(scores, axis=0) if larger_is_better else np.argmin(scores, axis=0)
+        picked = scores[pick, np.arange(n_groups)]
+        better = picked > best_scores if larger_is_better else picked < best_scores
+        best_scores[better] = picked[better]
+        best_ids[better] = ids[pick[better]]
+    return best_ids, best_scores
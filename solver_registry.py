@@ -0,0 +1,277 @@
+import copy
+import importlib
+import numpy as np
+import lexicon
+import pattern_matrix
+import strategy_store
+import wordHandle
+from state import as_view
+
+# Every solver behind one interface, so the UI, bot_tester, the solver
+# service and batch tools drive any of them the same way:
+#
+#   solver = solver_registry.get("bfs")
+#   solver.load()                       # its resources, once per process
+#   solver.suggest(game_state)          # a game_state dict or a StateView
+#   solver.suggest_many(states)         # a batch, see answer_many
+#   game = solver.session()             # one game / UI: game.suggest(state)
+#
+# Each spec declares the resources load() reads and a rough load cost:
+#   "low"     word lists only
+#   "medium"  the pattern matrix
+#   "high"    the pattern matrix plus a strategy tree
+#
+# A move is looked up first (tree solvers answer from their shared strategy
+# map without searching) and computed only when the lookup has nothing.
+# Batches answer each distinct history once, share the candidate filtering
+# of common history prefixes and hand all the misses to compute_many, which
+# searches each distinct candidate set once: bfs / ucs misses of one depth
+# are scored GROUP_BATCH sets at a time by scoring.best_guesses_per_group,
+# heuristics go through their module's get_next_guesses.
+#
+# suggest / compute never change a strategy tree. A tree solver's session
+# recovers instead: an off-script state is solved by the module's
+# get_next_guess into the session's copy-on-write overlay, which commits
+# the new subtree to the shared store (merged and saved, see strategy_store).
+# With no saved tree at all, searching the root would mean building the
+# whole tree live, so that is refused with a LookupError.
+GROUP_BATCH = 32  # candidate sets scored together per best_guesses_per_group call
+
+# --- 1. HELPERS ---
+def candidates_for(view, cache: dict = None) -> np.ndarray:
+    """
+    Matrix column ids still consistent with the history. With a cache dict,
+    the ids after every history prefix are kept, so histories sharing a
+    prefix only filter the part after it.
+    """
+    matrix = pattern_matrix.MATRIX
+    ids = np.arange(matrix.shape[1])
+    start = 0
+    if cache is not None:
+        for k in range(len(view.patterns), 0, -1):
+            hit = cache.get((view.guess_ids[:k], view.patterns[:k]))
+            if hit is not None:
+                ids, start = hit, k
+                break
+    for k in range(start, len(view.patterns)):
+        ids = ids[matrix[view.guess_ids[k], ids] == view.patterns[k]]
+        if cache is not None:
+            cache[(view.guess_ids[:k + 1], view.patterns[:k + 1])] = ids
+    return ids
+
+def _game_state(view) -> dict:
+    """The old game_state dict: guesses plus the (empty) row being typed."""
+    allowed = lexicon.get_lexicon().allowed_words
+    return {
+        "progress": [allowed[i] for i in view.guess_ids] + [""],
+        "response": [wordHandle.int_to_response(p) for p in view.patterns],
+        "is_game_over": view.is_game_over,
+    }
+
+# --- 2. SOLVER SPECS ---
+class Solver:
+    """Common interface; subclasses provide load / lookup / compute_many."""
+    kind = ""
+
+    def __init__(self, name: str, module_name: str, resources: list[str], load_cost: str):
+        self.name = name
+        self.module_name = module_name
+        self.resources = resources  # files load() reads
+        self.load_cost = load_cost  # "low" / "medium" / "high"
+        self.module = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.module is not None
+
+    def load(self):
+        self.module = importlib.import_module(self.module_name)
+        if hasattr(self.module, "load_resources"):
+            self.module.load_resources()
+
+    def lookup(self, view, cache: dict = None):
+        """(word, candidate count) without searching; word is None when a search is needed."""
+        return None, None
+
+    def compute(self, view, cache: dict = None):
+        return self.compute_many([view], cache)[0]
+
+    def compute_many(self, views: list, cache: dict = None) -> list:
+        raise NotImplementedError
+
+    def answer_many(self, views: list, cache: dict = None) -> list:
+        """
+        (word, candidate count) per view. Identical histories are answered
+        once and every lookup miss goes to one compute_many call.
+        """
+        if not self.is_loaded:
+            self.load()
+        cache = {} if cache is None else cache  # candidate ids per history prefix
+        answers = {}
+        misses = {}
+        for view in views:
+            key = view.history_key
+            if key in answers or key in misses:
+                continue
+            if view.is_game_over:
+                answers[key] = (None, 0)
+                continue
+            word, candidates = self.lookup(view, cache)
+            if word is None and candidates != 0:
+                misses[key] = view
+            else:
+                answers[key] = (word, candidates)
+        answers.update(zip(misses, self.compute_many(list(misses.values()), cache)))
+        return [answers[view.history_key] for view in views]
+
+    def suggest(self, state):
+        """Next guess for one game_state dict or StateView (None if there is none)."""
+        return self.suggest_many([state])[0]
+
+    def suggest_many(self, states: list) -> list:
+        """suggest for many states in one batch (see answer_many)."""
+        return [word for word, _ in self.answer_many([as_view(s) for s in states])]
+
+    def session(self):
+        """Per-game handle with suggest / suggest_many (heuristics keep no state)."""
+        if not self.is_loaded:
+            self.load()
+        return self
+
+class TreeSolver(Solver):
+    """A strategy map (bfs_solver / ucs_solver / aStar_solver) shared read-only by every session."""
+    kind = "tree"
+
+    def __init__(self, name: str, module_name: str, resources: list[str], builder: str):
+        super().__init__(name, module_name, resources, "high")
+        self.builder = builder  # module function building a tree: builder(start_word=...)
+        self.store = None
+
+    def load(self):
+        module = importlib.import_module(self.module_name)
+        module.load_resources()
+        if self.store is None:
+            self.store = module.shared_strategy()
+        self.module = module
+
+    def build(self, start_word: str = None) -> dict:
+        """A new strategy map from the module's builder (nothing is saved)."""
+        if not self.is_loaded:
+            self.load()
+        return getattr(self.module, self.builder)(start_word=start_word)
+
+    def with_strategy(self, strategy_map: dict) -> "TreeSolver":
+        """The same solver answering from strategy_map instead of the shared tree."""
+        solver = copy.copy(self)
+        solver.store = strategy_store.StrategyStore(strategy_map)
+        return solver
+
+    def lookup(self, view, cache: dict = None):
+        """(word, candidate count) straight from the tree; word is None when the tree has no entry."""
+        ids = candidates_for(view, cache)
+        if len(ids) == 0:
+            return None, 0
+        # Lock-free read of the store's current (immutable) snapshot
+        strategy = self.store.base
+        if len(view.patterns) == 0 and strategy:
+            return strategy[self.store.root_key], len(ids)
+        return strategy.get(tuple(ids.tolist())), len(ids)
+
+    def check_search(self, ids):
+        """Refuses a search from the root when there is no tree to answer it."""
+        if self.store.root_key is None and len(ids) == pattern_matrix.MATRIX.shape[1]:
+            raise LookupError(f"No saved {self.name} strategy: build one first ({self.module_name}.{self.builder})")
+
+    def compute_many(self, views: list, cache: dict = None) -> list:
+        """
+        Off-script states: one live move each, without touching the shared
+        tree. Each distinct (state, depth) is searched once, and the states
+        of one depth are scored together (see best_words).
+        """
+        keys = []
+        pending = {}  # depth -> {key: candidate ids}
+        for view in views:
+            ids = candidates_for(view, cache)
+            self.check_search(ids)
+            key = (ids.tobytes(), len(view.patterns))
+            keys.append(key)
+            pending.setdefault(len(view.patterns), {}).setdefault(key, ids)
+
+        moves = {}
+        for depth, sets in pending.items():
+            items = list(sets.items())
+            for start in range(0, len(items), GROUP_BATCH):
+                batch = items[start:start + GROUP_BATCH]
+                words = self.best_words([ids for _, ids in batch], depth)
+                for (key, ids), word in zip(batch, words):
+                    moves[key] = (word, len(ids))
+        return [moves[key] for key in keys]
+
+    def best_words(self, candidate_sets: list, depth: int) -> list:
+        """The module's move for each candidate set, batched when it has find_best_guesses."""
+        module = self.module
+        if not hasattr(module, "find_best_guesses"):
+            return [module.find_best_move_for_state(ids.tolist(), depth)[0] for ids in candidate_sets]
+        best = module.find_best_guesses(candidate_sets, depth)
+        return [module.ALLOWED_WORDS[b] if b != -1 else module.ANSWER_WORDS[ids[0]] for b, ids in zip(best, candidate_sets)]
+
+    def session(self) -> "TreeSession":
+        if not self.is_loaded:
+            self.load()
+        return TreeSession(self)
+
+class TreeSession:
+    """
+    One game's (or the UI's) use of a TreeSolver. Off-script states are
+    recovered by the module's get_next_guess into a copy-on-write overlay of
+    the shared store, whose commit merges (and saves) the new subtree.
+    """
+    def __init__(self, solver: TreeSolver):
+        self.solver = solver
+        self.strategy = solver.store.session()
+
+    def suggest(self, state):
+        view = as_view(state)
+        if view.is_game_over:
+            return None
+        if self.strategy.root_key() is None:
+            self.solver.check_search(candidates_for(view))
+        return self.solver.module.get_next_guess(view, self.strategy)
+
+    def suggest_many(self, states: list) -> list:
+        return [self.suggest(state) for state in states]
+
+class HeuristicSolver(Solver):
+    """A solver module with get_next_guess(game_state); every move is computed."""
+    kind = "heuristic"
+
+    def compute(self, view, cache: dict = None):
+        return self.module.get_next_guess(_game_state(view)), None
+
+    def compute_many(self, views: list, cache: dict = None) -> list:
+        """Uses the module's get_next_guesses batch entry point when it has one."""
+        if hasattr(self.module, "get_next_guesses"):
+            return [(word, None) for word in self.module.get_next_guesses([_game_state(v) for v in views])]
+        return [self.compute(view) for view in views]
+
+# --- 3. REGISTRY ---
+WORD_LISTS = ["answers/allowed_words.txt", "answers/answers.txt"]
+MATRIX_FILES = ["pattern_matrix.npy (or .pkl / .json)"]
+
+SOLVERS = {
+    "dfs": HeuristicSolver("dfs", "dfs_solver", WORD_LISTS, "low"),
+    "bfs": TreeSolver("bfs", "bfs_solver", WORD_LISTS + MATRIX_FILES + ["decision_tree/bfs_strategy_map.pkl"], "bfs_solve_by_state"),
+    "ucs": TreeSolver("ucs", "ucs_solver", WORD_LISTS + MATRIX_FILES + ["decision_tree/ucs_strategy_map.pkl", "answers/word_frequencies.json"], "ucs_solve_by_state"),
+    "astar": TreeSolver("astar", "aStar_solver", WORD_LISTS + MATRIX_FILES + ["decision_tree/astar_strategy_map.pkl"], "astar_solve_by_state"),
+    "minimax": HeuristicSolver("minimax", "heuristic_minimax", WORD_LISTS + MATRIX_FILES + ["decision_tree/opening_book.npz"], "medium"),
+    "entropy": HeuristicSolver("entropy", "heuristic_entropy", WORD_LISTS + MATRIX_FILES + ["decision_tree/opening_book.npz"], "medium"),
+}
+
+def get(name: str) -> Solver:
+    """The registered solver called name (KeyError with the known names otherwise)."""
+    if name not in SOLVERS:
+        raise KeyError(f"Unknown solver '{name}', expected one of {list(SOLVERS)}")
+    return SOLVERS[name]
+
+def names() -> list[str]:
+    return list(SOLVERS)
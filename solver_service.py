@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import gc
+import json
+import os
+import signal
+import socket
+import time
+import uuid
+import numpy as np
+import lexicon
+import pattern_matrix
+import solver_registry
+import wordHandle
+from state import State
+
+# Local solver service: many concurrent games answered from one process.
+#
+#   POST /new_session   {"solver": "bfs"}                            -> {"session": id, "solver": ...}
+#   POST /observe       {"session": id, "guess": "salet", "response": "BYBBG"}
+#                                                                    -> {"is_game_over": ..., "guesses": n}
+#   POST /suggest       {"session": id}                              -> {"word": ..., "candidates": n}
+#                       {"solver": "bfs", "history": [["salet", "BYBBG"], ...]}  (no session needed)
+#   POST /close_session {"session": id}
+#   GET  /stats         per-endpoint count, latency and throughput of this process
+#
+# Responses may be "GYB" strings, 5-int lists or pattern ints. Every game is
+# served from the one shared (memory-mapped) matrix and strategy trees; tree
+# lookups run on the event loop, anything that has to search (heuristics,
+# off-script tree states) runs on a thread pool.
+#
+# In pre-fork mode the parent loads everything, then forks worker processes
+# that accept on the same listening socket and share those pages
+# copy-on-write. Sessions live in the worker that created them: keep one
+# connection per game (keep-alive) or send the history with /suggest.
+
+MAX_SESSIONS = 100_000  # oldest idle sessions are dropped beyond this
+LATENCY_WINDOW = 2048   # recent samples kept per endpoint for percentiles
+MAX_BODY = 1 << 20
+
+# --- 1. SOLVERS ---
+# The solver adapters (lookup in a shared tree, compute on a miss) live in
+# solver_registry; the service can serve any registered solver.
+SOLVERS = solver_registry.SOLVERS
+
+def load_solvers(names: list[str]):
+    """Loads the shared resources once, before serving (and before forking)."""
+    lexicon.get_lexicon()
+    pattern_matrix.load_matrix(mmap=True)
+    for name in names:
+        print(f"Loading solver: {name}")
+        SOLVERS[name].load()
+
+# --- 2. STATS ---
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, ok: bool):
+        self.count += 1
+        self.errors += not ok
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self, uptime: float) -> dict:
+        recent = np.array(self.recent) * 1000 if self.recent else np.zeros(1)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "per_second": round(self.count / uptime, 2) if uptime > 0 else 0.0,
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(float(np.percentile(recent, 50)), 3),
+            "p95_ms": round(float(np.percentile(recent, 95)), 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+# --- 3. SERVICE ---
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 500: "Internal Server Error"}
+
+class SolverService:
+    def __init__(self, solvers: list[str], pool_size: int = None):
+        self.solvers = solvers
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=pool_size)
+        self.sessions = collections.OrderedDict()  # id -> (solver name, State)
+        self.stats = collections.defaultdict(EndpointStats)
+        self.started = time.perf_counter()
+        self.routes = {
+            "/new_session": self.new_session,
+            "/observe": self.observe,
+            "/suggest": self.suggest,
+            "/close_session": self.close_session,
+            "/stats": self.get_stats,
+        }
+
+    def _solver_name(self, request: dict) -> str:
+        name = request.get("solver", self.solvers[0])
+        if name not in self.solvers:
+            raise ServiceError(400, f"Unknown solver '{name}'. Available: {self.solvers}")
+        return name
+
+    def _session(self, request: dict):
+        session_id = request.get("session")
+        if session_id not in self.sessions:
+            raise ServiceError(404, f"Unknown session '{session_id}'")
+        self.sessions.move_to_end(session_id)
+        return self.sessions[session_id]
+
+    # --- Endpoints ---
+    async def new_session(self, request: dict) -> dict:
+        name = self._solver_name(request)
+        session_id = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self.sessions[session_id] = (name, State())
+        while len(self.sessions) > MAX_SESSIONS:
+            self.sessions.popitem(last=False)
+        return {"session": session_id, "solver": name}
+
+    async def observe(self, request: dict) -> dict:
+        _, state = self._session(request)
+        if state.is_game_over():
+            raise ServiceError(409, "Game is already over")
+        _push(state, request.get("guess"), request.get("response"))
+        return {"is_game_over": state.is_game_over(), "guesses": len(state.patterns)}
+
+    async def suggest(self, request: dict) -> dict:
+        if "session" in request:
+            name, state = self._session(request)
+        else:
+            name = self._solver_name(request)
+            state = State()
+            for guess, response in request.get("history", []):
+                _push(state, guess, response)
+        # Solvers get the immutable view, so a later /observe cannot race a search
+        view = state.view()
+        if view.is_game_over:
+            return {"word": None, "candidates": 0}
+
+        solver = SOLVERS[name]
+        word, candidates = solver.lookup(view)
+        if word is None and candidates != 0:
+            # Needs a search: keep the event loop free for the other games
+            word, candidates = await asyncio.get_running_loop().run_in_executor(self.pool, solver.compute, view)
+        return {"word": word, "candidates": None if candidates is None else int(candidates)}
+
+    async def close_session(self, request: dict) -> dict:
+        self._session(request)
+        del self.sessions[request["session"]]
+        return {"closed": True}
+
+    async def get_stats(self, request: dict) -> dict:
+        uptime = time.perf_counter() - self.started
+        return {
+            "pid": os.getpid(),
+            "uptime": round(uptime, 1),
+            "sessions": len(self.sessions),
+            "endpoints": {path: stats.summary(uptime) for path, stats in sorted(self.stats.items())},
+        }
+
+    # --- HTTP ---
+    async def dispatch(self, path: str, body: bytes):
+        t0 = time.perf_counter()
+        handler = self.routes.get(path)
+        try:
+            if handler is None:
+                raise ServiceError(404, f"Unknown endpoint '{path}'")
+            try:
+                request = json.loads(body) if body else {}
+            except ValueError:
+                raise ServiceError(400, "Body is not valid JSON")
+            if not isinstance(request, dict):
+                raise ServiceError(400, "Body must be a JSON object")
+            status, payload = 200, await handler(request)
+        except ServiceError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        self.stats[path if handler else "other"].record(time.perf_counter() - t0, status == 200)
+        return status, payload
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 with keep-alive: one request at a time per connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                _, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = header.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY:
+                    break
+                body = await reader.readexactly(length)
+
+                status, payload = await self.dispatch(path.split("?", 1)[0], body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode()
+                writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+def _push(state: State, guess, response):
+    guess_id = lexicon.get_lexicon().word_id(str(guess or "").lower())
+    if guess_id < 0:
+        raise ServiceError(400, f"'{guess}' is not an allowed word")
+    try:
+        # A response of another length would decode with its own codec
+        pattern = wordHandle.to_pattern(response, lexicon.get_lexicon().word_length)
+    except Exception:
+        raise ServiceError(400, f"Bad response '{response}'")
+    state.push(guess_id, pattern)
+
+# --- 4. RUNNING ---
+async def serve(service: SolverService, sock: socket.socket):
+    if sock.family == getattr(socket, "AF_UNIX", None):
+        server = await asyncio.start_unix_server(service.handle_connection, sock=sock)
+    else:
+        server = await asyncio.start_server(service.handle_connection, sock=sock)
+    print(f"[{os.getpid()}] Serving on {sock.getsockname()}")
+    async with server:
+        await server.serve_forever()
+
+def make_socket(host: str, port: int, unix_path: str = None) -> socket.socket:
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(unix_path)
+        sock.listen(1024)
+        return sock
+    return socket.create_server((host, port), backlog=1024)
+
+def run(sock: socket.socket, solvers: list[str], pool_size: int = None):
+    try:
+        asyncio.run(serve(SolverService(solvers, pool_size), sock))
+    except KeyboardInterrupt:
+        pass
+
+def run_prefork(sock: socket.socket, solvers: list[str], processes: int, pool_size: int = None):
+    """Forks worker processes after loading; they share the loaded pages copy-on-write."""
+    # Move everything loaded so far out of the collector's reach so GC passes
+    # in the children do not write to (and un-share) those pages.
+    gc.freeze()
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            run(sock, solvers, pool_size)
+            os._exit(0)
+        children.append(pid)
+    print(f"Pre-forked {len(children)} workers: {children}")
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve solver suggestions for many concurrent games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--solvers", default="bfs,entropy", help=f"Comma-separated, from {list(SOLVERS)}; the first is the default")
+    parser.add_argument("--pool", type=int, default=None, help="Threads for heavy requests (default: CPU based)")
+    parser.add_argument("--processes", type=int, default=1, help="Pre-fork this many worker processes")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.solvers.split(",") if n.strip()]
+    for n in names:
+        if n not in SOLVERS:
+            parser.error(f"unknown solver '{n}'")
+    load_solvers(names)
+    listen_sock = make_socket(args.host, args.port, args.unix)
+    if args.processes > 1 and hasattr(os, "fork"):
+        run_prefork(listen_sock, names, args.processes, args.pool)
+    else:
+        run(listen_sock, names, args.pool)
@@ -1,34 +1,130 @@
-from dataclasses import dataclass
+from typing import NamedTuple
+import lexicon
+import wordHandle
+
+WIN_PATTERN = wordHandle.WIN_PATTERN  # [2, 2, 2, 2, 2]; the lexicon's win_pattern for other lengths
+MAX_GUESSES = 6
+
+class StateView(NamedTuple):
+    """
+    Read-only snapshot handed to solvers.
+    guess_ids are matrix/lexicon ids, patterns are base-3 ints (0-242 for 5 letters) and
+    history_key is the concatenation of guess + "GYB" string for every move
+    (e.g. "saletBYBBG"), the same key used by the decision_tree CSV files.
+    """
+    guess_ids: tuple
+    patterns: tuple
+    history_key: str
+    is_game_over: bool
 
-@dataclass
 class State:
-    progress: list[str]
-    response: list[list[int]]
-    answer: str
     """
-    Holds ONLY the data. 
+    Holds ONLY the data.
     It does not know about files, rules, or how to pick answers.
+    Submitted guesses are stored as ids and their responses as pattern ints;
+    the list-of-lists form is only rebuilt by get_data() for older callers.
     """
+    __slots__ = ("guess_ids", "patterns", "pending", "answer", "history_key", "_view")
+
     def __init__(self, progress=None, response=None, answer=""):
         # FIX 1: specific fix for Mutable Default Argument
-        self.progress = progress if progress is not None else [""]
-        self.response = response if response is not None else []
+        self.guess_ids = []
+        self.patterns = []
+        self.pending = ""
         self.answer = answer
+        self.history_key = ""
+        self._view = None
+
+        # Compatibility: accept the old progress / response lists. As in
+        # as_view, guesses that are empty or not in the word list are skipped.
+        progress = progress if progress is not None else [""]
+        response = response if response is not None else []
+        lex = lexicon.get_lexicon()
+        for word, resp in zip(progress, response):
+            guess_id = lex.word_id(word) if word else -1
+            if guess_id < 0:
+                continue
+            self.push(guess_id, wordHandle.to_pattern(resp, lex.word_length))
+        if len(progress) > len(response):
+            self.pending = progress[len(response)]
+
+    def push(self, guess_id: int, pattern: int):
+        """Records a submitted guess and its response; clears the input row."""
+        self.guess_ids.append(guess_id)
+        self.patterns.append(pattern)
+        lex = lexicon.get_lexicon()
+        self.history_key += lex.word(guess_id) + wordHandle.int_to_str(pattern, lex.word_length)
+        self.pending = ""
+        self._view = None
+
+    def is_game_over(self) -> bool:
+        return len(self.patterns) > 0 and (self.patterns[-1] == lexicon.get_lexicon().win_pattern or len(self.patterns) == MAX_GUESSES)
+
+    def view(self) -> StateView:
+        if self._view is None:
+            self._view = StateView(tuple(self.guess_ids), tuple(self.patterns), self.history_key, self.is_game_over())
+        return self._view
+
+    @property
+    def words(self) -> list[str]:
+        allowed = lexicon.get_lexicon().allowed_words
+        return [allowed[i] for i in self.guess_ids]
+
+    @property
+    def progress(self) -> list[str]:
+        # Submitted guesses plus the row being typed (absent once the game is over)
+        if self.is_game_over():
+            return self.words
+        return self.words + [self.pending]
+
+    @property
+    def response(self) -> list[list[int]]:
+        length = lexicon.get_lexicon().word_length
+        return [wordHandle.int_to_response(p, length) for p in self.patterns]
 
     def get_data(self) -> dict:
         return {
             "progress": self.progress,
             "response": self.response,
-            "is_game_over": False if len(self.response) == 0 else (self.response[-1] == [2, 2, 2, 2, 2] or len(self.response) == 6)
+            "is_game_over": self.is_game_over()
         }
 
     # Helper to just get the current active row index
     def current_row_index(self):
-        return len(self.response)
+        return len(self.patterns)
 
     def unwind_guess(self):
-        if len(self.progress) - len(self.response) == 1:
-            self.progress[-1] = ""
+        if not self.is_game_over():
+            self.pending = ""
 
     def get_answer(self) -> str:
-        return self.answer
\ No newline at end of file
+        return self.answer
+
+def as_view(game_state) -> StateView:
+    """
+    Accepts either a StateView or the old game_state dict
+    ({"progress": [...], "response": [...], ...}) and returns a StateView.
+    Responses may be 5-int lists, "GYB" strings or pattern ints; one that
+    does not fit the word length raises ValueError. Guesses that are empty
+    or not in the word list are skipped.
+    """
+    if isinstance(game_state, StateView):
+        return game_state
+
+    lex = lexicon.get_lexicon()
+    guess_ids = []
+    patterns = []
+    history_key = ""
+    for word, resp in zip(game_state["progress"], game_state["response"]):
+        guess_id = lex.word_id(word) if word else -1
+        if guess_id < 0:
+            continue
+        pattern = wordHandle.to_pattern(resp, lex.word_length)
+        guess_ids.append(guess_id)
+        patterns.append(pattern)
+        history_key += word + wordHandle.int_to_str(pattern, lex.word_length)
+
+    is_game_over = game_state.get("is_game_over")
+    if is_game_over is None:
+        is_game_over = len(patterns) > 0 and (patterns[-1] == lex.win_pattern or len(patterns) == MAX_GUESSES)
+    return StateView(tuple(guess_ids), tuple(patterns), history_key, is_game_over)
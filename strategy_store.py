@@ -0,0 +1,136 @@
+import threading
+from collections.abc import MutableMapping
+from types import MappingProxyType
+
+# Strategy maps shared by many threads (UI worker, solver service, batch runs).
+#
+# A StrategyStore holds the base map of one solver. The base is never
+# mutated: a merge builds a new dict and swaps the reference, so readers just
+# take self.base and look up without any lock. Each session (game, request,
+# UI) reads through a StrategyOverlay, a copy-on-write layer that keeps the
+# entries it computes itself (off-script recovery) to itself until it
+# commits them. Merges, and the save that follows them, hold the store lock,
+# so they are serialized.
+
+class StrategyStore:
+    def __init__(self, base: dict, save=None):
+        self._lock = threading.Lock()
+        self._save = save  # called with the merged dict, under the lock
+        self._set_base(dict(base))
+
+    def _set_base(self, mapping: dict):
+        # root_key: the state with every candidate (the longest key), cached per base
+        root_key = max(mapping.keys(), key=len) if mapping else None
+        self._snapshot = (MappingProxyType(mapping), root_key)
+
+    @property
+    def base(self):
+        """Read-only view of the current shared map."""
+        return self._snapshot[0]
+
+    @property
+    def root_key(self):
+        return self._snapshot[1]
+
+    def session(self) -> "StrategyOverlay":
+        return StrategyOverlay(self)
+
+    def merge(self, entries, save: bool = True) -> int:
+        """
+        Adds entries the shared map does not have yet (existing ones win) and
+        saves the result. Returns how many entries were added.
+        """
+        with self._lock:
+            base = self._snapshot[0]
+            added = {k: v for k, v in entries.items() if k not in base}
+            if not added:
+                return 0
+            merged = dict(base)
+            merged.update(added)
+            self._set_base(merged)
+            if save and self._save is not None:
+                self._save(merged)
+            return len(added)
+
+class StrategyOverlay(MutableMapping):
+    """
+    A session's view of a store: reads fall through to the shared base,
+    writes stay local until commit(). Works wherever a strategy dict did.
+    """
+    def __init__(self, store: StrategyStore):
+        self.store = store
+        self.local = {}
+
+    def __getitem__(self, key):
+        if key in self.local:
+            return self.local[key]
+        return self.store.base[key]
+
+    def __contains__(self, key):
+        return key in self.local or key in self.store.base
+
+    def get(self, key, default=None):
+        if key in self.local:
+            return self.local[key]
+        return self.store.base.get(key, default)
+
+    def __setitem__(self, key, value):
+        self.local[key] = value
+
+    def __delitem__(self, key):
+        del self.local[key]  # base entries are shared: only local ones can go
+
+    def __iter__(self):
+        base = self.store.base
+        yield from self.local
+        for key in base:
+            if key not in self.local:
+                yield key
+
+    def __len__(self):
+        base = self.store.base
+        return len(base) + sum(1 for key in self.local if key not in base)
+
+    def root_key(self):
+        """The longest key, without scanning the shared map."""
+        root = self.store.root_key
+        for key in self.local:
+            if root is None or len(key) > len(root):
+                root = key
+        return root
+
+    def commit(self) -> int:
+        """Merges the local entries into the shared store (serialized, saved once)."""
+        added = self.store.merge(self.local)
+        self.local = {}
+        return added
+
+def commit(strategy_map, save) -> None:
+    """
+    Publishes a strategy map after an in-place recovery: an overlay merges
+    into its store, a plain dict (single-threaded use) is saved with save.
+    """
+    if isinstance(strategy_map, StrategyOverlay):
+        strategy_map.commit()
+    else:
+        save(strategy_map)
+
+def root_key(strategy_map):
+    """Key of the starting state (the longest key) of an overlay or a plain dict."""
+    if isinstance(strategy_map, StrategyOverlay):
+        return strategy_map.root_key()
+    return max(strategy_map.keys(), key=len) if strategy_map else None
+
+_STORES = {}
+_LOCK = threading.Lock()
+
+def get_store(name: str, load, save=None) -> StrategyStore:
+    """The process-wide store for one solver, built with load() on first use."""
+    store = _STORES.get(name)
+    if store is None:
+        with _LOCK:
+            store = _STORES.get(name)
+            if store is None:
+                store = StrategyStore(load(), save)
+                _STORES[name] = store
+    return store
@@ -0,0 +1,30 @@
+import io
+import json
+import pytest
+import batch_suggest
+
+def test_parse_history_reads_pairs_and_progress_records():
+    by_pairs = batch_suggest.parse_history({"history": [["salet", "BYBBG"], ["crane", [0, 0, 1, 0, 2]]]})
+    by_rows = batch_suggest.parse_history({"progress": ["salet", "crane", ""], "response": ["BYBBG", "BBYBG"]})
+    assert by_pairs == by_rows
+
+@pytest.mark.parametrize("history", [[["salet", "GYB"]], [["salet", 243]], [["zzzzz", "BBBBB"]]])
+def test_parse_history_rejects_bad_moves(history):
+    with pytest.raises(ValueError):
+        batch_suggest.parse_history({"history": history})
+
+def test_run_answers_in_order_without_forcing_mmap(monkeypatch):
+    loads = []
+    load_matrix = batch_suggest.pattern_matrix.load_matrix
+    monkeypatch.setattr(batch_suggest.pattern_matrix, "load_matrix", lambda mmap=False: loads.append(mmap) or load_matrix(mmap))
+    lines = ['{"id": 1, "history": [["salet", "BYBBG"]]}', '{"id": 2, "history": [["zzzzz", "BBBBB"]]}',
+             '{"id": 3, "history": [["salet", "BYBBG"]]}']
+    sink = io.StringIO()
+
+    assert batch_suggest.run("dfs", lines, sink) == 3
+
+    results = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [r["id"] for r in results] == [1, 2, 3]
+    assert "error" in results[1]
+    assert results[0]["word"] == results[2]["word"] is not None
+    assert loads == [False]
@@ -0,0 +1,26 @@
+import os
+import pytest
+import bfs_solver
+
+HAS_MATRIX = any(os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"pattern_matrix.{ext}"))
+                 for ext in ("npy", "json"))
+pytestmark = pytest.mark.skipif(not HAS_MATRIX, reason="pattern matrix not generated")
+
+def first_candidate(candidates_arr, depth, rows=None):
+    """A guesser that always plays a candidate, so every node has a win bucket."""
+    return bfs_solver.ALLOWED_MAP[bfs_solver.ANSWER_WORDS[candidates_arr[0]]]
+
+@pytest.mark.parametrize("start_word", [None, "salet"])
+@pytest.mark.parametrize("guesser", ["searched", "candidate"])
+def test_depth_first_stream_builds_the_bfs_tree(tmp_path, monkeypatch, start_word, guesser):
+    bfs_solver.load_resources()
+    if guesser == "candidate":
+        monkeypatch.setattr(bfs_solver, "find_best_guess", first_candidate)
+    words = list(bfs_solver.ANSWER_WORDS[:: len(bfs_solver.ANSWER_WORDS) // 40])
+    path = str(tmp_path / "stream.pkl")
+
+    written = bfs_solver.dfs_build_to_file(path, start_word=start_word, initial_candidates=words)
+    streamed = bfs_solver.load_strategy_stream(path)
+
+    assert streamed == bfs_solver.bfs_solve_by_state(start_word=start_word, initial_candidates=words)
+    assert written == len(streamed)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import generate_matrix
+import lexicon
+import pattern_matrix
+import wordHandle
+
+def full_matrix(allowed, answers):
+    return wordHandle.get_responses_matrix(wordHandle.encode_words(allowed), wordHandle.encode_words(answers))
+
+@pytest.fixture(scope="module")
+def words():
+    return list(lexicon._read_words(lexicon.ALLOWED_FILE)[:400])
+
+@pytest.mark.parametrize("same_answers", [True, False])
+def test_update_matches_a_full_regeneration(words, same_answers):
+    old_allowed = words[:300]
+    old_answers = old_allowed if same_answers else words[::3]
+    # Words removed from the front, added at the end and in the middle
+    new_allowed = words[20:150] + words[300:400] + words[150:300]
+    new_answers = new_allowed if same_answers else words[1::2]
+
+    updated = pattern_matrix.update_matrix(full_matrix(old_allowed, old_answers), old_allowed, old_answers, new_allowed, new_answers)
+
+    expected = full_matrix(new_allowed, new_answers)
+    assert updated.dtype == expected.dtype
+    assert np.array_equal(updated, expected)
+
+def test_update_of_six_letter_lists():
+    old = ["planet", "orange", "silver", "bright"]
+    new = ["orange", "silver", "castle", "bright", "window"]
+    updated = pattern_matrix.update_matrix(full_matrix(old, old), old, old, new, new)
+    assert np.array_equal(updated, full_matrix(new, new))
+
+def test_versions_follow_the_word_lists(words):
+    assert pattern_matrix.words_hash(words[:10], words[:10]) == pattern_matrix.words_hash(list(words[:10]), list(words[:10]))
+    assert pattern_matrix.words_hash(words[:10], words[:10]) != pattern_matrix.words_hash(words[:11], words[:10])
+
+def test_answers_pairing_for_other_word_lengths(tmp_path):
+    six = tmp_path / "six.txt"
+    six.write_text("planet\norange\n")
+    five = tmp_path / "five.txt"
+    five.write_text("salet\ncrane\n")
+    assert generate_matrix.answers_file_for(str(six)) == str(six)
+    assert generate_matrix.answers_file_for(str(five)) == lexicon.ANSWERS_FILE
+    assert generate_matrix.answers_file_for(str(six), str(six)) == str(six)
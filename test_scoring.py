@@ -0,0 +1,54 @@
+import os
+import sys
+import threading
+import numpy as np
+import pytest
+import scoring
+
+HAS_MATRIX = any(os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"pattern_matrix.{ext}"))
+                 for ext in ("npy", "json"))
+pytestmark = pytest.mark.skipif(not HAS_MATRIX, reason="pattern matrix not generated")
+
+CANDIDATES = np.arange(0, 2000, 7)
+GUESSES = np.arange(3000)  # several GUESS_BLOCKs, so threaded calls really split
+
+@pytest.mark.parametrize("objective", ["entropy", "worst"])
+def test_workers_give_the_serial_result(objective):
+    serial = scoring.score_guesses(CANDIDATES, GUESSES, objective, workers=1)
+    for workers in (2, 4):
+        assert np.array_equal(scoring.score_guesses(CANDIDATES, GUESSES, objective, workers=workers), serial)
+        assert scoring.best_guess(CANDIDATES, GUESSES, objective, workers=workers) == \
+            scoring.best_guess(CANDIDATES, GUESSES, objective, workers=1)
+
+def test_concurrent_callers_asking_for_more_workers():
+    # Callers asking for growing worker counts must never see the pool shut down under them
+    serial = scoring.score_guesses(CANDIDATES, GUESSES, "entropy", workers=1)
+    errors = []
+    start = threading.Barrier(8)
+
+    def call(workers):
+        start.wait()
+        try:
+            for _ in range(3):
+                if not np.array_equal(scoring.score_guesses(CANDIDATES, GUESSES, "entropy", workers=workers), serial):
+                    errors.append(f"workers={workers}: different scores")
+        except Exception as e:
+            errors.append(f"workers={workers}: {e!r}")
+
+    threads = [threading.Thread(target=call, args=(workers,)) for workers in range(2, 10)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to interleave the submits
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+def test_larger_request_keeps_the_shared_pool():
+    # A caller holding the pool must still be able to submit after a larger request
+    pool = scoring._pool(2)
+    assert scoring._pool(64) is pool
+    assert pool.submit(int, "7").result() == 7
@@ -0,0 +1,56 @@
+import os
+import numpy as np
+import pytest
+import pattern_matrix
+import solver_registry
+import wordHandle
+from state import as_view
+
+# Run with: python -m pytest -q test_solver_registry.py (needs the pattern matrix)
+HAS_MATRIX = any(os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"pattern_matrix.{ext}"))
+                 for ext in ("npy", "json"))
+pytestmark = pytest.mark.skipif(not HAS_MATRIX, reason="pattern matrix not generated")
+
+def off_script_view(guesses, answer):
+    """The StateView after guesses when the answer is answer (patterns read from the matrix)."""
+    module = solver_registry.get("astar").module
+    allowed = {w: i for i, w in enumerate(module.ALLOWED_WORDS)}
+    column = module.ANSWER_WORDS.index(answer)
+    response = [wordHandle.int_to_response(int(pattern_matrix.MATRIX[allowed[g], column])) for g in guesses]
+    return as_view({"progress": list(guesses) + [""], "response": response, "is_game_over": False})
+
+def test_astar_compute_matches_solve_node():
+    solver = solver_registry.get("astar")
+    solver.load()
+    view = off_script_view(["crane", "tough", "limbo"], "dwelt")
+    ids = solver_registry.candidates_for(view)
+    assert 1 < len(ids) < 50
+
+    word, count = solver.compute(view)
+
+    expected = {}
+    solver.module.solve_node(np.asarray(ids, dtype=np.int32), len(view.patterns), float("inf"), expected)
+    assert count == len(ids)
+    assert word == expected[tuple(ids.tolist())]
+
+def test_tree_solver_without_strategy_refuses_the_root():
+    solver = solver_registry.get("bfs")
+    solver.load()
+    empty = solver.with_strategy({})
+    new_game = {"progress": [""], "response": [], "is_game_over": False}
+    with pytest.raises(LookupError):
+        empty.suggest(new_game)
+    with pytest.raises(LookupError):
+        empty.session().suggest(new_game)
+
+def test_astar_session_commits_its_recovery():
+    solver = solver_registry.get("astar")
+    solver.load()
+    unsaved = solver.with_strategy({})  # a store with no save function
+    view = off_script_view(["crane", "tough", "limbo"], "dwelt")
+    key = tuple(solver_registry.candidates_for(view).tolist())
+
+    word = unsaved.session().suggest(view)
+
+    assert unsaved.store.base[key] == word
+    assert unsaved.session().suggest(view) == word
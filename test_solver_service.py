@@ -0,0 +1,95 @@
+import asyncio
+import json
+import pytest
+import solver_service
+
+@pytest.fixture(autouse=True, scope="module")
+def loaded():
+    solver_service.SOLVERS["dfs"].load()  # run() loads its solvers before serving
+
+def call(service, path, request):
+    return asyncio.run(service.dispatch(path, json.dumps(request).encode()))
+
+@pytest.fixture
+def session():
+    service = solver_service.SolverService(["dfs"], pool_size=1)
+    status, payload = call(service, "/new_session", {"solver": "dfs"})
+    assert status == 200
+    return service, payload["session"]
+
+def observe(session, guess, response):
+    service, session_id = session
+    return call(service, "/observe", {"session": session_id, "guess": guess, "response": response})
+
+def test_observe_records_a_guess(session):
+    assert observe(session, "salet", "BYBBG") == (200, {"is_game_over": False, "guesses": 1})
+    assert observe(session, "crane", [0, 0, 1, 0, 2])[0] == 200
+
+@pytest.mark.parametrize("response", ["GYB", "BYBBGG", [0, 1, 2], 243, -1, "BYXBG"])
+def test_observe_rejects_bad_responses(session, response):
+    status, payload = observe(session, "salet", response)
+    assert status == 400, payload
+    # Nothing was recorded
+    assert observe(session, "salet", "BYBBG")[1]["guesses"] == 1
+
+def test_observe_rejects_unknown_words(session):
+    assert observe(session, "zzzzz", "BBBBB")[0] == 400
+    assert observe(session, "sal", "BBB")[0] == 400
+
+def test_suggest_history_rejects_bad_responses():
+    service = solver_service.SolverService(["dfs"], pool_size=1)
+    status, _ = call(service, "/suggest", {"solver": "dfs", "history": [["salet", "GYB"]]})
+    assert status == 400
+
+def test_session_game_flow(session):
+    service, session_id = session
+    observe(session, "salet", "BYBBG")
+    status, payload = call(service, "/suggest", {"session": session_id})
+    assert status == 200 and payload["word"]
+    # The same history sent without a session gets the same answer
+    assert call(service, "/suggest", {"solver": "dfs", "history": [["salet", "BYBBG"]]}) == (200, payload)
+
+    assert observe(session, "lifts", "GGGGG")[1] == {"is_game_over": True, "guesses": 2}
+    assert observe(session, "salet", "BYBBG")[0] == 409
+    assert call(service, "/suggest", {"session": session_id}) == (200, {"word": None, "candidates": 0})
+    assert call(service, "/close_session", {"session": session_id}) == (200, {"closed": True})
+    assert call(service, "/suggest", {"session": session_id})[0] == 404
+
+def test_bad_requests():
+    service = solver_service.SolverService(["dfs"], pool_size=1)
+    assert call(service, "/nowhere", {})[0] == 404
+    assert asyncio.run(service.dispatch("/observe", b"{not json"))[0] == 400
+    assert asyncio.run(service.dispatch("/observe", b"[1, 2]"))[0] == 400
+    assert call(service, "/new_session", {"solver": "nope"})[0] == 400
+
+    stats = call(service, "/stats", {})[1]["endpoints"]
+    assert stats["other"]["count"] == 1 and stats["/observe"]["errors"] == 2
+
+def test_http_round_trip():
+    service = solver_service.SolverService(["dfs"], pool_size=1)
+
+    async def exchange():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for path, request in [("/new_session", {"solver": "dfs"}), ("/observe", None)]:
+            if request is None:
+                request = {"session": replies[0][1]["session"], "guess": "salet", "response": "GYB"}
+            body = json.dumps(request).encode()
+            writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                key, _, value = line.decode().partition(":")
+                headers[key.strip().lower()] = value.strip()
+            replies.append((status, json.loads(await reader.readexactly(int(headers["content-length"])))))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return replies
+
+    (created, session), (observed, error) = asyncio.run(exchange())
+    assert created == 200 and session["solver"] == "dfs"
+    assert observed == 400 and "GYB" in error["error"]
@@ -0,0 +1,20 @@
+import pytest
+from state import State, as_view
+
+def test_as_view_reads_every_response_form():
+    view = as_view({"progress": ["salet", "crane", "tough", ""], "response": ["BYBBG", [0, 0, 1, 0, 2], 0]})
+    assert view.patterns == (29, 11, 0)
+    assert view.history_key == "saletBYBBGcraneBBYBGtoughBBBBB"
+
+@pytest.mark.parametrize("response", ["GYB", [0, 1, 2], 243])
+def test_responses_of_another_length_are_rejected(response):
+    with pytest.raises(ValueError):
+        as_view({"progress": ["salet", ""], "response": [response]})
+    with pytest.raises(ValueError):
+        State(["salet", ""], [response])
+
+def test_state_and_as_view_agree_on_unknown_words():
+    game_state = {"progress": ["salet", "zzzzz", "crane", ""], "response": ["BYBBG", "BBBBB", "BBYBG"]}
+    state = State(game_state["progress"], game_state["response"])
+    assert state.view() == as_view(game_state)
+    assert state.words == ["salet", "crane"]
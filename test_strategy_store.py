@@ -0,0 +1,80 @@
+import threading
+import pytest
+import strategy_store
+
+BASE = {(0, 1, 2): "salet", (0,): "apple", (1, 2): "baker"}
+
+def test_overlay_writes_stay_local_until_commit():
+    saved = []
+    store = strategy_store.StrategyStore(BASE, saved.append)
+    mine, other = store.session(), store.session()
+
+    mine[(1,)] = "bread"
+    mine[(0, 1, 2)] = "crane"  # shadows the base for this session only
+
+    assert mine[(1,)] == "bread" and mine[(0, 1, 2)] == "crane"
+    assert (1,) not in other and other[(0, 1, 2)] == "salet"
+    assert (1,) not in store.base and saved == []
+    assert len(mine) == len(BASE) + 1
+
+def test_commit_merges_new_entries_and_keeps_existing_ones():
+    saved = []
+    store = strategy_store.StrategyStore(BASE, saved.append)
+    mine, other = store.session(), store.session()
+    mine[(1,)] = "bread"
+    mine[(0, 1, 2)] = "crane"
+
+    assert mine.commit() == 1
+    assert store.base[(1,)] == "bread" and store.base[(0, 1, 2)] == "salet"
+    assert other[(1,)] == "bread"  # visible to every session once merged
+    assert mine.local == {} and len(saved) == 1 and saved[0][(1,)] == "bread"
+    assert mine.commit() == 0 and len(saved) == 1  # nothing new: no save
+
+def test_base_is_read_only_and_not_the_callers_dict():
+    source = dict(BASE)
+    store = strategy_store.StrategyStore(source)
+    with pytest.raises(TypeError):
+        store.base[(3,)] = "x"
+    source[(3,)] = "x"
+    assert (3,) not in store.base
+    with pytest.raises(KeyError):
+        del store.session()[(0,)]  # base entries cannot be deleted through a session
+
+def test_root_key_of_store_overlay_and_dict():
+    store = strategy_store.StrategyStore(BASE)
+    session = store.session()
+    assert store.root_key == strategy_store.root_key(session) == strategy_store.root_key(dict(BASE)) == (0, 1, 2)
+    session[(0, 1, 2, 3)] = "adieu"
+    assert strategy_store.root_key(session) == (0, 1, 2, 3) and store.root_key == (0, 1, 2)
+    assert strategy_store.StrategyStore({}).root_key is None
+
+def test_concurrent_commits_are_serialized():
+    saves = []
+    store = strategy_store.StrategyStore(BASE, lambda merged: saves.append(len(merged)))
+
+    def commit(i):
+        session = store.session()
+        for k in range(50):
+            session[(100 + i, k)] = f"w{i}"
+        session.commit()
+
+    threads = [threading.Thread(target=commit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store.base) == len(BASE) + 8 * 50
+    assert sorted(saves) == [len(BASE) + 50 * n for n in range(1, 9)]  # no merge lost
+
+def test_commit_of_a_plain_dict_saves_it():
+    saved = []
+    strategy_map = dict(BASE)
+    strategy_store.commit(strategy_map, saved.append)
+    assert saved == [strategy_map]
+
+def test_get_store_builds_each_store_once():
+    loads = []
+    first = strategy_store.get_store("test-once", lambda: loads.append(1) or dict(BASE))
+    assert strategy_store.get_store("test-once", lambda: loads.append(1) or {}) is first
+    assert loads == [1]
+    strategy_store._STORES.pop("test-once")
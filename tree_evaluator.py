@@ -0,0 +1,143 @@
+import argparse
+import collections
+import pickle
+import time
+import numpy as np
+import decision_table
+import lexicon
+import pattern_matrix
+import wordHandle
+
+# Grades a whole strategy without playing games: the tree is walked once and
+# each node's candidates are split on its guess's matrix row, so every answer
+# is followed down its path in a single pass.
+
+MAX_GUESSES = 6
+DEPTH_CAP = 20  # keep following over-long paths this far to report the true worst depth
+
+def _split(row: np.ndarray, candidates: np.ndarray):
+    """(pattern, group) pairs for candidates split on a pattern row, groups in ascending id order."""
+    order = np.argsort(row, kind="stable")
+    sorted_row = row[order]
+    bounds = np.flatnonzero(np.diff(sorted_row)) + 1
+    return zip(sorted_row[np.r_[0, bounds]].tolist(), np.split(candidates[order], bounds))
+
+def _walk(root_key, root_candidates, next_word, child_key, graded, answer_words, allowed_map, matrix):
+    """
+    Shared walker. next_word(key) gives the node's guess (or None);
+    child_key(key, word, pattern, group) gives the key of a child node.
+    """
+    histogram = collections.Counter()
+    unreachable = []
+    stuck = []
+    over = []
+    nodes = 0
+    win = wordHandle.win_pattern(len(answer_words[0]))
+    stack = [(root_key, root_candidates, 0)]
+    while stack:
+        key, candidates, depth = stack.pop()
+        word = next_word(key)
+        if word is None or word not in allowed_map:
+            unreachable.extend(int(i) for i in candidates if graded[i])
+            continue
+        nodes += 1
+        guesses = depth + 1
+        row = matrix[allowed_map[word], candidates]
+        for pattern, group in _split(row, candidates):
+            if pattern == win:
+                if graded[group[0]]:
+                    histogram[guesses] += 1
+                    if guesses > MAX_GUESSES:
+                        over.append(int(group[0]))
+                continue
+            child = child_key(key, word, pattern, group)
+            if child == key or guesses >= DEPTH_CAP:
+                # Back in the same state (or the path never ends): these can never be solved
+                stuck.extend(int(i) for i in group if graded[i])
+                continue
+            stack.append((child, group, guesses))
+
+    solved = sum(histogram.values())
+    return {
+        "histogram": dict(sorted(histogram.items())),
+        "solved": solved,
+        "solved_within_6": solved - len(over),
+        "average": (sum(g * c for g, c in histogram.items()) / solved) if solved else 0.0,
+        "worst": max(histogram) if histogram else 0,
+        "unreachable": [answer_words[i] for i in unreachable],
+        "failed": [answer_words[i] for i in stuck],
+        "over_6": [answer_words[i] for i in over],
+        "nodes": nodes,
+    }
+
+def evaluate_strategy(strategy_map: dict, answers: list[str] = None) -> dict:
+    """
+    Grades a strategy map (candidate tuple -> word) or a history table
+    (history_key -> word, see decision_table.load_table).
+    answers: words to grade; default is every candidate at the root for a
+    strategy map and the answer list for a history table.
+
+    Returns the guess-count histogram, average / worst guesses over solved
+    answers, answers with no decision on their path ("unreachable") and answers
+    the tree can never solve ("failed"). Answers solved in more than 6 guesses
+    are counted in the histogram and also listed under "over_6".
+    """
+    matrix, allowed, answer_words = pattern_matrix.load_matrix()
+    allowed_map = {w: i for i, w in enumerate(allowed)}
+    answer_map = {w: i for i, w in enumerate(answer_words)}
+    t0 = time.perf_counter()
+
+    if strategy_map and isinstance(next(iter(strategy_map)), str):
+        # History table: keys are history strings, candidates start as the graded answers
+        words = answers if answers is not None else lexicon.get_lexicon().answer_words
+        root_candidates = np.array(sorted(answer_map[w] for w in words if w in answer_map), dtype=np.int64)
+        table = strategy_map
+        next_word = lambda key: decision_table.lookup(table, key)
+        child_key = lambda key, word, pattern, group: key + word + wordHandle.int_to_str(pattern, len(word))
+        root_key = ""
+    else:
+        root_key = max(strategy_map.keys(), key=len) if strategy_map else ()
+        root_candidates = np.array(root_key, dtype=np.int64)
+        next_word = strategy_map.get
+        child_key = lambda key, word, pattern, group: tuple(group.tolist())
+
+    graded = np.zeros(len(answer_words), dtype=bool)
+    if answers is None:
+        graded[root_candidates] = True
+    else:
+        graded[[answer_map[w] for w in answers if w in answer_map]] = True
+    result = _walk(root_key, root_candidates, next_word, child_key, graded, answer_words, allowed_map, matrix)
+    # Graded answers the root never considers cannot be reached either
+    result["unreachable"].extend(answer_words[i] for i in np.setdiff1d(np.flatnonzero(graded), root_candidates))
+
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+def is_shippable(result: dict) -> bool:
+    """True when every graded answer is reachable and solved within 6 guesses."""
+    return not result["unreachable"] and not result["failed"] and not result["over_6"]
+
+def print_report(result: dict):
+    print(f"Solved: {result['solved']} | Within 6: {result['solved_within_6']} | "
+          f"Average: {result['average']:.4f} | Worst: {result['worst']} | "
+          f"Nodes: {result['nodes']} | Time: {result['seconds']:.3f}s")
+    print(f"Histogram: {result['histogram']}")
+    for label in ("unreachable", "failed", "over_6"):
+        if result[label]:
+            print(f"{label}: {len(result[label])} e.g. {result[label][:10]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grade a strategy map or decision table in one pass.")
+    parser.add_argument("tree", help="Strategy map .pkl or history-keyed decision table .csv")
+    parser.add_argument("--answers-only", action="store_true", help="Grade only answers.txt words")
+    args = parser.parse_args()
+
+    if args.tree.endswith(".csv"):
+        tree = decision_table.load_table(args.tree)
+    else:
+        with open(args.tree, "rb") as f:
+            tree = pickle.load(f)
+    answers = list(lexicon.get_lexicon().answer_words) if args.answers_only else None
+    result = evaluate_strategy(tree, answers)
+    print_report(result)
+    print("OK to ship." if is_shippable(result) else "NOT shippable.")
@@ -3,13 +3,31 @@ import json
 import os
 import time
 import pickle
+import threading
 import game
+import pattern_matrix
+import scoring
+import strategy_store
+import wordHandle
+from state import as_view
 import random
 import heapq  
+import itertools
 import sys
 import numpy as np 
 
 # --- 1. GLOBAL RESOURCES ---
+# Objective used to pick each node's guess (see scoring.OBJECTIVES).
+# "worst" is the original minimax scan; e.g. "weighted_entropy" weights
+# candidates by their word_frequencies.json prior.
+OBJECTIVE = "worst"
+WORKERS = 1  # threads scoring each node's guesses (see scoring.best_guess)
+# How the tree builders read the matrix: "guess_major" gathers each node's
+# patterns from MATRIX rows; "candidate_major" keeps a (candidates x guesses)
+# block, reordered in step with the builder's id order, so a node's
+# patterns are one contiguous row slice (see pattern_matrix section 3).
+# Same tree either way; the block costs candidates x guesses bytes.
+LAYOUT = "guess_major"
 ALLOWED_MAP = {}
 ANSWER_MAP = {}
 MATRIX = np.array([]) 
@@ -18,39 +36,35 @@ ANSWER_WORDS = []
 WORD_FREQ = {}
 SORTED_GUESS_INDICES = [] 
 WORD_COSTS = [] 
+NUM_PATTERNS = wordHandle.NUM_PATTERNS  # 3**word_length, set with the matrix
+WIN_PATTERN = wordHandle.WIN_PATTERN
+_LOCK = threading.Lock()
 
 def load_resources():
-    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, ALLOWED_MAP, ANSWER_MAP, WORD_FREQ, SORTED_GUESS_INDICES, WORD_COSTS
-    
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    matrix_path = os.path.join(base_path, "pattern_matrix.pkl")
-    json_path = os.path.join(base_path, "pattern_matrix.json")
-    freq_path = os.path.join(base_path, "answers", "word_frequencies.json")
-    
     print(f"Loading resources...")
 
-    # SINGLETON CHECK: If already loaded, do nothing.
+    # SINGLETON CHECK: If already loaded, do nothing (no lock once loaded).
     if MATRIX.size > 0 and len(WORD_COSTS) > 0:
         return
+    with _LOCK:
+        if MATRIX.size == 0 or len(WORD_COSTS) == 0:
+            _load_resources()
+
+def _load_resources():
+    # Globals are published last (WORD_COSTS at the very end), so a thread
+    # that skips the lock never sees half-built tables
+    global MATRIX, ALLOWED_WORDS, ANSWER_WORDS, ALLOWED_MAP, ANSWER_MAP, WORD_FREQ, SORTED_GUESS_INDICES, WORD_COSTS
+    global NUM_PATTERNS, WIN_PATTERN
     
-    # 1. Load Matrix
-    data = None
-    if os.path.exists(matrix_path):
-        print(f"Loading from pickle: {matrix_path}")
-        with open(matrix_path, "rb") as f:
-            data = pickle.load(f)
-    elif os.path.exists(json_path):
-        print(f"Loading from json: {json_path}")
-        with open(json_path, "r") as f:
-            data = json.load(f)
-            
-    if data:
-        print("Converting Matrix to NumPy...")
-        MATRIX = np.array(data["matrix"], dtype=np.uint8)
-        ALLOWED_WORDS = data["allowed_words"]
-        ANSWER_WORDS = data["answer_words"]
-        print(f"Matrix Size: {MATRIX.nbytes / 1024 / 1024:.2f} MB")
-        del data 
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    freq_path = os.path.join(base_path, "answers", "word_frequencies.json")
+    
+    # 1. Load Matrix (shared with the other solvers, loaded once per process)
+    matrix, allowed, answers = pattern_matrix.load_matrix()
+    if matrix.size > 0:
+        MATRIX = matrix
+        ALLOWED_WORDS = allowed
+        ANSWER_WORDS = answers
     else:
         print("Error: pattern_matrix not found.")
         return
@@ -66,6 +80,8 @@ def load_resources():
 
     ALLOWED_MAP = {w: i for i, w in enumerate(ALLOWED_WORDS)}
     ANSWER_MAP = {w: i for i, w in enumerate(ANSWER_WORDS)}
+    NUM_PATTERNS = wordHandle.num_patterns(len(ALLOWED_WORDS[0]))
+    WIN_PATTERN = wordHandle.win_pattern(len(ALLOWED_WORDS[0]))
     
     # Pre-calculate costs
     MEAN_FREQ = 1.75
@@ -74,7 +90,7 @@ def load_resources():
     COST_MEAN = 1.0
     COST_COMMON = 0.6
     
-    WORD_COSTS = [0.0] * len(ALLOWED_WORDS)
+    word_costs = [0.0] * len(ALLOWED_WORDS)
     indices_with_freq = []
     
     for i, w in enumerate(ALLOWED_WORDS):
@@ -87,11 +103,12 @@ def load_resources():
             ratio = (f - MEAN_FREQ) / (MAX_FREQ - MEAN_FREQ)
             cost = COST_MEAN - (ratio * (COST_MEAN - COST_COMMON))
             
-        WORD_COSTS[i] = cost
+        word_costs[i] = cost
         indices_with_freq.append((i, f))
     
     indices_with_freq.sort(key=lambda x: x[1], reverse=True)
     SORTED_GUESS_INDICES = [x[0] for x in indices_with_freq]
+    WORD_COSTS = word_costs
 
     print("Resources loaded and optimized.")
 
@@ -99,36 +116,42 @@ def load_resources():
 def get_word_cost(word_idx):
     return WORD_COSTS[word_idx]
 
-# --- 3. HELPER: FREQUENCY-AWARE SELECTION (DEFERRED BUILD) ---
-def find_best_move_for_state(current_indices, depth):
+# --- 3. HELPER: FREQUENCY-AWARE SELECTION ---
+def find_best_guess(candidates_arr, depth, rows=None):
     """
-    Calculates the best move using a strategy that favors common words.
-    OPTIMIZED: Uses Deferred Group Construction to avoid memory churn.
+    Allowed-word id of the best move for a candidate id array (-1 if none),
+    using a strategy that favors common words. rows: the node's slice of
+    the builder's candidate-major block (LAYOUT), used for full scans.
     """
-    if not current_indices:
-        return None, {}
-
     best_idx = -1
     min_worst = float('inf')
-    # We NO LONGER build best_groups inside the loop
-    
-    # Convert candidates to numpy array once
-    candidates_arr = np.array(current_indices)
 
-    if len(current_indices) <= 2:
-        search_indices = [ALLOWED_MAP[ANSWER_WORDS[i]] for i in current_indices]
+    if len(candidates_arr) <= 2:
+        search_indices = [ALLOWED_MAP[ANSWER_WORDS[i]] for i in candidates_arr]
     elif depth == 5:
-        search_indices = [ALLOWED_MAP[ANSWER_WORDS[i]] for i in current_indices]
+        search_indices = [ALLOWED_MAP[ANSWER_WORDS[i]] for i in candidates_arr]
         search_indices.sort(key=lambda idx: WORD_COSTS[idx])
     else:
         search_indices = SORTED_GUESS_INDICES
+        if rows is not None:
+            # Columns of the block are SORTED_GUESS_INDICES, in that order
+            position, _ = scoring.best_guess(candidates_arr, objective=OBJECTIVE, workers=WORKERS, rows=rows)
+            return SORTED_GUESS_INDICES[position]
+
+    if OBJECTIVE != "worst" or WORKERS > 1:
+        # All guesses scored in vectorized blocks with the selected kernel, on
+        # WORKERS threads. For "worst" this is the scan below: the first guess
+        # with the smallest worst bucket wins, early break included.
+        search_arr = np.asarray(search_indices)
+        position, _ = scoring.best_guess(candidates_arr, search_arr, OBJECTIVE, matrix=MATRIX, workers=WORKERS)
+        return int(search_arr[position])
 
     for guess_idx in search_indices:
         # 1. VECTORIZED LOOKUP
         patterns = MATRIX[guess_idx, candidates_arr]
         
         # 2. VECTORIZED COUNTING
-        counts = np.bincount(patterns, minlength=243)
+        counts = np.bincount(patterns, minlength=NUM_PATTERNS)
         
         # 3. CHECK WORST CASE
         worst = counts.max()
@@ -138,33 +161,65 @@ def find_best_move_for_state(current_indices, depth):
 
         min_worst = worst
         best_idx = guess_idx
-        
-        # --- OPTIMIZATION: DO NOT BUILD LISTS YET ---
-        # We just remember that this index is the winner so far.
-        # We avoid the expensive loop/append logic here.
 
         if min_worst == 1: 
             break
-            
-    if best_idx != -1:
-        # --- NOW WE BUILD THE GROUPS ---
-        # We do this exactly ONCE per node, instead of potentially 20-30 times.
-        best_groups = collections.defaultdict(list)
-        patterns = MATRIX[best_idx, candidates_arr]
-        
-        for idx, pat in zip(current_indices, patterns):
-            best_groups[pat].append(idx)
-            
-        return ALLOWED_WORDS[best_idx], best_groups
-    
-    if current_indices:
-        return ANSWER_WORDS[current_indices[0]], {}
-        
-    return None, {}
+
+    return best_idx
+
+def find_best_move_for_state(current_indices, depth):
+    """
+    Best move for a list of candidate ids and its groups ({pattern: id array}).
+    Used for single live moves; the tree builder splits nodes in place instead.
+    """
+    if len(current_indices) == 0:
+        return None, {}
+
+    candidates_arr = np.asarray(current_indices)
+    best_idx = find_best_guess(candidates_arr, depth)
+    if best_idx == -1:
+        return ANSWER_WORDS[candidates_arr[0]], {}
+
+    patterns, groups = scoring.partition(best_idx, candidates_arr)
+    return ALLOWED_WORDS[best_idx], dict(zip(patterns.tolist(), groups))
+
+def find_best_guesses(candidate_sets, depth):
+    """
+    find_best_guess for several candidate id arrays at one depth. Sets that
+    search all of SORTED_GUESS_INDICES are scored in one pass by
+    scoring.best_guesses_per_group (the first best guess in that order
+    wins, as in the scan); small sets and the last guess search their own
+    candidates one by one.
+    """
+    best = [None] * len(candidate_sets)
+    shared = []
+    for i, c in enumerate(candidate_sets):
+        if len(c) > 2 and depth != 5:
+            shared.append(i)
+        else:
+            best[i] = find_best_guess(np.asarray(c), depth)
+    if shared:
+        best_ids, _ = scoring.best_guesses_per_group([np.asarray(candidate_sets[i]) for i in shared], OBJECTIVE,
+                                                     np.asarray(SORTED_GUESS_INDICES), matrix=MATRIX)
+        for i, best_id in zip(shared, best_ids):
+            best[i] = int(best_id)
+    return best
+
+def layout_block(order):
+    """
+    The builder's candidate-major block for an id order, its columns in
+    SORTED_GUESS_INDICES order (None unless LAYOUT is "candidate_major").
+    """
+    if LAYOUT != "candidate_major":
+        return None
+    return pattern_matrix.candidate_major_block(order, SORTED_GUESS_INDICES)
 
 # --- 4. UCS STATE SOLVER ---
+# Same node layout as bfs_solver: one permuted int32 id array, nodes are
+# (offset, length) slices of it split in place by scoring.split_slice.
 def ucs_solve_by_state(start_word: str = None, initial_candidates: list[str] = None):
-    pq = [] 
+    pq = []  # (cost, tie-break, offset, length, depth)
+    tie = itertools.count()
     strategy_map = {}
     visited_states = set()
     
@@ -175,6 +230,10 @@ def ucs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
                 initial_indices.append(ANSWER_MAP[w])
     else:
         initial_indices = list(range(len(ANSWER_WORDS)))
+    order = np.array(initial_indices, dtype=np.int32)
+    rows = layout_block(order)  # reordered with order by every split_slice
+    # Keys reuse one int object per id, as the old list-built tuples did
+    key_ids = np.arange(len(ANSWER_WORDS)).astype(object)
     
     if start_word:
         start_idx = ALLOWED_MAP[start_word]
@@ -182,20 +241,12 @@ def ucs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
         strategy_map[initial_tuple] = start_word
         visited_states.add(initial_tuple)
         
-        # NumPy Split for Start Node
-        c_arr = np.array(initial_indices)
-        patterns = MATRIX[start_idx, c_arr]
-        
-        groups = collections.defaultdict(list)
-        for idx, pat in zip(initial_indices, patterns):
-            groups[pat].append(idx)
-            
-        for subset in groups.values():
-            if len(subset) > 0:
-                start_cost = get_word_cost(start_idx)
-                heapq.heappush(pq, (start_cost, id(subset), subset, 1))
+        # In-place split for Start Node
+        start_cost = get_word_cost(start_idx)
+        for _, offset, length in scoring.split_slice(order, 0, len(order), MATRIX[start_idx, order], rows):
+            heapq.heappush(pq, (start_cost, next(tie), offset, length, 1))
     else:
-        heapq.heappush(pq, (0, id(initial_indices), initial_indices, 0))
+        heapq.heappush(pq, (0, next(tie), 0, len(order), 0))
 
     start_time = time.time()
     nodes_processed = 0
@@ -203,31 +254,31 @@ def ucs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
     print(f"Starting UCS (Exhaustive) for {len(initial_indices)} candidates...")
 
     while pq:
-        cost, _, current_indices, depth = heapq.heappop(pq)
-        state_id = tuple(current_indices)
+        cost, _, offset, length, depth = heapq.heappop(pq)
+        node = order[offset:offset + length]
+        state_id = tuple(key_ids[node])
 
         if state_id in visited_states and not start_word: 
             continue
         visited_states.add(state_id)
 
-        if len(current_indices) == 1:
-            strategy_map[state_id] = ANSWER_WORDS[current_indices[0]]
+        if length == 1:
+            strategy_map[state_id] = ANSWER_WORDS[node[0]]
             continue
         
         if depth >= 6: continue
 
-        best_word, best_groups = find_best_move_for_state(current_indices, depth)
+        best_idx = find_best_guess(node, depth, None if rows is None else rows[offset:offset + length])
         
-        if best_word:
-            strategy_map[state_id] = best_word
-            
-            best_idx = ALLOWED_MAP[best_word]
-            move_cost = get_word_cost(best_idx)
-            new_total_cost = cost + move_cost
+        if best_idx != -1:
+            strategy_map[state_id] = ALLOWED_WORDS[best_idx]
+            new_total_cost = cost + get_word_cost(best_idx)
             
-            for pat_int, subset in best_groups.items():
-                if pat_int == 242: continue 
-                heapq.heappush(pq, (new_total_cost, id(subset), subset, depth + 1))
+            for pat_int, child_offset, child_length in scoring.split_slice(order, offset, length, MATRIX[best_idx, node], rows):
+                if pat_int == WIN_PATTERN: continue 
+                heapq.heappush(pq, (new_total_cost, next(tie), child_offset, child_length, depth + 1))
+        else:
+            strategy_map[state_id] = ANSWER_WORDS[node[0]]
             
         nodes_processed += 1
         if nodes_processed % 100 == 0:
@@ -240,8 +291,10 @@ def ucs_solve_by_state(start_word: str = None, initial_candidates: list[str] = N
 def save_strategy(strategy_map):
     STRATEGY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree", "ucs_strategy_map.pkl")
     os.makedirs(os.path.dirname(STRATEGY_FILE), exist_ok=True)
-    with open(STRATEGY_FILE, "wb") as f:
+    # Written beside the old file and swapped in: readers never see half a pickle
+    with open(STRATEGY_FILE + ".tmp", "wb") as f:
         pickle.dump(strategy_map, f)
+    os.replace(STRATEGY_FILE + ".tmp", STRATEGY_FILE)
     print(f"Strategy map saved to {STRATEGY_FILE}. Size: {len(strategy_map)} states.")
 
 def load_strategy():
@@ -257,7 +310,16 @@ def load_strategy():
             return {}
     return {}
 
-# --- 6. RUNTIME HELPER ---
+# --- 6. SHARED STRATEGY ---
+# One read-only ucs strategy per process (see strategy_store); every game or
+# thread plays through its own copy-on-write session of it.
+def shared_strategy():
+    return strategy_store.get_store("ucs", load_strategy, save_strategy)
+
+def strategy_session():
+    return shared_strategy().session()
+
+# --- 7. RUNTIME HELPER ---
 def get_next_guess(game_state, strategy_map):
     if not strategy_map:
         loaded = load_strategy()
@@ -266,33 +328,25 @@ def get_next_guess(game_state, strategy_map):
         else:
             print("No strategy found. Generating initial 'salet' strategy...")
             strategy_map.update(ucs_solve_by_state(start_word="salet"))
-            save_strategy(strategy_map)
+            strategy_store.commit(strategy_map, save_strategy)
 
-    game_progress = game_state["progress"]
-    game_responses = game_state["response"]
-    game_finished = game_state["is_game_over"]
+    # Accepts a StateView (ids + pattern ints) or the old game_state dict
+    view = as_view(game_state)
 
-    if len(game_responses) == 0:
+    if len(view.patterns) == 0:
         initial_key = tuple(range(len(ANSWER_WORDS))) 
         if initial_key not in strategy_map:
              print("Initial state missing. Regenerating 'salet' strategy...")
              strategy_map.update(ucs_solve_by_state(start_word="salet"))
-             save_strategy(strategy_map)
-        return strategy_map.get(max(strategy_map.keys(), key=len))
+             strategy_store.commit(strategy_map, save_strategy)
+        return strategy_map.get(strategy_store.root_key(strategy_map))
 
-    if game_finished:
+    if view.is_game_over:
         return None
 
     current_indices = np.arange(len(ANSWER_WORDS))
     
-    for guess, resp_list in zip(game_progress, game_responses):
-        if not guess or guess not in ALLOWED_MAP: continue
-        guess_idx = ALLOWED_MAP[guess]
-        
-        target_val = 0
-        for j, digit in enumerate(resp_list):
-            target_val += digit * (3 ** (4 - j))
-            
+    for guess_idx, target_val in zip(view.guess_ids, view.patterns):
         patterns = MATRIX[guess_idx, current_indices]
         mask = (patterns == target_val)
         current_indices = current_indices[mask]
@@ -308,8 +362,9 @@ def get_next_guess(game_state, strategy_map):
     print(f"Off-script state ({len(current_indices)} candidates). Recovering with UCS...")
     new_sub_strategy = ucs_solve_by_state(initial_candidates=[ANSWER_WORDS[i] for i in current_indices])
     
+    # A session overlay keeps this to itself until the serialized merge + save
     strategy_map.update(new_sub_strategy)
-    save_strategy(strategy_map)
+    strategy_store.commit(strategy_map, save_strategy)
     
     return strategy_map.get(state_id)
 
@@ -1,5 +1,47 @@
+import functools
 import math
 from collections import defaultdict
+import numpy as np
+
+# --- Pattern Codec ---
+# A response is stored as a base-3 int: 0 = Grey, 1 = Yellow, 2 = Green,
+# first letter most significant, e.g. [2,0,0,0,0] -> 2*81 = 162.
+# Everything below works for any word length L (3**L patterns); the module
+# constants are the ones for the standard 5-letter game.
+WORD_LENGTH = 5
+MAX_WORD_LENGTH = 10  # 3**10 patterns still fit in uint16
+
+def num_patterns(length: int = WORD_LENGTH) -> int:
+    return 3 ** length
+
+def win_pattern(length: int = WORD_LENGTH) -> int:
+    return 3 ** length - 1
+
+def pattern_dtype(length: int = WORD_LENGTH):
+    """Smallest dtype that holds every pattern: uint8 up to 5 letters, uint16 up to 10."""
+    if length <= 5:
+        return np.uint8
+    if length <= MAX_WORD_LENGTH:
+        return np.uint16
+    raise ValueError(f"Words of {length} letters are not supported (max {MAX_WORD_LENGTH}).")
+
+@functools.lru_cache(maxsize=None)
+def codec(length: int = WORD_LENGTH):
+    """(PATTERN_LISTS, PATTERN_STRINGS, STRING_TO_PATTERN, POWERS) lookup tables for one word length."""
+    powers = tuple(3 ** (length - 1 - i) for i in range(length))
+    lists = tuple(tuple((p // w) % 3 for w in powers) for p in range(num_patterns(length)))
+    strings = tuple("".join("BYG"[d] for d in digits) for digits in lists)
+    return lists, strings, {s: p for p, s in enumerate(strings)}, np.array(powers, dtype=pattern_dtype(length))
+
+NUM_PATTERNS = num_patterns()
+WIN_PATTERN = win_pattern()
+
+# 243-entry lookup tables, indexed by pattern int
+PATTERN_LISTS, PATTERN_STRINGS, STRING_TO_PATTERN, POWERS = codec()
+
+# Letters are encoded as uint8 codes 0-25 for the vectorized kernels
+LETTER_OFFSET = ord("a")
+CHUNK_CELLS = 1 << 16  # guess x target cells scored per block in get_responses_matrix
 
 # --- Your Helper Functions (Fixed get_response) ---
 
@@ -8,38 +50,122 @@ def get_response(word: str, target: str) -> list[int]:
     Calculates the Wordle color pattern.
     0 = Grey, 1 = Yellow, 2 = Green
     """
-    response = [0] * 5  # Start with all Grey
+    length = len(word)
+    response = [0] * length  # Start with all Grey
     target_counts = defaultdict(int)
-    
+
     # 1. First pass: Find Greens (2)
-    for i in range(5):
+    for i in range(length):
         if word[i] == target[i]:
             response[i] = 2
         else:
             target_counts[target[i]] += 1
-            
+
     # 2. Second pass: Find Yellows (1)
-    for i in range(5):
+    for i in range(length):
         if response[i] == 0:  # Only check Grey letters
             if word[i] in target_counts and target_counts[word[i]] > 0:
                 response[i] = 1
                 target_counts[word[i]] -= 1
-                
+
     return response
 
 def response_to_str(response: list[int]) -> str:
-    ret = ""
-    for i in response:
-        if i == 2:
-            ret += "G"
-        elif i == 1:
-            ret += "Y"
-        elif i == 0:
-            ret += "B"
-    return ret
+    return "".join("BYG"[i] for i in response)
 
 def response_to_int(response: list[int]) -> int:
     result = 0
-    for i in range(5):
-        result += response[i] * (3 ** (4 - i))
-    return result
\ No newline at end of file
+    for digit in response:
+        result = result * 3 + digit
+    return result
+
+def int_to_response(pattern: int, length: int = WORD_LENGTH) -> list[int]:
+    return list(codec(length)[0][pattern])
+
+def int_to_str(pattern: int, length: int = WORD_LENGTH) -> str:
+    return codec(length)[1][pattern]
+
+def response_str_to_int(response_str: str) -> int:
+    return codec(len(response_str))[2][response_str]
+
+def to_pattern(response, length: int = None) -> int:
+    """
+    Normalises a response given as an int list, a "GYB" string or a pattern int.
+    With length (the word length), a response of any other length or a
+    pattern int out of range raises ValueError.
+    """
+    if isinstance(response, (int, np.integer)):
+        pattern = int(response)
+        if length is not None and not 0 <= pattern < 3 ** length:
+            raise ValueError(f"Pattern {pattern} out of range for {length}-letter words")
+        return pattern
+    if length is not None and len(response) != length:
+        raise ValueError(f"Response '{response}' does not have {length} letters")
+    if isinstance(response, str):
+        return response_str_to_int(response)
+    return response_to_int(response)
+
+# --- Batched, Vectorized Feedback ---
+
+def encode_words(words) -> np.ndarray:
+    """
+    Returns an (N, L) uint8 array of letter codes (a=0 ... z=25).
+    Accepts a single word, a list of words or an already encoded array
+    (a 1-D array is one encoded word).
+    """
+    if isinstance(words, np.ndarray):
+        return words.reshape(1, -1) if words.ndim == 1 else words
+    if isinstance(words, str):
+        words = [words]
+    if len(words) == 0:
+        return np.empty((0, WORD_LENGTH), dtype=np.uint8)
+    codes = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), len(words[0]))
+    return codes - np.uint8(LETTER_OFFSET)
+
+def _score_block(g: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Patterns for every (guess, target) pair of two encoded blocks, shape (G, T)."""
+    length = g.shape[1]
+    diag = np.arange(length)
+    # eq[g, t, i, j] is True when guess letter i equals target letter j
+    eq = (g[:, None, :, None] == t[None, :, None, :])
+    greens = eq[:, :, diag, diag]  # (G, T, L)
+    unmatched = ~greens
+
+    # Non-green target copies of each guess letter
+    available = (eq & unmatched[:, :, None, :]).sum(axis=3, dtype=np.int8)
+    # same[g, i, k]: guess letters i and k are equal (for repeated letters)
+    same = (g[:, :, None] == g[:, None, :])
+
+    # Yellows, left to right: a letter is yellow while the target still has
+    # unmatched copies of it that earlier yellows have not used up
+    yellows = np.empty_like(greens)
+    for i in range(length):
+        avail = available[:, :, i]
+        for k in range(i):
+            avail = avail - (same[:, None, i, k] & yellows[:, :, k])
+        yellows[:, :, i] = unmatched[:, :, i] & (avail > 0)
+
+    result = greens.astype(np.uint8) * np.uint8(2) + yellows
+    dtype = pattern_dtype(length)
+    return (result * codec(length)[3]).sum(axis=2, dtype=dtype)
+
+def get_responses_matrix(guesses, targets) -> np.ndarray:
+    """
+    Pattern ints for every guess against every target, as a (G, T) array of
+    pattern_dtype(L) (uint8 for 5-letter words).
+    guesses / targets may be word lists or arrays from encode_words().
+    Work is done in blocks of guesses to bound the temporary memory.
+    """
+    g = encode_words(guesses)
+    t = encode_words(targets)
+    out = np.empty((len(g), len(t)), dtype=pattern_dtype(g.shape[1]))
+    if len(t) == 0:
+        return out
+    step = max(1, CHUNK_CELLS // len(t))
+    for start in range(0, len(g), step):
+        out[start:start + step] = _score_block(g[start:start + step], t)
+    return out
+
+def get_responses(guess, targets) -> np.ndarray:
+    """Pattern ints for one guess against every target, as a (T,) uint8 array."""
+    return get_responses_matrix(encode_words(guess)[:1], targets)[0]